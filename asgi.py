@@ -0,0 +1,369 @@
+"""ASGI entry point serving /api/chat, /api/ask-bot, /api/edubot, /api/merit and /api/health
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Mistral calls go through an async HTTP client, so a slow upstream response
+holds a coroutine instead of a worker thread. Blocking steps (googletrans,
+embedding retrieval, CSV loading, merit scoring) run in the default thread pool. Every
+request gets REQUEST_DEADLINE seconds; upstream timeouts shrink to fit the
+time left and are cancelled once it runs out.
+"""
+import asyncio
+import importlib.util
+import io
+import json
+import os
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+import backend as ask_backend
+from edugate.answer_cache import normalize_question
+from edugate.async_llm import create_async_client
+from edugate.llm import LLMError
+from edugate.merit import MeritError
+from edugate.metrics import MetricsMiddleware, registry
+from edugate.singleflight import AsyncSingleFlight
+from edugate.sse import astream_answer
+
+REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', '45'))
+
+
+def _load_chat_backend():
+    """Import backend/app.py, whose package name is shadowed by backend.py"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend', 'app.py')
+    spec = importlib.util.spec_from_file_location('chat_backend', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+chat_backend = _load_chat_backend()
+
+# Created inside the lifespan so it binds to the server's event loop
+llm = None
+
+# Concurrent identical LLM and translation calls share one upstream request. These replace
+# the backends' thread-based ones on the paths served here, so they also take over their counters
+ask_flight = AsyncSingleFlight()
+chat_flight = AsyncSingleFlight()
+translate_flight = AsyncSingleFlight()
+registry.counter_func('coalesced_calls_total', lambda: ask_flight.coalesced, backend='ask-bot', call='llm')
+registry.counter_func('coalesced_calls_total', lambda: chat_flight.coalesced, backend='chat', call='llm')
+registry.counter_func('coalesced_calls_total', lambda: translate_flight.coalesced, backend='chat', call='translate')
+
+
+def _deadline():
+    return asyncio.get_running_loop().time() + REQUEST_DEADLINE
+
+
+def _remaining(deadline):
+    return max(deadline - asyncio.get_running_loop().time(), 0)
+
+
+def _wants_stream(request, data):
+    return bool(data.get('stream')) or 'text/event-stream' in request.headers.get('accept', '')
+
+
+def _sse(events):
+    return StreamingResponse(events, media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+async def _until(deadline, tokens):
+    """Stop an async token stream once the request deadline has passed"""
+    iterator = tokens.__aiter__()
+    while True:
+        try:
+            token = await asyncio.wait_for(iterator.__anext__(), _remaining(deadline))
+        except StopAsyncIteration:
+            return
+        yield token
+
+
+async def _in_thread(deadline, func, *args):
+    return await asyncio.wait_for(asyncio.to_thread(func, *args), _remaining(deadline))
+
+
+async def ask_bot(request):
+    """Async /api/ask-bot"""
+    try:
+        data = await request.json()
+        user_question = data.get('question', '').strip()
+
+        if not user_question:
+            return JSONResponse({'error': 'Empty question'}, status_code=400)
+
+        deadline = _deadline()
+        # Off the event loop: during warm-up this waits for the first load
+        if await _in_thread(deadline, ask_backend.corpus_loader.get) is None:
+            return JSONResponse({'error': 'Data not loaded'}, status_code=500)
+
+        fields, relevant_rows, row_ids, answer = await _in_thread(deadline, ask_backend.prepare_answer, user_question)
+        english_question = fields['english_question']
+        messages = ask_backend.build_mistral_messages(english_question, relevant_rows)
+
+        if _wants_stream(request, data):
+            if answer is not None:
+                tokens = [answer]
+                on_complete = None
+            else:
+                tokens = _until(deadline, llm.stream_chat(
+                    messages, model=ask_backend.MISTRAL_MODEL, temperature=0.3, max_tokens=500, deadline=deadline
+                ))
+                on_complete = lambda text: ask_backend.answer_cache.put(english_question, row_ids, text, relevant_rows)
+            return _sse(astream_answer(fields, relevant_rows, tokens, "Error communicating with Mistral", on_complete))
+
+        if answer is None:
+            try:
+                answer = await asyncio.wait_for(ask_flight.do(
+                    (normalize_question(english_question), tuple(relevant_rows)),
+                    lambda: llm.chat(messages, model=ask_backend.MISTRAL_MODEL, temperature=0.3, max_tokens=500,
+                                     deadline=deadline)
+                ), _remaining(deadline))
+                ask_backend.answer_cache.put(english_question, row_ids, answer, relevant_rows)
+            except LLMError as e:
+                answer = f"Error communicating with Mistral: {e}"
+
+        return JSONResponse({**fields, 'answer': answer})
+
+    except asyncio.TimeoutError:
+        return JSONResponse({'error': 'Request deadline exceeded'}, status_code=504)
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+async def translate_urdu_to_english(text, deadline):
+    """Async counterpart of backend/app.py's translate_urdu_to_english"""
+    translation = chat_backend.urdu_translator.lookup(text)
+    if translation is not None:
+        return translation
+    return await translate_flight.do(normalize_question(text), lambda: _translate_remote(text, deadline))
+
+
+async def _translate_remote(text, deadline):
+    try:
+        chat_backend.urdu_translator.remote_calls += 1
+        translation = await llm.chat(
+            chat_backend.build_translation_messages(text),
+            model=chat_backend.TRANSLATION_MODEL,
+            temperature=0.3,
+            max_tokens=100,
+            read_timeout=10,
+            deadline=deadline
+        )
+    except LLMError as e:
+        print(f"Mistral translation error: {e}")
+        return text
+    chat_backend.urdu_translator.remember(text, translation)
+    return translation
+
+
+async def chat(request):
+    """Async /api/chat"""
+    try:
+        data = await request.json()
+        user_question = data.get('message', '').strip()
+
+        if not user_question:
+            return JSONResponse({'error': 'Empty message'}, status_code=400)
+
+        deadline = _deadline()
+        corpus = await _in_thread(deadline, chat_backend.corpus_loader.get)
+        if corpus is None:
+            return JSONResponse({'error': 'Failed to load data'}, status_code=500)
+
+        # Detect and translate Roman Urdu
+        is_roman_urdu = chat_backend.detect_roman_urdu(user_question)
+        display_question = user_question
+        if is_roman_urdu:
+            user_question = await asyncio.wait_for(translate_urdu_to_english(user_question, deadline), _remaining(deadline))
+
+        fields = {
+            'display_question': display_question,
+            'is_roman_urdu': is_roman_urdu
+        }
+        relevant_data, row_ids, answer = await _in_thread(deadline, chat_backend.find_chat_context, corpus, user_question)
+
+        if answer is None:
+            if not os.getenv('MISTRAL_API_KEY'):
+                return JSONResponse({'error': 'API key not configured'}, status_code=500)
+            messages = [{"role": "user", "content": chat_backend.build_chat_prompt(relevant_data, user_question)}]
+
+        if _wants_stream(request, data):
+            if answer is not None:
+                tokens = [answer]
+                on_complete = None
+            else:
+                tokens = _until(deadline, llm.stream_chat(
+                    messages, model=chat_backend.CHAT_MODEL, temperature=0.3, max_tokens=300,
+                    read_timeout=30, deadline=deadline
+                ))
+                on_complete = lambda text: chat_backend.answer_cache.put(user_question, row_ids, text, relevant_data)
+            return _sse(astream_answer(fields, relevant_data, tokens, chat_backend.ERROR_ANSWER, on_complete))
+
+        if answer is None:
+            try:
+                answer = await asyncio.wait_for(chat_flight.do(
+                    (normalize_question(user_question), tuple(relevant_data)),
+                    lambda: llm.chat(messages, model=chat_backend.CHAT_MODEL, temperature=0.3, max_tokens=300,
+                                     read_timeout=30, deadline=deadline)
+                ), _remaining(deadline))
+                chat_backend.answer_cache.put(user_question, row_ids, answer, relevant_data)
+            except LLMError as e:
+                print(f"Mistral error: {e}")
+                answer = chat_backend.ERROR_ANSWER
+
+        return JSONResponse({**fields, 'answer': answer})
+
+    except asyncio.TimeoutError:
+        return JSONResponse({'error': 'Request deadline exceeded'}, status_code=504)
+    except Exception as e:
+        print(f"Error: {e}")
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+async def ask_bot_batch(request):
+    """Async /api/ask-bot/batch; the batch runs on a worker thread and streams JSON lines"""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    questions, concurrency, error = ask_backend.parse_batch_request(data if isinstance(data, dict) else {})
+    if error is not None:
+        return JSONResponse(error[0], status_code=error[1])
+    # Off the event loop: before warm-up finishes this waits for the first load
+    if await asyncio.to_thread(ask_backend.corpus_loader.get) is None:
+        return JSONResponse({'error': 'Data not loaded'}, status_code=500)
+
+    results = ask_backend.answer_batch(questions, concurrency)
+    return StreamingResponse((json.dumps(result) + '\n' for result in results), media_type='application/x-ndjson')
+
+
+async def edubot(request):
+    """Async /api/edubot"""
+    try:
+        data = await request.json()
+        # handle_edubot makes blocking Mistral calls, so keep it off the event loop
+        payload, status = await asyncio.to_thread(chat_backend.handle_edubot, data)
+        return JSONResponse(payload, status_code=status)
+    except Exception as e:
+        print(f"EduHire AI Error: {e}")
+        return JSONResponse({'answer': chat_backend.EDUBOT_ERROR_ANSWER, 'error': str(e)}, status_code=500)
+
+
+async def delete_edubot_session(request):
+    """Async DELETE /api/edubot/sessions/{session_id}"""
+    session_id = request.path_params['session_id']
+    if not chat_backend.valid_session_id(session_id):
+        return JSONResponse({'error': 'Invalid sessionId'}, status_code=400)
+    chat_backend.session_store.delete(session_id)
+    return JSONResponse({'success': True})
+
+
+async def merit_schemes(request):
+    """Async /api/merit/schemes"""
+    return JSONResponse({'schemes': [scheme.describe() for scheme in chat_backend.merit_schemes.values()]})
+
+
+async def merit(request):
+    """Async /api/merit; scoring runs on a worker thread"""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    payload, status = await asyncio.to_thread(chat_backend.handle_merit, data)
+    return JSONResponse(payload, status_code=status)
+
+
+async def merit_csv(request):
+    """Async /api/merit/csv for a raw text/csv body or a 'file' upload; chunks are scored and written on worker threads"""
+    limit = chat_backend.MAX_MERIT_UPLOAD_MB * 1e6
+    too_large = JSONResponse({'error': f'Uploads are limited to {chat_backend.MAX_MERIT_UPLOAD_MB:g} MB'}, status_code=413)
+    if int(request.headers.get('content-length') or 0) > limit:
+        return too_large
+    if request.headers.get('content-type', '').startswith('multipart/form-data'):
+        # The form parser spools the upload to a temporary file, closed with the form
+        async with request.form(max_files=1) as form:
+            upload = form.get('file')
+            if upload is None or isinstance(upload, str):
+                return JSONResponse({'error': "Send the CSV as a 'file' field or as a text/csv body"}, status_code=400)
+            body = await upload.read()
+    else:
+        body = await request.body()
+    if len(body) > limit:
+        return too_large
+    try:
+        chunks, scheme = await asyncio.to_thread(chat_backend.merit_csv_chunks, io.BytesIO(body), request.query_params)
+    except MeritError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    return StreamingResponse(chunks, media_type='text/csv',
+                             headers={'Content-Disposition': f'attachment; filename=merit-{scheme.key}.csv'})
+
+
+async def health(request):
+    """Async /api/health"""
+    return JSONResponse({**chat_backend.health_status(), **ask_backend.health_status()})
+
+
+async def health_live(request):
+    """Async /api/health/live"""
+    return JSONResponse({'status': 'ok'})
+
+
+async def health_ready(request):
+    """Async /api/health/ready: both backends' data (and the model) loaded"""
+    ready = True
+    details = {}
+    for backend in (chat_backend, ask_backend):
+        backend_ready, backend_details = backend.readiness()
+        if not backend_ready:
+            backend.start_warm_up()
+        ready = ready and backend_ready
+        details.update(backend_details)
+    return JSONResponse({'status': 'ready' if ready else 'warming_up', **details}, status_code=200 if ready else 503)
+
+
+async def metrics(request):
+    """Async /api/metrics"""
+    return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4')
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global llm
+    llm = create_async_client()
+    # Load in the background so the liveness probe answers at once; readiness reports progress
+    ask_backend.start_warm_up()
+    chat_backend.start_warm_up()
+    try:
+        yield
+    finally:
+        await llm.aclose()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/chat', chat, methods=['POST']),
+        Route('/api/ask-bot', ask_bot, methods=['POST']),
+        Route('/api/ask-bot/batch', ask_bot_batch, methods=['POST']),
+        Route('/api/edubot', edubot, methods=['POST']),
+        Route('/api/edubot/sessions/{session_id}', delete_edubot_session, methods=['DELETE']),
+        Route('/api/merit', merit, methods=['POST']),
+        Route('/api/merit/schemes', merit_schemes, methods=['GET']),
+        Route('/api/merit/csv', merit_csv, methods=['POST']),
+        Route('/api/health', health, methods=['GET']),
+        Route('/api/health/live', health_live, methods=['GET']),
+        Route('/api/health/ready', health_ready, methods=['GET']),
+        Route('/api/metrics', metrics, methods=['GET']),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+        Middleware(MetricsMiddleware),
+    ],
+    lifespan=lifespan,
+)
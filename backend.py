@@ -1,59 +1,197 @@
+import json
 import os
-import pandas as pd
-import numpy as np
-from sentence_transformers import SentenceTransformer
-from flask import Flask, request, jsonify
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
-from googletrans import Translator
-import re
+
+from edugate.ann import load_or_build_ivf
+from edugate.answer_cache import AnswerCache, normalize_question
+from edugate.context import ContextPacker
+from edugate.corpus import CorpusLoader, RowCorpus, read_csv_bytes
+from edugate.embedding_cache import EmbeddingCache
+from edugate.encoder import EncoderService
+from edugate.entities import EntityIndex
+from edugate.hybrid import HybridRetriever
+from edugate.lazy import Lazy
+from edugate.lexical import BM25Index
+from edugate.llm import get_client
+from edugate.metrics import instrument_flask, registry, timed
+from edugate.quantize import KINDS as QUANTIZED_KINDS, load_or_build_quantized
+from edugate.retrieval import EmbeddingIndex
+from edugate.singleflight import SingleFlight
+from edugate.sse import sse_response, stream_answer, wants_stream
+from edugate.translation import RomanUrduTranslator, create_translation_cache, vocabulary
+from edugate import urdu_detect
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+instrument_flask(app)
 
-# Initialize models
-model = SentenceTransformer('all-MiniLM-L6-v2')
-translator = Translator()
+MODEL_NAME = 'all-MiniLM-L6-v2'
 
-# Global data storage
-excel_data = []
-embeddings = []
-excel_df = None
+# Bump whenever create_row_text changes its output so cached embeddings are rebuilt
+ROW_TEXT_FORMAT = 'col: value. v1'
 
-def load_excel_data():
-    """Load and process Excel/CSV data"""
-    global excel_data, embeddings, excel_df
-    
-    csv_path = os.path.join(os.path.dirname(__file__), 'src', 'assets', 'asd.csv')
-    
+# 'embedding' uses the sentence transformer, 'bm25' ranks rows lexically without loading it,
+# 'hybrid' runs both and fuses their rankings
+RETRIEVAL_BACKEND = os.getenv('RETRIEVAL_BACKEND', 'embedding').lower()
+USE_EMBEDDINGS = RETRIEVAL_BACKEND in ('embedding', 'hybrid')
+USE_LEXICAL = RETRIEVAL_BACKEND in ('bm25', 'hybrid')
+
+def load_model():
+    """Load the sentence transformer (imports torch; seconds and hundreds of MB)"""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+def load_translator():
+    """Create the Google Translate client"""
+    from googletrans import Translator
+    return Translator()
+
+# Built on first use: with cached row embeddings the model is only needed for the first
+# question, and workers that never see Roman Urdu never create the translator
+model = Lazy(load_model, 'model') if USE_EMBEDDINGS else None
+translator = Lazy(load_translator, 'translator')
+
+def encode(texts):
+    """Embed texts with the sentence transformer, loading it on first use"""
+    return model.get().encode(texts)
+
+# Question embeddings: repeats come from an LRU cache, and concurrent requests wait up to
+# ENCODER_MAX_WAIT_MS to share one encode of at most ENCODER_MAX_BATCH questions
+query_encoder = EncoderService(
+    encode,
+    cache_size=int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '2048')),
+    max_batch=int(os.getenv('ENCODER_MAX_BATCH', '64')),
+    max_wait=float(os.getenv('ENCODER_MAX_WAIT_MS', '5')) / 1000,
+)
+
+embedding_cache = EmbeddingCache(MODEL_NAME, ROW_TEXT_FORMAT)
+
+# Rows scoring at or below these similarities are not sent to the LLM
+SIMILARITY_THRESHOLD = 0.2
+LEXICAL_THRESHOLD = float(os.getenv('LEXICAL_THRESHOLD', '0.1'))
+
+# Number of rows sent to the LLM and the minimum fused score for a row to count
+RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', '3'))
+HYBRID_MIN_SCORE = float(os.getenv('HYBRID_MIN_SCORE', '0'))
+
+# Retrieved rows are rebuilt from the columns the question needs and packed into this many
+# prompt tokens, so RETRIEVAL_TOP_K can grow without growing the prompt; 0 sends full row texts
+context_packer = ContextPacker(
+    budget=int(os.getenv('CONTEXT_TOKEN_BUDGET', '400')),
+    max_cell_tokens=int(os.getenv('CONTEXT_CELL_TOKENS', '48')),
+    drop_columns=[c.strip() for c in os.getenv('CONTEXT_DROP_COLUMNS', 'Source').split(',') if c.strip()],
+)
+
+NO_DATA_ANSWER = "I don't have information about this in the database."
+
+# Answer "test X, field Y" questions straight from the CSV and use the named rows as context otherwise
+ENTITY_LOOKUP = os.getenv('ENTITY_LOOKUP', '1') != '0'
+
+# Repeat and near-duplicate questions over the same rows reuse the previous answer
+answer_cache = AnswerCache(
+    max_size=int(os.getenv('ANSWER_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('ANSWER_CACHE_TTL', '3600')),
+    similarity_threshold=float(os.getenv('ANSWER_CACHE_SIMILARITY', '0.95')),
+    embed=(lambda text: query_encoder.encode([text])[0]) if USE_EMBEDDINGS else None,
+)
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), 'src', 'assets', 'asd.csv')
+
+# 'ivf' switches tables of at least ANN_MIN_ROWS rows to approximate search; smaller ones stay exact.
+# ANN_NLIST clusters (0 picks ~sqrt(rows)) with ANN_NPROBE of them scanned per query: raise it for recall
+ANN_INDEX = os.getenv('ANN_INDEX', 'none').lower()
+ANN_MIN_ROWS = int(os.getenv('ANN_MIN_ROWS', '50000'))
+ANN_NLIST = int(os.getenv('ANN_NLIST', '0'))
+ANN_NPROBE = int(os.getenv('ANN_NPROBE', '8'))
+
+# 'int8' (or 'float16') scans a 4x (2x) smaller copy of the embeddings and rescores the best
+# top_k x EMBEDDING_RESCORE rows against the float32 ones; 'float32' scans those directly
+EMBEDDING_DTYPE = os.getenv('EMBEDDING_DTYPE', 'float32').lower()
+EMBEDDING_RESCORE = int(os.getenv('EMBEDDING_RESCORE', '4'))
+
+# Seconds between checks of the CSV for edits; 0 only reloads on requests and /api/load-data
+CORPUS_WATCH_INTERVAL = float(os.getenv('CORPUS_WATCH_INTERVAL', '5'))
+
+def build_corpus(csv_path=CSV_PATH):
+    """Load and process Excel/CSV data into a new corpus without touching the live one"""
     try:
-        excel_df = pd.read_csv(csv_path)
+        with open(csv_path, 'rb') as f:
+            csv_bytes = f.read()
+        with timed('csv_load'):
+            excel_df = read_csv_bytes(csv_bytes)
         
-        # Convert each row to text
-        excel_data = []
-        for idx, row in excel_df.iterrows():
-            # Create a descriptive text from each row
-            row_text = create_row_text(row)
-            excel_data.append({
-                'index': idx,
-                'text': row_text,
-                'original_row': row.to_dict()
-            })
+        if USE_EMBEDDINGS:
+            # Reuse cached row texts and embeddings when the CSV has not changed
+            cached = embedding_cache.load(csv_bytes)
+            if cached:
+                texts, embeddings = cached
+            else:
+                # Convert each row to text
+                with timed('row_text'):
+                    texts = [create_row_text(row) for _, row in excel_df.iterrows()]
+                with timed('embed_rows'):
+                    embeddings = embedding_cache.store(csv_bytes, texts, encode)
+                # Serve from the files just written so every worker maps the same pages
+                texts, embeddings = embedding_cache.load(csv_bytes) or (texts, embeddings)
+        else:
+            with timed('row_text'):
+                texts = [create_row_text(row) for _, row in excel_df.iterrows()]
         
-        # Create embeddings
-        texts = [item['text'] for item in excel_data]
-        embeddings = model.encode(texts)
+        corpus = RowCorpus(texts)
+        scorers = {}
+        if USE_EMBEDDINGS:
+            corpus.embeddings = embeddings
+            corpus.embedding_index = create_embedding_index(embeddings, csv_bytes)
+            scorers['embedding'] = partial(embedding_scorer, corpus)
+        if USE_LEXICAL:
+            corpus.lexical_index = BM25Index(corpus.texts)
+            scorers['bm25'] = partial(lexical_scorer, corpus)
+        corpus.retriever = HybridRetriever(corpus.texts, scorers, top_k=RETRIEVAL_TOP_K, min_score=HYBRID_MIN_SCORE)
+        corpus.entities = EntityIndex(excel_df)
         
-        print(f"✓ Loaded {len(excel_data)} rows from CSV")
-        return True
+        print(f"✓ Loaded {len(corpus)} rows from CSV")
+        return corpus
     except Exception as e:
         print(f"✗ Error loading Excel: {str(e)}")
-        return False
+        return None
+
+def create_embedding_index(embeddings, csv_bytes):
+    """Exact index for small tables, IVF (persisted next to the embeddings) for large ones"""
+    if ANN_INDEX == 'ivf' and len(embeddings) >= ANN_MIN_ROWS:
+        return load_or_build_ivf(embeddings, embedding_cache.cache_dir, embedding_cache.key(csv_bytes),
+                                 nlist=ANN_NLIST or None, nprobe=ANN_NPROBE)
+    # The embedding cache hands out unit-length rows
+    if EMBEDDING_DTYPE in QUANTIZED_KINDS:
+        return load_or_build_quantized(embeddings, embedding_cache.cache_dir, embedding_cache.key(csv_bytes),
+                                       kind=EMBEDDING_DTYPE, rescore=EMBEDDING_RESCORE, normalized=True)
+    return EmbeddingIndex(embeddings, normalized=True)
+
+def publish_corpus(corpus):
+    """Refresh state derived from the data once a new corpus is live"""
+    # Answers built from the previous data are no longer valid
+    answer_cache.clear()
+    
+    # Words from the data pass through the offline Roman Urdu translator untouched
+    urdu_translator.known_terms = vocabulary(corpus.texts)
+
+# Built once, then rebuilt in the background and swapped in when the CSV changes
+corpus_loader = CorpusLoader(CSV_PATH, build_corpus, on_publish=publish_corpus, watch_interval=CORPUS_WATCH_INTERVAL)
+
+def load_excel_data():
+    """Load or reload the CSV now; concurrent calls share one rebuild"""
+    return corpus_loader.reload()
 
 def create_row_text(row):
     """Convert a DataFrame row into readable text"""
+    import pandas as pd
+    
     text_parts = []
     
     for col, value in row.items():
@@ -67,75 +205,82 @@ def create_row_text(row):
 
 def is_roman_urdu(text):
     """Detect if text is Roman Urdu (contains Urdu words written in Latin script)"""
-    roman_urdu_patterns = [
-        r'\b(kya|hai|hain|ki|ka|ke|se|ko|ek|aur|ya|nahi|nahi|hai|haan)\b',
-        r'(ay|ain|ee|oo|aa)\b',
-        r'\b(test|exam|fees|passing|marks|date|fields|topics|rules)\b'
-    ]
-    
-    text_lower = text.lower()
-    for pattern in roman_urdu_patterns:
-        if re.search(pattern, text_lower):
-            return True
-    return False
+    return urdu_detect.is_roman_urdu(text)
+
+def google_translate(text):
+    """Translate Roman Urdu to English with Google Translate"""
+    try:
+        translated = translator.get().translate(text, src_lang='ur', dest_lang='en')
+        return translated['text']
+    except:
+        # If translation fails, return original
+        return text
+
+# Cached and phrase-table translations skip the Google Translate round trip
+urdu_translator = RomanUrduTranslator(google_translate, Lazy(create_translation_cache, 'translation_cache'))
+
+# Counters the answer cache and translator already keep, reported at /api/metrics
+registry.counter_func('answer_cache_total', lambda: answer_cache.hits, backend='ask-bot', result='hit')
+registry.counter_func('answer_cache_total', lambda: answer_cache.misses, backend='ask-bot', result='miss')
+registry.counter_func('translations_total', lambda: urdu_translator.cache_hits, backend='ask-bot', source='cache')
+registry.counter_func('translations_total', lambda: urdu_translator.local_hits, backend='ask-bot', source='phrase_table')
+registry.counter_func('translations_total', lambda: urdu_translator.remote_calls, backend='ask-bot', source='remote')
+registry.counter_func('coalesced_calls_total', lambda: urdu_translator.inflight.coalesced, backend='ask-bot', call='translate')
+registry.counter_func('query_embeddings_total', lambda: query_encoder.cache_hits, backend='ask-bot', source='cache')
+registry.counter_func('query_embeddings_total', lambda: query_encoder.encoded, backend='ask-bot', source='model')
+registry.counter_func('encoder_batches_total', lambda: query_encoder.batches, backend='ask-bot')
 
 def translate_roman_urdu_to_english(text):
     """Translate Roman Urdu to English"""
     if is_roman_urdu(text):
-        try:
-            translated = translator.translate(text, src_lang='ur', dest_lang='en')
-            return translated['text']
-        except:
-            # If translation fails, return original
-            return text
+        with timed('translate'):
+            return urdu_translator.translate(text)
     return text
 
-def search_relevant_rows(question, top_k=3):
+def embedding_scorer(corpus, questions, top_k):
+    """Rank rows by cosine similarity to the question embeddings"""
+    question_embeddings = query_encoder.encode(questions)
+    return corpus.embedding_index.search(question_embeddings, top_k=top_k, threshold=SIMILARITY_THRESHOLD)
+
+def lexical_scorer(corpus, questions, top_k):
+    """Rank rows by normalized BM25 score"""
+    return [corpus.lexical_index.search(q, top_k=top_k, threshold=LEXICAL_THRESHOLD) for q in questions]
+
+def retrieve_rows_batch(questions, top_k=RETRIEVAL_TOP_K, corpus=None):
+    """Scored, de-duplicated rows for each question from every configured scorer"""
+    questions = list(questions)
+    corpus = corpus or corpus_loader.get()
+    if corpus is None or not questions:
+        return [[] for _ in questions]
+    with timed('retrieval'):
+        return corpus.retriever.search_batch(questions, top_k=top_k)
+
+def search_relevant_rows(question, top_k=RETRIEVAL_TOP_K):
     """Find the most relevant rows from Excel based on the question"""
-    global excel_data, embeddings, model
-    
-    # Get embedding of the question
-    question_embedding = model.encode([question])[0]
-    
-    # Calculate similarity with all rows
-    similarities = []
-    for i, row_embedding in enumerate(embeddings):
-        # Cosine similarity
-        similarity = np.dot(question_embedding, row_embedding) / (
-            np.linalg.norm(question_embedding) * np.linalg.norm(row_embedding)
-        )
-        similarities.append((i, similarity))
-    
-    # Sort by similarity and get top_k
-    similarities.sort(key=lambda x: x[1], reverse=True)
-    top_indices = [i for i, _ in similarities[:top_k]]
-    
-    relevant_rows = [excel_data[i]['text'] for i in top_indices if similarities[top_indices.index(i)][1] > 0.2]
-    
-    return relevant_rows
+    return search_relevant_rows_batch([question], top_k=top_k)[0]
 
-def ask_mistral(question, relevant_data):
-    """Query Mistral API with relevant Excel data"""
-    try:
-        from mistralai.client import MistralClient
-        from mistralai.models.chat_message import ChatMessage
-        
-        api_key = os.getenv('MISTRAL_API_KEY')
-        if not api_key:
-            return "Error: Mistral API key not configured"
-        
-        client = MistralClient(api_key=api_key)
-        
-        # Prepare the context
-        context = "\n".join(relevant_data) if relevant_data else "No relevant data found"
-        
-        system_prompt = """You are an education assistant chatbot. Answer questions ONLY based on the provided Excel data about entry tests and universities. 
+def search_relevant_rows_batch(questions, top_k=RETRIEVAL_TOP_K):
+    """Find the most relevant rows for several questions in one pass"""
+    return [[row['text'] for row in rows] for rows in retrieve_rows_batch(questions, top_k=top_k)]
+
+MISTRAL_MODEL = "mistralai/devstral-2512"
+
+# Concurrent identical LLM calls, keyed by normalized question and context rows
+llm_flight = SingleFlight()
+registry.counter_func('coalesced_calls_total', lambda: llm_flight.coalesced, backend='ask-bot', call='llm')
+
+def build_mistral_messages(question, relevant_data):
+    """Build the system and user messages for a question and its context rows"""
+    # Prepare the context
+    context = "\n".join(relevant_data) if relevant_data else "No relevant data found"
+    
+    system_prompt = """You are an education assistant chatbot. Answer questions ONLY based on the provided Excel data about entry tests and universities. 
         
 If the answer is not found in the provided data, clearly state: "I don't have information about this in the database."
 
 Be concise and helpful. Provide accurate information only."""
-        
-        user_message = f"""Based on the following Excel data about entry tests and universities, answer this question:
+    
+    user_message = f"""Based on the following Excel data about entry tests and universities, answer this question:
 
 Data:
 {context}
@@ -143,24 +288,207 @@ Data:
 Question: {question}
 
 Provide a clear, concise answer based only on the data provided above."""
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message}
+    ]
+
+def ask_mistral(question, relevant_data):
+    """Query Mistral API with relevant Excel data"""
+    try:
+        api_key = os.getenv('MISTRAL_API_KEY')
+        if not api_key:
+            return "Error: Mistral API key not configured"
         
-        messages = [
-            ChatMessage(role="system", content=system_prompt),
-            ChatMessage(role="user", content=user_message)
-        ]
-        
-        response = client.chat(
-            model="mistralai/devstral-2512",
-            messages=messages,
+        # Identical questions over the same rows arriving together share one call
+        return llm_flight.do(
+            (normalize_question(question), tuple(relevant_data)),
+            get_client().chat,
+            build_mistral_messages(question, relevant_data),
+            model=MISTRAL_MODEL,
             temperature=0.3,
             max_tokens=500
         )
-        
-        return response.choices[0].message.content
     
     except Exception as e:
         return f"Error communicating with Mistral: {str(e)}"
 
+def ask_mistral_stream(question, relevant_data):
+    """Yield Mistral's answer fragments as they arrive"""
+    return get_client().stream_chat(
+        build_mistral_messages(question, relevant_data),
+        model=MISTRAL_MODEL,
+        temperature=0.3,
+        max_tokens=500
+    )
+
+def prepare_answer(user_question):
+    """Translate, retrieve and check the answer cache for one question
+    
+    Returns the response fields, the context rows and their IDs, and the
+    answer when it is already known (nothing relevant, or cached). An
+    answer of None means Mistral still has to be asked.
+    """
+    return prepare_answers_batch([user_question])[0]
+
+def prepare_answers_batch(user_questions):
+    """prepare_answer for many questions with one batched retrieval pass"""
+    fields_batch = []
+    for user_question in user_questions:
+        # Detect and translate Roman Urdu if needed
+        translation_note = ""
+        if is_roman_urdu(user_question):
+            english_question = translate_roman_urdu_to_english(user_question)
+            translation_note = f"(Translated from Roman Urdu: {english_question})"
+        else:
+            english_question = user_question
+        fields_batch.append({
+            'success': True,
+            'original_question': user_question,
+            'english_question': english_question,
+            'translation_note': translation_note
+        })
+    
+    corpus = corpus_loader.get()
+    
+    # Questions naming a test are answered or narrowed by the entity index
+    lookups = []
+    with timed('entity_lookup'):
+        for fields in fields_batch:
+            rows, columns, exact = [], [], False
+            if ENTITY_LOOKUP and corpus is not None:
+                rows, columns, exact = corpus.entities.lookup(fields['english_question'])
+            lookups.append((rows[:RETRIEVAL_TOP_K], columns, corpus.entities.answer(rows, columns) if exact else None))
+    
+    # Search for relevant rows: one encode and one matrix product for the rest of the batch
+    pending = [fields['english_question'] for fields, (rows, _, _) in zip(fields_batch, lookups) if not rows]
+    retrieved = iter(retrieve_rows_batch(pending, corpus=corpus))
+    
+    prepared = []
+    for fields, (entity_rows, columns, direct_answer) in zip(fields_batch, lookups):
+        if entity_rows:
+            row_ids = entity_rows
+        else:
+            row_ids = [row['index'] for row in next(retrieved)]
+        relevant_rows, row_ids = build_context(corpus, row_ids, columns)
+        
+        # Only call Mistral when some row is actually relevant and the answer is not known
+        if direct_answer is not None:
+            answer = direct_answer
+        elif not relevant_rows:
+            answer = NO_DATA_ANSWER
+        else:
+            answer = answer_cache.get(fields['english_question'], row_ids, relevant_rows)
+        prepared.append(({**fields, 'direct_answer': direct_answer is not None}, relevant_rows, row_ids, answer))
+    return prepared
+
+def build_context(corpus, row_ids, columns=()):
+    """Context lines for the prompt and the IDs of the rows they include"""
+    if not row_ids:
+        return [], []
+    if context_packer.budget <= 0:
+        return [corpus.texts[i] for i in row_ids], list(row_ids)
+    with timed('context_pack'):
+        return context_packer.pack(corpus.entities, row_ids, columns)
+
+def ask_mistral_cached(english_question, relevant_rows, row_ids):
+    """ask_mistral, storing successful answers in the answer cache"""
+    answer = ask_mistral(english_question, relevant_rows)
+    if not answer.startswith('Error'):
+        answer_cache.put(english_question, row_ids, answer, relevant_rows)
+    return answer
+
+# Batch answering; keep concurrency at or below LLM_MAX_CONCURRENCY so calls do not queue for a slot
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', os.getenv('LLM_MAX_CONCURRENCY', '8')))
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '256'))
+MAX_BATCH_QUESTIONS = int(os.getenv('MAX_BATCH_QUESTIONS', '1000'))
+
+def parse_batch_request(data):
+    """(questions, concurrency, error) of a batch request; error is (payload, status) when it is invalid"""
+    questions = data.get('questions')
+    if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+        return None, None, ({'error': 'questions must be a list of strings'}, 400)
+    if len(questions) > MAX_BATCH_QUESTIONS:
+        return None, None, ({'error': f'At most {MAX_BATCH_QUESTIONS} questions per request'}, 413)
+    concurrency = data.get('concurrency', BATCH_CONCURRENCY)
+    if isinstance(concurrency, bool) or not isinstance(concurrency, (int, str)) or not str(concurrency).strip().isdigit() \
+            or int(concurrency) < 1:
+        return None, None, ({'error': 'concurrency must be a positive integer'}, 400)
+    return [q.strip() for q in questions], min(int(concurrency), BATCH_CONCURRENCY), None
+
+def answer_batch(user_questions, concurrency=BATCH_CONCURRENCY, chunk_size=BATCH_CHUNK_SIZE):
+    """Yield one result dict per question, in input order
+    
+    Questions are retrieved chunk_size at a time with one batched encode.
+    Questions that translate to the same text and retrieve the same rows
+    share one Mistral call, and at most `concurrency` calls are in flight.
+    The next chunk is retrieved and submitted before the current one is
+    drained, so retrieval overlaps with waiting on the LLM. Blank questions
+    get {'index', 'error'}, as /api/ask-bot answers them with a 400, and
+    are never retrieved or sent to Mistral.
+    """
+    def submit(start, chunk):
+        jobs = []
+        for fields, relevant_rows, row_ids, answer in prepare_answers_batch(chunk):
+            future = None
+            if answer is None:
+                key = (normalize_question(fields['english_question']), tuple(row_ids))
+                future = inflight.get(key)
+                if future is None:
+                    future = pool.submit(ask_mistral_cached, fields['english_question'], relevant_rows, row_ids)
+                    inflight[key] = future
+            jobs.append((fields, row_ids, answer, future))
+        return start, jobs
+    
+    def drain_answers(start, jobs):
+        for offset, (fields, row_ids, answer, future) in enumerate(jobs):
+            if future is not None:
+                answer = future.result()
+                inflight.pop((normalize_question(fields['english_question']), tuple(row_ids)), None)
+            yield {'index': start + offset, **fields, 'row_ids': row_ids, 'answer': answer}
+    
+    def drain(start, jobs):
+        for result in drain_answers(start, jobs):
+            # Report the blank questions that came before this one, in place
+            while blanks and blanks[0] < positions[result['index']]:
+                yield {'index': blanks.pop(0), 'error': 'Empty question'}
+            yield {**result, 'index': positions[result['index']]}
+    
+    inflight = {}
+    pending = None
+    positions = []
+    blanks = []
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        chunk = []
+        start = 0
+        for position, user_question in enumerate(user_questions):
+            if not user_question.strip():
+                blanks.append(position)
+                continue
+            positions.append(position)
+            chunk.append(user_question)
+            if len(chunk) == chunk_size:
+                submitted = submit(start, chunk)
+                if pending is not None:
+                    yield from drain(*pending)
+                pending = submitted
+                start += len(chunk)
+                chunk = []
+        if chunk:
+            submitted = submit(start, chunk)
+            if pending is not None:
+                yield from drain(*pending)
+            pending = submitted
+        if pending is not None:
+            yield from drain(*pending)
+        for position in blanks:
+            yield {'index': position, 'error': 'Empty question'}
+    finally:
+        # A consumer that stops early (e.g. a dropped connection) cancels the queued calls
+        pool.shutdown(wait=False, cancel_futures=True)
+
 @app.route('/api/ask-bot', methods=['POST'])
 def ask_bot():
     """Handle chat requests"""
@@ -171,63 +499,147 @@ def ask_bot():
         if not user_question:
             return jsonify({'error': 'Empty question'}), 400
         
-        if not excel_data:
+        if corpus_loader.get() is None:
             return jsonify({'error': 'Data not loaded'}), 500
         
-        # Detect and translate Roman Urdu if needed
-        translation_note = ""
-        if is_roman_urdu(user_question):
-            english_question = translate_roman_urdu_to_english(user_question)
-            translation_note = f"(Translated from Roman Urdu: {english_question})"
-        else:
-            english_question = user_question
+        fields, relevant_rows, row_ids, answer = prepare_answer(user_question)
+        english_question = fields['english_question']
         
-        # Search for relevant rows
-        relevant_rows = search_relevant_rows(english_question, top_k=3)
+        if wants_stream(data):
+            if answer is not None:
+                tokens = [answer]
+                on_complete = None
+            else:
+                tokens = ask_mistral_stream(english_question, relevant_rows)
+                on_complete = lambda text: answer_cache.put(english_question, row_ids, text, relevant_rows)
+            return sse_response(stream_answer(
+                fields, relevant_rows, tokens,
+                fallback_answer="Error communicating with Mistral",
+                on_complete=on_complete
+            ))
         
-        # Get answer from Mistral
-        answer = ask_mistral(english_question, relevant_rows)
+        if answer is None:
+            answer = ask_mistral_cached(english_question, relevant_rows, row_ids)
         
-        return jsonify({
-            'success': True,
-            'original_question': user_question,
-            'english_question': english_question,
-            'translation_note': translation_note,
-            'answer': answer
-        })
+        return jsonify({**fields, 'answer': answer})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/ask-bot/batch', methods=['POST'])
+def ask_bot_batch():
+    """Answer a list of questions, streaming one JSON line per question"""
+    data = request.get_json(silent=True)
+    questions, concurrency, error = parse_batch_request(data if isinstance(data, dict) else {})
+    if error is not None:
+        return jsonify(error[0]), error[1]
+    if corpus_loader.get() is None:
+        return jsonify({'error': 'Data not loaded'}), 500
+    
+    lines = (json.dumps(result) + '\n' for result in answer_batch(questions, concurrency))
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
 @app.route('/api/load-data', methods=['GET'])
 def load_data():
     """Initialize and load Excel data"""
     try:
         if load_excel_data():
+            corpus = corpus_loader.get()
             return jsonify({
                 'success': True,
-                'message': f'Loaded {len(excel_data)} entries from CSV',
-                'data_count': len(excel_data)
+                'message': f'Loaded {len(corpus)} entries from CSV',
+                'data_count': len(corpus),
+                'data_version': corpus.version
             })
         else:
             return jsonify({'error': 'Failed to load data'}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def warm_up():
+    """Load the model, translator and data now instead of on first use; True when ready"""
+    try:
+        if model is not None:
+            model.get()
+    except Exception as e:
+        print(f"✗ Error loading model: {e}")
+    try:
+        translator.get()
+    except Exception as e:
+        print(f"✗ Error creating translator: {e}")
+    corpus_loader.get()
+    return readiness()[0]
+
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+
+def start_warm_up():
+    """Run warm_up on a background thread unless one is already running"""
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None or not _warm_up_thread.is_alive():
+            _warm_up_thread = threading.Thread(target=warm_up, daemon=True, name='warm-up')
+            _warm_up_thread.start()
+
+def readiness():
+    """Whether requests can be served without a load stall, and what is missing"""
+    data_loaded = corpus_loader.status()['rows'] > 0
+    model_loaded = model.loaded if model is not None else None
+    return data_loaded and model_loaded is not False, {'data_loaded': data_loaded, 'model_loaded': model_loaded}
+
+def health_status():
+    """Health check payload"""
+    corpus = corpus_loader.status()
+    return {
+        'status': 'ok',
+        'ready': readiness()[0],
+        'data_loaded': corpus['rows'] > 0,
+        'data_count': corpus['rows'],
+        'data_version': corpus['version'],
+        'data_loaded_at': corpus['loaded_at'],
+        'data_reloading': corpus['reloading'],
+        'data_error': corpus['last_error'],
+        'model': model.status() if model is not None else None,
+        'encoder': query_encoder.stats() if USE_EMBEDDINGS else None,
+        'translator': translator.status()
+    }
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'ok',
-        'data_loaded': len(excel_data) > 0,
-        'data_count': len(excel_data)
-    })
+    return jsonify(health_status())
+
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """Liveness probe: the process answers; never waits on or starts any loading"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness probe: 503 (and a background warm-up) until data and model are loaded"""
+    ready, details = readiness()
+    if not ready:
+        start_warm_up()
+    return jsonify({'status': 'ready' if ready else 'warming_up', **details}), 200 if ready else 503
+
+# Probes and metrics must answer while the first load is still running
+NO_LOAD_ENDPOINTS = {'health_live', 'health_ready', 'metrics'}
 
 @app.before_request
 def initialize():
-    """Initialize data on first request"""
-    if not excel_data:
-        load_excel_data()
+    """Initialize data on first request and pick up CSV edits"""
+    if request.endpoint in NO_LOAD_ENDPOINTS:
+        return
+    corpus_loader.get()
+
+def after_fork():
+    """Give a forked worker its own watcher thread, SQLite handle and encoder queue"""
+    corpus_loader.after_fork()
+    query_encoder.after_fork()
+    urdu_translator.after_fork()
+
+# Pre-forking servers (gunicorn --preload) copy the warmed-up master into every worker
+os.register_at_fork(after_in_child=after_fork)
 
 if __name__ == '__main__':
     load_excel_data()
@@ -1,25 +1,86 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import pandas as pd
+import io
+import itertools
+import json
 import os
-import requests
+import sys
 from urllib.parse import quote
-import re
 from dotenv import load_dotenv
 
+# Shared helpers live in the repo-level edugate package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edugate.answer_cache import AnswerCache, normalize_question
+from edugate.context import ContextPacker
+from edugate.corpus import CorpusLoader, KeywordCorpus, read_csv_bytes
+from edugate.entities import EntityIndex
+from edugate.hybrid import HybridRetriever
+from edugate.keywords import KeywordMatcher
+from edugate.lazy import Lazy
+from edugate.llm import LLMError, get_client
+from edugate.merit import (COMPONENT_LABELS, MeritError, canonical_column, get_scheme, load_schemes, parse_marks,
+                           program_summary, rank, score_csv, to_records)
+from edugate.metrics import instrument_flask, registry, timed
+from edugate.sessions import create_session_store, valid_session_id
+from edugate.singleflight import SingleFlight, SingleFlightTimeout
+from edugate.sse import sse_response, stream_answer, wants_stream
+from edugate.translation import RomanUrduTranslator, create_translation_cache, vocabulary
+from edugate import urdu_detect
+
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+instrument_flask(app)
 
 # Load Excel data
-EXCEL_FILE = "../public/assets/Entry_Test_FAQ.csv"
+EXCEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'public', 'assets', 'Entry_Test_FAQ.csv')
+
+# 'jaccard' keeps simple_similarity scoring, 'bm25' uses the weighted lexical index,
+# 'hybrid' runs both and fuses their rankings
+KEYWORD_RANKER = os.getenv('KEYWORD_RANKER', 'jaccard').lower()
+
+# Rows scoring at or below these similarities are not sent to the LLM
+RELEVANCE_THRESHOLD = float(os.getenv('RELEVANCE_THRESHOLD', '0.1'))
+LEXICAL_THRESHOLD = float(os.getenv('LEXICAL_THRESHOLD', '0.1'))
+
+# Number of rows sent to the LLM and the minimum fused score for a row to count
+RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', '3'))
+HYBRID_MIN_SCORE = float(os.getenv('HYBRID_MIN_SCORE', '0'))
+
+CHAT_MODEL = "mistralai/devstral-2512"
+TRANSLATION_MODEL = "mistral-small-latest"
+
+# Answer "test X, field Y" questions straight from the CSV and use the named rows as context otherwise
+ENTITY_LOOKUP = os.getenv('ENTITY_LOOKUP', '1') != '0'
+
+# Retrieved rows are rebuilt from the columns the question needs and packed into this many
+# prompt tokens, so RETRIEVAL_TOP_K can grow without growing the prompt; 0 sends full row texts
+context_packer = ContextPacker(
+    budget=int(os.getenv('CONTEXT_TOKEN_BUDGET', '400')),
+    max_cell_tokens=int(os.getenv('CONTEXT_CELL_TOKENS', '48')),
+    drop_columns=[c.strip() for c in os.getenv('CONTEXT_DROP_COLUMNS', 'Source').split(',') if c.strip()],
+)
+
+NOT_FOUND_ANSWER = 'I could not find relevant information about your question in the available data. Please rephrase your question.'
+ERROR_ANSWER = "Sorry, I encountered an error while processing your question."
 
-def load_excel_data():
+# Repeat questions over the same rows reuse the previous answer
+answer_cache = AnswerCache(
+    max_size=int(os.getenv('ANSWER_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('ANSWER_CACHE_TTL', '3600')),
+)
+
+# Concurrent identical LLM calls, keyed by normalized question and context rows
+llm_flight = SingleFlight()
+
+def load_excel_data(path=EXCEL_FILE):
     """Load and process Excel data"""
     try:
-        df = pd.read_csv(EXCEL_FILE)
+        with timed('csv_load'), open(path, 'rb') as f:
+            df = read_csv_bytes(f.read())
         # Convert all data to strings
         df = df.astype(str)
         return df
@@ -27,6 +88,35 @@ def load_excel_data():
         print(f"Error loading Excel: {e}")
         return None
 
+def build_corpus(path):
+    """Parse the CSV and precompute row texts and the token index"""
+    df = load_excel_data(path)
+    if df is None:
+        return None
+    corpus = KeywordCorpus(df, convert_row_to_text, with_bm25=KEYWORD_RANKER in ('bm25', 'hybrid'))
+    
+    scorers = {}
+    if KEYWORD_RANKER in ('jaccard', 'hybrid'):
+        scorers['jaccard'] = lambda questions, top_k: [
+            corpus.jaccard_search(q, top_k=top_k, threshold=RELEVANCE_THRESHOLD) for q in questions
+        ]
+    if corpus.bm25 is not None:
+        scorers['bm25'] = lambda questions, top_k: [
+            corpus.bm25.search(q, top_k=top_k, threshold=LEXICAL_THRESHOLD) for q in questions
+        ]
+    corpus.retriever = HybridRetriever(corpus.texts, scorers, top_k=RETRIEVAL_TOP_K, min_score=HYBRID_MIN_SCORE)
+    corpus.entities = EntityIndex(df)
+    print(f"Loaded {len(corpus)} rows from {os.path.basename(path)}")
+    return corpus
+
+def publish_corpus(corpus):
+    """Refresh state derived from the data once a new corpus is live"""
+    # Answers built from the previous data are no longer valid
+    answer_cache.clear()
+    
+    # Words from the data pass through the offline Roman Urdu translator untouched
+    urdu_translator.known_terms = vocabulary(corpus.texts)
+
 def simple_similarity(text1, text2):
     """Calculate simple similarity between two texts based on keyword matching"""
     words1 = set(text1.lower().split())
@@ -42,6 +132,7 @@ def simple_similarity(text1, text2):
 
 def convert_row_to_text(row):
     """Convert a row into readable text format"""
+    import pandas as pd
     text_parts = []
     for col, value in row.items():
         if pd.notna(value) and value != 'nan':
@@ -49,7 +140,19 @@ def convert_row_to_text(row):
             text_parts.append(f"{col} is {value}")
     return ". ".join(text_parts) + "."
 
-def translate_urdu_to_english(text):
+# Built on first use, then rebuilt in the background and swapped in when the CSV's mtime changes
+CORPUS_WATCH_INTERVAL = float(os.getenv('CORPUS_WATCH_INTERVAL', '5'))
+corpus_loader = CorpusLoader(EXCEL_FILE, build_corpus, on_publish=publish_corpus, watch_interval=CORPUS_WATCH_INTERVAL)
+
+def build_translation_messages(text):
+    """Build the Mistral messages that translate Roman Urdu to English"""
+    prompt = f"""Translate this Roman Urdu text to English. Only provide the English translation, nothing else.
+
+Roman Urdu: {text}
+English:"""
+    return [{"role": "user", "content": prompt}]
+
+def mistral_translate(text):
     """Translate Roman Urdu to English using Mistral API"""
     api_key = os.getenv('MISTRAL_API_KEY')
     if not api_key:
@@ -57,48 +160,88 @@ def translate_urdu_to_english(text):
         return text
     
     try:
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        prompt = f"""Translate this Roman Urdu text to English. Only provide the English translation, nothing else.
-
-Roman Urdu: {text}
-English:"""
-        
-        payload = {
-            "model": "mistral-small-latest",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.3,
-            "max_tokens": 100
-        }
-        
-        response = requests.post(
-            "https://api.mistral.ai/v1/chat/completions",
-            json=payload,
-            headers=headers,
-            timeout=10
+        return get_client().chat(
+            build_translation_messages(text),
+            model=TRANSLATION_MODEL,
+            temperature=0.3,
+            max_tokens=100,
+            read_timeout=10
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            translated = result['choices'][0]['message']['content'].strip()
-            return translated
-        else:
-            print(f"Mistral translation error: {response.status_code}")
-            return text
+    except LLMError as e:
+        print(f"Mistral translation error: {e}")
+        return text
     except Exception as e:
         print(f"Translation error: {e}")
         return text
 
+# Cached and phrase-table translations skip the Mistral round trip
+urdu_translator = RomanUrduTranslator(mistral_translate, Lazy(create_translation_cache, 'translation_cache'))
+
+# Counters the answer cache and translator already keep, reported at /api/metrics
+registry.counter_func('answer_cache_total', lambda: answer_cache.hits, backend='chat', result='hit')
+registry.counter_func('answer_cache_total', lambda: answer_cache.misses, backend='chat', result='miss')
+registry.counter_func('translations_total', lambda: urdu_translator.cache_hits, backend='chat', source='cache')
+registry.counter_func('translations_total', lambda: urdu_translator.local_hits, backend='chat', source='phrase_table')
+registry.counter_func('translations_total', lambda: urdu_translator.remote_calls, backend='chat', source='remote')
+registry.counter_func('coalesced_calls_total', lambda: llm_flight.coalesced, backend='chat', call='llm')
+registry.counter_func('coalesced_calls_total', lambda: urdu_translator.inflight.coalesced, backend='chat', call='translate')
+
+def translate_urdu_to_english(text):
+    """Translate Roman Urdu to English, calling Mistral only when needed"""
+    with timed('translate'):
+        return urdu_translator.translate(text)
+
+def build_chat_prompt(relevant_data, question):
+    """Build the Mistral prompt from the retrieved rows and the question"""
+    context = "\n".join(relevant_data)
+    return f"""You are a helpful assistant that answers questions based ONLY on the provided data.
+
+Data:
+{context}
+
+Answer the following question based ONLY on the data provided above. If the answer is not in the data, clearly state that the information is not available.
+
+Question: {question}
+Answer:"""
+
 def detect_roman_urdu(text):
-    """Simple detection of Roman Urdu (contains Urdu words/patterns)"""
-    roman_urdu_patterns = ['ki', 'kya', 'hain', 'hai', 'kya hain', 'se', 'tak', 'aur', 'ya']
-    text_lower = text.lower()
-    return any(pattern in text_lower for pattern in roman_urdu_patterns)
+    """Detection of Roman Urdu by function words and a character trigram model"""
+    return urdu_detect.is_roman_urdu(text)
+
+def find_chat_context(corpus, user_question):
+    """Retrieve rows for an English question and check the answer cache
+    
+    Returns the context rows, their IDs and the answer when it is already
+    known; None means Mistral still has to be asked.
+    """
+    # A question naming a test is answered from, or limited to, that test's rows
+    with timed('entity_lookup'):
+        entity_rows, columns, exact = corpus.entities.lookup(user_question) if ENTITY_LOOKUP else ([], [], False)
+    if entity_rows:
+        relevant_data, row_ids = build_context(corpus, entity_rows[:RETRIEVAL_TOP_K], columns)
+        direct_answer = corpus.entities.answer(entity_rows, columns) if exact else None
+        if direct_answer is not None:
+            return relevant_data, row_ids, direct_answer
+        return relevant_data, row_ids, answer_cache.get(user_question, row_ids, relevant_data)
+    
+    # Find the top rows sharing keywords with the question
+    print("Searching for relevant data...")
+    with timed('retrieval'):
+        rows = corpus.retriever.search(user_question)
+    relevant_data, row_ids = build_context(corpus, [row['index'] for row in rows], columns)
+    
+    if not relevant_data:
+        return relevant_data, row_ids, NOT_FOUND_ANSWER
+    return relevant_data, row_ids, answer_cache.get(user_question, row_ids, relevant_data)
+
+def build_context(corpus, row_ids, columns=()):
+    """Context lines for the prompt and the IDs of the rows they include"""
+    if not row_ids:
+        return [], []
+    if context_packer.budget <= 0:
+        return [corpus.texts[i] for i in row_ids], list(row_ids)
+    with timed('context_pack'):
+        return context_packer.pack(corpus.entities, row_ids, columns)
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
@@ -111,8 +254,8 @@ def chat():
             return jsonify({'error': 'Empty message'}), 400
         
         # Load Excel data
-        df = load_excel_data()
-        if df is None:
+        corpus = corpus_loader.get()
+        if corpus is None:
             return jsonify({'error': 'Failed to load data'}), 500
         
         # Detect and translate Roman Urdu
@@ -124,164 +267,161 @@ def chat():
             user_question = translate_urdu_to_english(user_question)
             print(f"Translated to: {user_question}")
         
-        # Convert all rows to text
-        row_texts = []
-        for idx, row in df.iterrows():
-            text = convert_row_to_text(row)
-            row_texts.append(text)
-        
-        # Find similar rows using simple keyword matching
-        print("Searching for relevant data...")
-        similarities = []
-        for text in row_texts:
-            sim = simple_similarity(user_question, text)
-            similarities.append(sim)
-        
-        # Get top 3 matching rows
-        similarities = list(similarities)
-        top_indices = sorted(range(len(similarities)), key=lambda i: similarities[i], reverse=True)[:3]
-        
-        # Filter by relevance threshold
-        relevant_threshold = 0.1
-        relevant_data = []
-        for idx in top_indices:
-            if similarities[idx] > relevant_threshold:
-                relevant_data.append(row_texts[idx])
-        
-        if not relevant_data:
-            return jsonify({
-                'answer': 'I could not find relevant information about your question in the available data. Please rephrase your question.',
-                'display_question': display_question,
-                'is_roman_urdu': is_roman_urdu
-            })
-        
-        # Send to Mistral with context
-        api_key = os.getenv('MISTRAL_API_KEY')
-        if not api_key:
-            return jsonify({'error': 'API key not configured'}), 500
-        
-        context = "\n".join(relevant_data)
-        prompt = f"""You are a helpful assistant that answers questions based ONLY on the provided data.
-
-Data:
-{context}
-
-Answer the following question based ONLY on the data provided above. If the answer is not in the data, clearly state that the information is not available.
-
-Question: {user_question}
-Answer:"""
-        
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
+        fields = {
+            'display_question': display_question,
+            'is_roman_urdu': is_roman_urdu
         }
+        relevant_data, row_ids, answer = find_chat_context(corpus, user_question)
         
-        payload = {
-            "model": "mistralai/devstral-2512",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.3,
-            "max_tokens": 300
-        }
+        if answer is None:
+            # Send to Mistral with context
+            api_key = os.getenv('MISTRAL_API_KEY')
+            if not api_key:
+                return jsonify({'error': 'API key not configured'}), 500
+            messages = [{"role": "user", "content": build_chat_prompt(relevant_data, user_question)}]
         
-        response = requests.post(
-            "https://api.mistral.ai/v1/chat/completions",
-            json=payload,
-            headers=headers,
-            timeout=30
-        )
+        if wants_stream(data):
+            if answer is not None:
+                tokens = [answer]
+                on_complete = None
+            else:
+                tokens = get_client().stream_chat(messages, model=CHAT_MODEL, temperature=0.3, max_tokens=300,
+                                                  read_timeout=30)
+                on_complete = lambda text: answer_cache.put(user_question, row_ids, text, relevant_data)
+            return sse_response(stream_answer(fields, relevant_data, tokens, ERROR_ANSWER, on_complete))
         
-        if response.status_code == 200:
-            result = response.json()
-            answer = result['choices'][0]['message']['content'].strip()
-        else:
-            print(f"Mistral error: {response.status_code} - {response.text}")
-            answer = "Sorry, I encountered an error while processing your question."
+        if answer is None:
+            try:
+                # Identical questions over the same rows arriving together share one call
+                answer = llm_flight.do((normalize_question(user_question), tuple(relevant_data)), get_client().chat,
+                                       messages, model=CHAT_MODEL, temperature=0.3, max_tokens=300, read_timeout=30)
+                answer_cache.put(user_question, row_ids, answer, relevant_data)
+            except (LLMError, SingleFlightTimeout) as e:
+                print(f"Mistral error: {e}")
+                answer = ERROR_ANSWER
         
-        return jsonify({
-            'answer': answer,
-            'display_question': display_question,
-            'is_roman_urdu': is_roman_urdu
-        })
+        return jsonify({**fields, 'answer': answer})
     
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({'error': str(e)}), 500
 
+def health_status():
+    """Health check payload"""
+    corpus = corpus_loader.status()
+    return {
+        'status': 'ok',
+        'faq_data_count': corpus['rows'],
+        'faq_data_version': corpus['version'],
+        'faq_data_loaded_at': corpus['loaded_at'],
+        'faq_data_reloading': corpus['reloading'],
+        'faq_data_error': corpus['last_error']
+    }
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
+    return jsonify(health_status())
+
+def readiness():
+    """Whether the FAQ data is loaded, and the details for the readiness probe"""
+    data_loaded = corpus_loader.status()['rows'] > 0
+    return data_loaded, {'faq_data_loaded': data_loaded}
+
+def start_warm_up():
+    """Load the FAQ data on a background thread unless a load is already running"""
+    corpus_loader.reload(wait=False)
+
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """Liveness probe: the process answers; never waits on or starts any loading"""
     return jsonify({'status': 'ok'})
 
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness probe: 503 (and a background load) until the FAQ data is loaded"""
+    ready, details = readiness()
+    if not ready:
+        start_warm_up()
+    return jsonify({'status': 'ready' if ready else 'warming_up', **details}), 200 if ready else 503
+
 # ============ EduHire AI Counselor Endpoints ============
 
-def extract_profile_info(message, current_profile):
+# Keyword tables for the counselor; within a group the first matching label wins
+EDUBOT_KEYWORDS = {
+    'education': {
+        'High School': ['12th', 'fsc', 'f.sc', 'o-level', 'o-levels', 'o level', 'a-level', 'a-levels', 'a level',
+                        'intermediate', 'matric'],
+        'Bachelor\'s': ['bachelor', 'bachelors', 'bachelor\'s', 'graduation', 'undergrad', 'undergraduate', 'bsc', 'bs', 'ba'],
+        'Master\'s': ['master', 'masters', 'master\'s', 'msc', 'ms', 'ma', 'mphil', 'graduate', 'postgrad', 'postgraduate'],
+    },
+    'budget': {
+        'Scholarship Required': ['scholarship', 'scholarships', 'funded', 'free'],
+        'Limited ($20K-40K/year)': ['20000', '30000', '40000', '20k', '30k', '40k', 'limited', 'tight'],
+        'Comfortable ($50K+/year)': ['50000', '60000', '70000', '50k', '60k', '70k', 'good', 'comfortable'],
+    },
+    'country': {
+        'USA': ['usa', 'america', 'united states', 'us'],
+        'UK': ['uk', 'britain', 'united kingdom', 'england', 'london'],
+        'Canada': ['canada', 'toronto', 'vancouver'],
+        'Germany': ['germany', 'berlin', 'munich'],
+        'Australia': ['australia', 'sydney', 'melbourne'],
+        'Pakistan': ['pakistan', 'lahore', 'karachi', 'isb', 'islamabad'],
+    },
+    'career': {
+        'Engineering/Tech': ['engineer', 'engineers', 'engineering', 'tech', 'technology', 'programmer', 'programming',
+                             'coding', 'software'],
+        'Medical': ['doctor', 'doctors', 'medical', 'mbbs', 'bds', 'dentist', 'medicine'],
+        'Business/Management': ['business', 'management', 'mba', 'finance', 'marketing'],
+        'Law': ['law', 'legal', 'llb', 'lawyer', 'lawyers'],
+    },
+    'intent': {
+        'entry_tests': ['entrance exam', 'entrance exams', 'entrance test', 'ecat', 'mdcat', 'nat', 'usat', 'lat',
+                        'entry test', 'entry tests'],
+        'scholarships': ['scholarship', 'scholarships', 'funding', 'financial aid', 'fully funded'],
+        'universities': ['university', 'universities', 'uni', 'unis', 'college', 'colleges', 'admission',
+                         'admissions', 'apply', 'applying', 'application'],
+        'merit': ['merit', 'calculate', 'calculation', 'calculator', 'percentage', 'aggregate'],
+        'tutors': ['tutor', 'tutors', 'tutoring', 'coaching', 'classes', 'teach', 'teacher', 'prep', 'preparation',
+                   'prepare'],
+        'study_abroad': ['study abroad', 'abroad', 'international', 'overseas', 'visa', 'visas'],
+    },
+}
+
+edubot_keywords = KeywordMatcher(EDUBOT_KEYWORDS)
+
+def extract_profile_info(message, current_profile, matches=None):
     """Extract user profile information from message"""
-    message_lower = message.lower()
+    if matches is None:
+        matches = edubot_keywords.match(message)
     updated_profile = current_profile.copy()
     
-    # Education level detection
-    if any(word in message_lower for word in ['12th', 'fsc', 'o-level', 'intermediate']):
-        updated_profile['educationLevel'] = 'High School'
-    elif any(word in message_lower for word in ['bachelor', 'graduation', 'undergrad', 'bsc', 'ba']):
-        updated_profile['educationLevel'] = 'Bachelor\'s'
-    elif any(word in message_lower for word in ['master', 'msc', 'ma', 'graduate', 'postgrad']):
-        updated_profile['educationLevel'] = 'Master\'s'
-    
-    # Budget detection
-    if any(word in message_lower for word in ['scholarship', 'funded', 'free']):
-        updated_profile['budget'] = 'Scholarship Required'
-    elif any(word in message_lower for word in ['20000', '30000', '40000', 'limited', 'tight']):
-        updated_profile['budget'] = 'Limited ($20K-40K/year)'
-    elif any(word in message_lower for word in ['50000', '60000', '70000', 'good', 'comfortable']):
-        updated_profile['budget'] = 'Comfortable ($50K+/year)'
-    
-    # Country preference
-    if any(word in message_lower for word in ['usa', 'america', 'united states', 'us']):
-        updated_profile['countryPreference'] = 'USA'
-    elif any(word in message_lower for word in ['uk', 'britain', 'england', 'london']):
-        updated_profile['countryPreference'] = 'UK'
-    elif any(word in message_lower for word in ['canada', 'toronto', 'vancouver']):
-        updated_profile['countryPreference'] = 'Canada'
-    elif any(word in message_lower for word in ['germany', 'berlin', 'munich']):
-        updated_profile['countryPreference'] = 'Germany'
-    elif any(word in message_lower for word in ['australia', 'sydney', 'melbourne']):
-        updated_profile['countryPreference'] = 'Australia'
-    elif any(word in message_lower for word in ['pakistan', 'lahore', 'karachi', 'isb', 'islamabad']):
-        updated_profile['countryPreference'] = 'Pakistan'
-    
-    # Career goals
-    if any(word in message_lower for word in ['engineer', 'engineering', 'tech', 'programmer', 'coding']):
-        if 'careerGoals' not in updated_profile:
-            updated_profile['careerGoals'] = []
-        if 'Engineering/Tech' not in updated_profile['careerGoals']:
-            updated_profile['careerGoals'].append('Engineering/Tech')
+    # Education level, budget and country: the first label in table order wins
+    for group, field in [('education', 'educationLevel'), ('budget', 'budget'), ('country', 'countryPreference')]:
+        label = matches.first(group)
+        if label:
+            updated_profile[field] = label
     
-    if any(word in message_lower for word in ['doctor', 'medical', 'mbbs', 'bds', 'dentist', 'medicine']):
+    # Career goals accumulate across messages
+    for goal in matches.labels('career'):
         if 'careerGoals' not in updated_profile:
             updated_profile['careerGoals'] = []
-        if 'Medical' not in updated_profile['careerGoals']:
-            updated_profile['careerGoals'].append('Medical')
+        if goal not in updated_profile['careerGoals']:
+            updated_profile['careerGoals'].append(goal)
     
-    if any(word in message_lower for word in ['business', 'management', 'mba', 'finance', 'marketing']):
-        if 'careerGoals' not in updated_profile:
-            updated_profile['careerGoals'] = []
-        if 'Business/Management' not in updated_profile['careerGoals']:
-            updated_profile['careerGoals'].append('Business/Management')
-    
-    if any(word in message_lower for word in ['law', 'legal', 'llb', 'lawyer']):
-        if 'careerGoals' not in updated_profile:
-            updated_profile['careerGoals'] = []
-        if 'Law' not in updated_profile['careerGoals']:
-            updated_profile['careerGoals'].append('Law')
+    # Marks accumulate too, so a student can send them over several messages
+    marks = parse_marks(message, matches.has('intent', 'merit'))
+    if marks:
+        known = updated_profile.get('marks')
+        updated_profile['marks'] = {**(known if isinstance(known, dict) else {}), **marks}
     
     return updated_profile
 
-def generate_counselor_response(message, user_profile, conversation_history):
+def generate_counselor_response(message, user_profile, conversation_history, matches=None):
     """Generate personalized counselor response using EduHire AI logic"""
     
-    message_lower = message.lower()
+    if matches is None:
+        matches = edubot_keywords.match(message)
     
     # Profile building phase - ask for missing info
     missing_info = []
@@ -294,6 +434,12 @@ def generate_counselor_response(message, user_profile, conversation_history):
     if not user_profile.get('careerGoals'):
         missing_info.append('career goals')
     
+    # A turn that shares marks or asks about merit gets aggregates straight away; stored marks
+    # alone never take over a turn about something else
+    merit_turn = matches.has('intent', 'merit')
+    if isinstance(user_profile.get('marks'), dict) and user_profile['marks'] and (merit_turn or parse_marks(message)):
+        return merit_reply(user_profile['marks'])
+    
     # If gathering profile
     if len(conversation_history) <= 2 and missing_info:
         if 'educationLevel' not in user_profile:
@@ -306,7 +452,7 @@ def generate_counselor_response(message, user_profile, conversation_history):
             return "Perfect! Which countries interest you for studying?\n\n• Pakistan\n• USA\n• UK\n• Canada\n• Germany\n• Australia\n• Multiple options"
     
     # General education queries
-    if any(word in message_lower for word in ['entrance exam', 'ecat', 'mdcat', 'nat', 'usat', 'lat', 'entry test']):
+    if matches.has('intent', 'entry_tests'):
         goals = user_profile.get('careerGoals', [])
         
         exams = "Here are the major entrance exams available:\n\n"
@@ -334,63 +480,273 @@ def generate_counselor_response(message, user_profile, conversation_history):
         return exams
     
     # Scholarship queries
-    if any(word in message_lower for word in ['scholarship', 'funding', 'financial aid', 'fully funded']):
+    if matches.has('intent', 'scholarships'):
         profile_str = f"your {user_profile.get('countryPreference', 'preferred')} preference and {user_profile.get('budget', 'your financial needs')}" if user_profile.get('countryPreference') or user_profile.get('budget') else "your profile"
         return f"Excellent question! Based on {profile_str}:\n\nTop Scholarship Options:\n\n• Chevening (UK)\n• Fulbright (USA)\n• DAAD (Germany)\n• Australia Awards\n• Canada Government Scholarships\n\nNext Steps:\n\n• Check your eligibility for each\n• Meet deadline requirements\n• Prepare strong SOP & documents\n\nVisit our Scholarships section for detailed info!"
     
     # University queries
-    if any(word in message_lower for word in ['university', 'uni', 'college', 'admission', 'apply']):
+    if matches.has('intent', 'universities'):
         if user_profile.get('countryPreference'):
             return f"Great! For your goal of studying in {user_profile['countryPreference']}:\n\nTop considerations:\n\n• Academic requirements (GPA/scores)\n• Entrance exam preparation\n• Application deadlines\n• Visa requirements\n• Cost & scholarships\n\nMy recommendation: Start with the Universities section to explore options matching your profile!"
         else:
             return "I'd love to help! To recommend the best universities for you, could you tell me:\n\n• Which country are you interested in?\n• What's your career goal (Engineering, Medical, Business, etc.)?\n\nThis will help me give personalized suggestions!"
     
     # Merit calculation
-    if any(word in message_lower for word in ['merit', 'calculate', 'percentage', 'aggregate']):
-        return "Merit calculation varies by university! Here's the general approach:\n\nStandard Formula:\n\nAggregate = (FSC marks/1100 × 0.30) + (Entry Test/100 × 0.50) + (Interview/20 × 0.20)\n\nDifferent universities use different weights:\n\n• Some give 50% weight to entry test\n• Others emphasize interviews (20%)\n• Academic marks typically 30%\n\nCheck the Merit Calculator tool for detailed calculations!"
+    if matches.has('intent', 'merit'):
+        return "Merit calculation varies by university! Here's the general approach:\n\nStandard Formula:\n\nAggregate = (FSC marks/1100 × 0.30) + (Entry Test/100 × 0.50) + (Interview/20 × 0.20)\n\nDifferent universities use different weights:\n\n• Some give 50% weight to entry test\n• Others emphasize interviews (20%)\n• Academic marks typically 30%\n\nShare your marks (e.g. \"Matric 1000, FSc 950, NET 160\") and I'll calculate your aggregate for each university!"
     
     # Tutors
-    if any(word in message_lower for word in ['tutor', 'coaching', 'classes', 'teach', 'prep']):
+    if matches.has('intent', 'tutors'):
         return "Great idea! Tutoring can really boost your preparation.\n\nWhy get a tutor?\n\n• Personalized attention\n• Focused on weak areas\n• Mock tests & feedback\n• Time-efficient preparation\n\nFind qualified tutors in the Tutors section!\n\nWhat subject do you need help with?"
     
     # Study abroad
-    if any(word in message_lower for word in ['study abroad', 'international', 'overseas', 'visa']):
+    if matches.has('intent', 'study_abroad'):
         return f"Studying abroad is an amazing opportunity! For {user_profile.get('countryPreference', 'your preferred country')}:\n\nKey Requirements:\n\n• Valid passport\n• Entrance exam scores\n• English proficiency (IELTS/TOEFL)\n• Strong academic record\n• Visa documentation\n• Financial proof\n\nStart exploring in the Study Abroad section!"
     
     # Default helpful response
     return "I'm here to help! Tell me more about:\n\n• Your education background & current level\n• Career aspirations\n• Budget constraints\n• Geographic preferences\n• Specific entrance exams or universities\n\nThe more details you share, the better personalized guidance I can provide!\n\nWhat would you like to explore first?"
 
+session_store = create_session_store()
+
+def after_fork():
+    """Give a forked worker its own watcher thread and SQLite handles"""
+    corpus_loader.after_fork()
+    session_store.after_fork()
+    urdu_translator.after_fork()
+
+# Pre-forking servers copy the parent's state into every worker
+os.register_at_fork(after_in_child=after_fork)
+
+def handle_edubot(data):
+    """Run one counselor turn and return the response payload and status code
+    
+    With a sessionId the profile and history are kept server-side and the
+    client only sends the new message (plus optional profile fields to
+    change). A session the server does not have (new, expired, evicted, or
+    held by another worker's memory store) is seeded from the request's
+    userProfile and conversationHistory; when the request carries no
+    conversationHistory the reply is a 409 with sessionExpired so the
+    client can resend them. Without a sessionId, userProfile and
+    conversationHistory come from the request as before. An optional
+    "merit" object is scored as by /api/merit and returned alongside the
+    answer.
+    """
+    message = data.get('message', '').strip()
+    session_id = data.get('sessionId')
+    
+    if not message:
+        return {'error': 'Empty message'}, 400
+    if session_id is not None and not valid_session_id(session_id):
+        return {'error': 'Invalid sessionId'}, 400
+    
+    if session_id is not None:
+        session = session_store.get(session_id)
+        if session is None:
+            if 'conversationHistory' not in data:
+                return {'error': 'Unknown or expired session', 'sessionExpired': True, 'sessionId': session_id}, 409
+            # Seed a new session, or reseed one the server lost, from what the client sent
+            seed = compact_history(data.get('conversationHistory') or [])
+            if seed and seed[-1] == {'sender': 'user', 'content': message}:
+                seed = seed[:-1]
+            session = session_store.update(session_id, data.get('userProfile'), seed)
+        user_profile = {**session['profile'], **(data.get('userProfile') or {})}
+        user_message = {'sender': 'user', 'content': message}
+        conversation_history = session['history'] + [user_message]
+    else:
+        user_profile = data.get('userProfile', {})
+        conversation_history = data.get('conversationHistory', [])
+    
+    # Structured merit requests ride along with a chat turn: one student's marks or a whole list
+    merit_payload = None
+    if data.get('merit') is not None:
+        merit_payload, merit_status = handle_merit(data['merit'])
+        if merit_status != 200:
+            return merit_payload, merit_status
+    
+    # One keyword pass feeds both profile extraction and intent routing
+    matches = edubot_keywords.match(message)
+    
+    # Extract and update user profile
+    updated_profile = extract_profile_info(message, user_profile, matches)
+    
+    # Generate counselor response
+    response = generate_counselor_response(message, updated_profile, conversation_history, matches)
+    
+    payload = {
+        'answer': response,
+        'updatedProfile': updated_profile,
+        'success': True
+    }
+    if merit_payload is not None:
+        payload['merit'] = merit_payload
+    if session_id is not None:
+        session_store.update(session_id, updated_profile, [user_message, {'sender': 'bot', 'content': response}])
+        payload['sessionId'] = session_id
+    return payload, 200
+
+def compact_history(messages):
+    """Keep only the sender and text of client-side messages"""
+    return [{'sender': m.get('sender'), 'content': m.get('content', '')} for m in messages if isinstance(m, dict)]
+
+EDUBOT_ERROR_ANSWER = '🤔 Sorry, I encountered an unexpected error. Please try rephrasing your question.'
+
 @app.route('/api/edubot', methods=['POST'])
 def edubot():
     """EduHire AI Counselor Endpoint"""
     try:
-        data = request.get_json()
-        message = data.get('message', '').strip()
-        user_profile = data.get('userProfile', {})
-        conversation_history = data.get('conversationHistory', [])
-        
-        if not message:
-            return jsonify({'error': 'Empty message'}), 400
-        
-        # Extract and update user profile
-        updated_profile = extract_profile_info(message, user_profile)
-        
-        # Generate counselor response
-        response = generate_counselor_response(message, updated_profile, conversation_history)
-        
-        return jsonify({
-            'answer': response,
-            'updatedProfile': updated_profile,
-            'success': True
-        })
+        payload, status = handle_edubot(request.get_json())
+        return jsonify(payload), status
     
     except Exception as e:
         print(f"EduHire AI Error: {e}")
         return jsonify({
-            'answer': '🤔 Sorry, I encountered an unexpected error. Please try rephrasing your question.',
+            'answer': EDUBOT_ERROR_ANSWER,
             'error': str(e)
         }), 500
 
+@app.route('/api/edubot/sessions/<session_id>', methods=['DELETE'])
+def delete_edubot_session(session_id):
+    """Forget a server-side counselor session"""
+    if not valid_session_id(session_id):
+        return jsonify({'error': 'Invalid sessionId'}), 400
+    session_store.delete(session_id)
+    return jsonify({'success': True})
+
+# ============ Merit Calculator ============
+
+# University weighting schemes; MERIT_SCHEMES_FILE (JSON, same shape as DEFAULT_SCHEMES) adds or overrides them
+merit_schemes = load_schemes(os.getenv('MERIT_SCHEMES_FILE'))
+MAX_MERIT_APPLICANTS = int(os.getenv('MAX_MERIT_APPLICANTS', '10000'))
+MAX_MERIT_UPLOAD_MB = float(os.getenv('MAX_MERIT_UPLOAD_MB', '20'))
+
+def parse_cutoff(value):
+    """None, one minimum aggregate, or a {program: minimum} dict from a request (JSON text allowed)"""
+    if value is None or value == '':
+        return None
+    try:
+        if isinstance(value, str) and value.strip().startswith('{'):
+            value = json.loads(value)
+        if isinstance(value, dict):
+            return {str(program): float(minimum) for program, minimum in value.items()}
+        return float(value)
+    except (TypeError, ValueError):
+        raise MeritError('cutoff must be a number or an object of program: number') from None
+
+def student_aggregates(marks, scheme_key=None):
+    """One student's aggregate under scheme_key, or under every scheme their marks cover"""
+    import pandas as pd
+    marks = {canonical_column(component): mark for component, mark in marks.items()}
+    if scheme_key:
+        schemes = [get_scheme(merit_schemes, scheme_key)]
+    else:
+        schemes = [scheme for scheme in merit_schemes.values() if scheme.applies_to(marks)]
+    frame = pd.DataFrame([marks])
+    results = []
+    for scheme in schemes:
+        aggregates, errors = scheme.score(frame)
+        results.append({'scheme': scheme.key, 'name': scheme.name, 'formula': scheme.formula(),
+                        'aggregate': None if errors[0] else float(aggregates[0]), 'error': errors[0] or None})
+    return results
+
+def merit_reply(marks):
+    """Counselor text with a student's aggregates for every scheme their marks cover"""
+    # Profiles can come from the client, so keep only numeric marks of known components
+    marks = {c: m for c, m in marks.items() if c in COMPONENT_LABELS and isinstance(m, (int, float))}
+    shared = ', '.join(f"{COMPONENT_LABELS[c]} {m:g}" for c, m in marks.items())
+    results = student_aggregates(marks)
+    if not results:
+        needs = [f"• {scheme.name}: {', '.join(COMPONENT_LABELS.get(c, c) for c in scheme.columns if c not in marks)}"
+                 for scheme in merit_schemes.values()]
+        return f"To calculate your aggregate I need a few more marks. You've shared: {shared}.\n\nStill needed:\n\n" + '\n'.join(needs)
+    
+    lines = []
+    for result in results:
+        if result['error'] is None:
+            lines.append(f"• {result['name']}: {result['aggregate']:.2f}%")
+            continue
+        scheme = merit_schemes[result['scheme']]
+        limits = [f"{COMPONENT_LABELS.get(c, c)} is out of {total:g}" for c, total in zip(scheme.columns, scheme.totals)
+                  if not 0 <= marks[c] <= total]
+        lines.append(f"• {result['name']}: not calculated, {', '.join(limits)}")
+    formulas = [f"• {r['name']}: {r['formula']}" for r in results]
+    return (f"Here's your merit from the marks you shared ({shared}):\n\n" + '\n'.join(lines)
+            + "\n\nFormulas used:\n\n" + '\n'.join(formulas)
+            + "\n\nDifferent universities use different weights, so share any missing marks to see more of them!")
+
+def handle_merit(data):
+    """Score one student or a list of applicants; returns the response payload and status code
+    
+    {"marks": {...}} is scored under "scheme", or every scheme the marks
+    cover. {"applicants": [...]} is scored under "scheme" (default
+    'default') and, unless "rank" is false, ranked per program and checked
+    against an optional "cutoff".
+    """
+    if not isinstance(data, dict):
+        return {'error': 'Expected a JSON object'}, 400
+    try:
+        if isinstance(data.get('marks'), dict):
+            return {'results': student_aggregates(data['marks'], data.get('scheme'))}, 200
+        
+        applicants = data.get('applicants')
+        if not isinstance(applicants, list) or not all(isinstance(a, dict) for a in applicants):
+            return {'error': 'Send marks for one student or applicants as a list of objects'}, 400
+        if len(applicants) > MAX_MERIT_APPLICANTS:
+            return {'error': f'At most {MAX_MERIT_APPLICANTS} applicants per request; upload a CSV for more'}, 413
+        
+        import pandas as pd
+        scheme = get_scheme(merit_schemes, data.get('scheme', 'default'))
+        records = [{canonical_column(k): v for k, v in applicant.items()} for applicant in applicants]
+        frame = scheme.score_frame(pd.DataFrame.from_records(records, columns=None if records else scheme.columns))
+        if data.get('rank', True):
+            frame = rank(frame, parse_cutoff(data.get('cutoff')))
+        return {
+            'scheme': scheme.describe(),
+            'applicants': to_records(frame),
+            'programs': to_records(program_summary(frame)),
+        }, 200
+    except MeritError as e:
+        return {'error': str(e)}, 400
+
+def merit_csv_chunks(stream, args):
+    """Scored CSV chunks for an applicant CSV; bad input raises MeritError before the first chunk"""
+    scheme = get_scheme(merit_schemes, args.get('scheme', 'default'))
+    ranked = str(args.get('rank', '1')).lower() not in ('0', 'false', 'no')
+    chunks = score_csv(stream, scheme, ranked, parse_cutoff(args.get('cutoff')))
+    first = next(chunks, '')
+    return itertools.chain([first], chunks), scheme
+
+@app.route('/api/merit/schemes', methods=['GET'])
+def merit_scheme_list():
+    """University weighting schemes the merit endpoints accept"""
+    return jsonify({'schemes': [scheme.describe() for scheme in merit_schemes.values()]})
+
+@app.route('/api/merit', methods=['POST'])
+def merit():
+    """Aggregates for one student's marks or a JSON list of applicants"""
+    payload, status = handle_merit(request.get_json(silent=True))
+    return jsonify(payload), status
+
+@app.route('/api/merit/csv', methods=['POST'])
+def merit_csv():
+    """Score an applicant CSV (raw body or a 'file' upload) and stream the scored CSV back
+    
+    Query parameters: scheme, cutoff (a number or a JSON object of
+    program: minimum) and rank=0 to keep the upload's order, which also
+    lets each chunk go out as soon as it is scored.
+    """
+    if request.content_length and request.content_length > MAX_MERIT_UPLOAD_MB * 1e6:
+        return jsonify({'error': f'Uploads are limited to {MAX_MERIT_UPLOAD_MB:g} MB'}), 413
+    # Multipart uploads are already spooled by the form parser, which closes them with the request
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    if request.mimetype == 'multipart/form-data' and upload is None:
+        return jsonify({'error': "Send the CSV as a 'file' field or as a text/csv body"}), 400
+    try:
+        chunks, scheme = merit_csv_chunks(io.BytesIO(upload.read()) if upload else request.stream, request.args)
+    except MeritError as e:
+        return jsonify({'error': str(e)}), 400
+    return Response(stream_with_context(chunks), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename=merit-{scheme.key}.csv'})
+
 if __name__ == '__main__':
     print("Starting Education Gate Backend with EduHire AI...")
     app.run(debug=True, port=5000)
@@ -0,0 +1,72 @@
+"""Answer a file of questions offline and write one JSON line per answer
+
+    python batch_ask.py questions.txt -o answers.jsonl --concurrency 8
+
+The input is plain text with one question per line, or JSONL with a
+"question" field. Results are written in input order as they complete, so
+an interrupted run keeps everything answered so far; --skip resumes after
+that many questions.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import sys
+import time
+
+import backend
+
+
+def read_questions(stream):
+    """Yield the questions of a text or JSONL stream, skipping blank lines"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('{'):
+            yield json.loads(line).get('question', '').strip()
+        else:
+            yield line
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch-answer questions against the entry test data')
+    parser.add_argument('input', help="questions file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file ('-' for stdout)")
+    parser.add_argument('--concurrency', type=int, default=backend.BATCH_CONCURRENCY,
+                        help='Mistral calls in flight')
+    parser.add_argument('--chunk-size', type=int, default=backend.BATCH_CHUNK_SIZE,
+                        help='questions retrieved per batched encode')
+    parser.add_argument('--skip', type=int, default=0, help='skip the first N questions (resume)')
+    args = parser.parse_args()
+
+    # Keep stdout clean for the JSONL output
+    with contextlib.redirect_stdout(sys.stderr):
+        if not backend.load_excel_data():
+            sys.exit('Failed to load data')
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'a' if args.skip else 'w', encoding='utf-8')
+    questions = itertools.islice(read_questions(source), args.skip, None)
+
+    start = time.perf_counter()
+    count = 0
+    try:
+        for result in backend.answer_batch(questions, args.concurrency, args.chunk_size):
+            result['index'] += args.skip
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            output.flush()
+            count += 1
+            if count % 100 == 0:
+                print(f"{count} answered, {count / (time.perf_counter() - start):.1f}/s", file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if source is not sys.stdin:
+            source.close()
+
+    print(f"✓ {count} questions in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Recall and latency of the IVF index against exact search
+
+Embeddings are synthetic: unit vectors drawn around a few thousand random
+topics, which clusters roughly like sentence embeddings of catalogue rows.
+Queries are noisy copies of random rows.
+
+Run from the repo root: python benchmarks/bench_ann.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edugate.ann import IVFIndex, default_nlist
+from edugate.retrieval import EmbeddingIndex, normalize_rows
+
+
+def synthetic_embeddings(rows, dim, topics, spread, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.standard_normal((topics, dim)))
+    labels = rng.integers(0, topics, rows)
+    noise = rng.standard_normal((rows, dim)).astype(np.float32) / np.sqrt(dim)
+    return normalize_rows(centers[labels] + spread * noise)
+
+
+def per_query_ms(index, queries, top_k, **kwargs):
+    start = time.perf_counter()
+    results = [index.search(q, top_k=top_k, **kwargs)[0] for q in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1e3
+
+
+def recall(approx, exact):
+    found = sum(len({i for i, _ in a} & {i for i, _ in e}) for a, e in zip(approx, exact))
+    return found / sum(len(e) for e in exact)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--topics', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--nlist', type=int, default=0)
+    parser.add_argument('--spread', type=float, default=1.0, help='row noise around its topic; higher is harder')
+    args = parser.parse_args()
+
+    matrix = synthetic_embeddings(args.rows, args.dim, args.topics, args.spread)
+    rng = np.random.default_rng(1)
+    queries = matrix[rng.integers(0, args.rows, args.queries)]
+    queries = normalize_rows(queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(args.dim))
+
+    exact_index = EmbeddingIndex(matrix)
+    exact, exact_ms = per_query_ms(exact_index, queries, args.top_k)
+
+    start = time.perf_counter()
+    ivf = IVFIndex(matrix, nlist=args.nlist or default_nlist(args.rows))
+    build_s = time.perf_counter() - start
+
+    print(f"{args.rows} rows x {args.dim} dims, {ivf.nlist} lists, built in {build_s:.1f}s")
+    print(f"{'search':<14}{'recall@' + str(args.top_k):>10}{'ms/query':>10}{'speedup':>9}")
+    print(f"{'exact':<14}{1.0:>10.3f}{exact_ms:>10.2f}{1.0:>9.1f}")
+    for nprobe in [1, 2, 4, 8, 16, 32, 64]:
+        if nprobe > ivf.nlist:
+            break
+        approx, ms = per_query_ms(ivf, queries, args.top_k, nprobe=nprobe)
+        print(f"{'ivf nprobe=' + str(nprobe):<14}{recall(approx, exact):>10.3f}{ms:>10.2f}{exact_ms / ms:>9.1f}")
@@ -0,0 +1,163 @@
+"""Per-worker memory, latency and recall of the embedding store layouts
+
+Several worker processes attach to one embedding cache at the same time,
+the way gunicorn workers do, and each serves the same queries. Layouts:
+  heap     every worker copies texts and embeddings into its own memory
+           (what backend.py did before the cache was memory-mapped)
+  float32  texts and unit-length embeddings mapped read-only from the cache
+  float16  as float32, scanning float16 codes and rescoring the best rows
+  int8     as float32, scanning int8 codes and rescoring the best rows
+USS is memory no other process shares: what one more worker costs. PSS
+adds each worker's fair share of the mapped cache pages. The quantized
+layouts still map float32 pages around the rescored rows, but those are
+clean page cache the kernel can drop under pressure, while only the
+codes have to stay resident for the scan to be fast.
+Embeddings are synthetic (see bench_ann.py). Run from the repo root:
+
+    python benchmarks/bench_embedding_store.py --rows 200000 --workers 4
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from bench_ann import recall, synthetic_embeddings
+from common import COLUMNS, DATA_DIR, summarize, synthetic_rows, write_results
+
+from edugate.embedding_cache import EmbeddingCache
+from edugate.quantize import KINDS, load_or_build_quantized
+from edugate.retrieval import EmbeddingIndex, normalize_rows
+
+LAYOUTS = ('heap', 'float32') + KINDS
+
+
+def memory_mb():
+    """Rss, Pss and Uss of this process from /proc/self/smaps_rollup, or {} off Linux"""
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if value.strip().endswith('kB'):
+                    fields[name] = int(value.split()[0]) / 1024
+    except OSError:
+        return {}
+    return {'rss_mb': fields.get('Rss'), 'pss_mb': fields.get('Pss'),
+            'uss_mb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)}
+
+
+def open_store(cache, csv_bytes, layout, rescore):
+    texts, embeddings = cache.load(csv_bytes)
+    if layout == 'heap':
+        return list(texts), EmbeddingIndex(np.array(embeddings))
+    if layout == 'float32':
+        return texts, EmbeddingIndex(embeddings, normalized=True)
+    with redirect_stdout(io.StringIO()):
+        return texts, load_or_build_quantized(embeddings, cache.cache_dir, cache.key(csv_bytes), kind=layout,
+                                              rescore=rescore, normalized=True)
+
+
+def worker(cache_dir, csv_bytes, layout, rescore, queries, top_k, lock, barrier, results):
+    cache = EmbeddingCache('synthetic', 'bench', cache_dir)
+    texts, index = open_store(cache, csv_bytes, layout, rescore)
+    samples = []
+    hits = []
+    # One worker searches at a time so latencies do not depend on the core count
+    with lock:
+        for query in queries:
+            start = time.perf_counter()
+            found = index.search(query, top_k=top_k)[0]
+            # The backend fetches the row texts for its prompt too
+            context = [texts[i] for i, _ in found]
+            samples.append(time.perf_counter() - start)
+            hits.append(found)
+    # Measure while every worker is attached, then keep the mappings alive until all have measured
+    barrier.wait()
+    results.put({'samples': samples, 'hits': hits, **memory_mb()})
+    barrier.wait()
+
+
+def run_layout(cache_dir, csv_bytes, layout, args, queries):
+    context = multiprocessing.get_context('spawn')
+    lock = context.Lock()
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(cache_dir, csv_bytes, layout, args.rescore, queries,
+                                                      args.top_k, lock, barrier, results))
+                 for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return reports
+
+
+def mean(reports, field):
+    values = [report[field] for report in reports if report.get(field) is not None]
+    return sum(values) / len(values) if values else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--topics', type=int, default=2000)
+    parser.add_argument('--spread', type=float, default=1.0)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--rescore', type=int, default=4)
+    parser.add_argument('--layouts', default=','.join(LAYOUTS), help='comma-separated subset of ' + ', '.join(LAYOUTS))
+    parser.add_argument('-o', '--output', help='result file (default: benchmarks/results/embedding_store-<commit>-<time>.json)')
+    args = parser.parse_args()
+    layouts = [layout for layout in args.layouts.split(',') if layout]
+
+    cache_dir = os.path.join(DATA_DIR, f"embedding_store-{args.rows}-{args.dim}")
+    cache = EmbeddingCache('synthetic', 'bench', cache_dir)
+    csv_bytes = f"{args.rows}-{args.dim}-{args.topics}-{args.spread}".encode()
+    if cache.load(csv_bytes) is None:
+        texts = ['. '.join(f"{c}: {v}" for c, v in zip(COLUMNS, row)) for row in synthetic_rows(args.rows)]
+        cache.store(csv_bytes, texts, lambda batch: synthetic_embeddings(len(batch), args.dim, args.topics, args.spread))
+    _, embeddings = cache.load(csv_bytes)
+    # Codes are built once here so the workers only attach to them
+    for kind in KINDS:
+        if kind in layouts:
+            load_or_build_quantized(embeddings, cache_dir, cache.key(csv_bytes), kind=kind, rescore=args.rescore)
+
+    rng = np.random.default_rng(1)
+    queries = embeddings[rng.integers(0, args.rows, args.queries)]
+    queries = normalize_rows(queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(args.dim))
+    exact_index = EmbeddingIndex(embeddings)
+    exact = [exact_index.search(query, top_k=args.top_k)[0] for query in queries]
+    # Unmap the cache here so the workers' PSS only splits pages between themselves
+    del exact_index, embeddings
+
+    results = []
+    print(f"{args.rows} rows x {args.dim} dims, {args.workers} workers", file=sys.stderr)
+    print(f"  {'layout':<10}{'pss MB':>10}{'uss MB':>10}{'rss MB':>10}{'p50 ms':>10}{'recall@' + str(args.top_k):>11}",
+          file=sys.stderr)
+    for layout in layouts:
+        reports = run_layout(cache_dir, csv_bytes, layout, args, queries)
+        entry = {
+            'name': f"embedding_store.{layout}",
+            'rows': args.rows,
+            'unit': 'ms',
+            **summarize([s for report in reports for s in report['samples']], scale=1e3),
+            'pss_mb': mean(reports, 'pss_mb'),
+            'uss_mb': mean(reports, 'uss_mb'),
+            'rss_mb': mean(reports, 'rss_mb'),
+            'recall': recall(reports[0]['hits'], exact),
+        }
+        results.append(entry)
+        print(f"  {layout:<10}{entry['pss_mb'] or 0:>10.0f}{entry['uss_mb'] or 0:>10.0f}{entry['rss_mb'] or 0:>10.0f}"
+              f"{entry['p50']:>10.2f}{entry['recall']:>11.3f}", file=sys.stderr)
+
+    config = {'rows': args.rows, 'dim': args.dim, 'workers': args.workers, 'queries': args.queries,
+              'top_k': args.top_k, 'rescore': args.rescore}
+    print(write_results('embedding_store', config, results, args.output))
@@ -0,0 +1,130 @@
+"""Latency of the chat backends' hot paths on synthetic catalogues from 25 to 1M rows
+
+Per catalogue size: loading and indexing the CSV (backend.py's corpus
+build and backend/app.py's load_excel_data/build_corpus) and per-question
+retrieval. Once, on a fixed sample: row-text formatting, simple_similarity,
+the Roman Urdu detectors and the counselor's profile extraction.
+
+Retrieval runs with whatever RETRIEVAL_BACKEND / KEYWORD_RANKER is set;
+both are recorded in the result file. The default sizes include 1M rows,
+which takes several minutes and a few GB of memory; pass --sizes to stop
+earlier. Run from the repo root:
+
+    python benchmarks/bench_hot_paths.py --sizes 25,1000,10000 -o before.json
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+from common import EDUBOT_MESSAGES, QUESTIONS, load_chat_backend, summarize, synthetic_csv, time_calls, write_results
+
+# The benchmark builds corpora itself; no background CSV watchers
+os.environ.setdefault('CORPUS_WATCH_INTERVAL', '0')
+
+DEFAULT_SIZES = '25,1000,10000,100000,1000000'
+
+
+def rss_mb():
+    """Resident set size of this process, or None off Linux"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def record(results, name, samples, rows=None, **extra):
+    entry = {'name': name, 'rows': rows, 'unit': 'us', **summarize(samples), **extra}
+    results.append(entry)
+    size = '' if rows is None else f" rows={rows}"
+    print(f"  {name:<28}{size:<14} p50 {entry['p50']:>12.1f} us   p95 {entry['p95']:>12.1f} us   n={entry['n']}",
+          file=sys.stderr)
+
+
+def timed_once(fn, *args):
+    gc.collect()
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - start
+
+
+def bench_size(results, ask_backend, chat_backend, rows, min_time):
+    path = synthetic_csv(rows)
+    repeats = 3 if rows <= 10000 else 1
+
+    samples = []
+    for _ in range(repeats):
+        ask_corpus, seconds = timed_once(ask_backend.build_corpus, path)
+        samples.append(seconds)
+    record(results, 'ask.load_excel_data', samples, rows, rss_mb=rss_mb())
+
+    samples = [timed_once(chat_backend.load_excel_data, path)[1] for _ in range(repeats)]
+    record(results, 'chat.load_excel_data', samples, rows)
+
+    samples = []
+    for _ in range(repeats):
+        chat_corpus, seconds = timed_once(chat_backend.build_corpus, path)
+        samples.append(seconds)
+    record(results, 'chat.build_corpus', samples, rows, rss_mb=rss_mb())
+
+    questions = [(q,) for q in QUESTIONS]
+    record(results, 'ask.search_relevant_rows',
+           time_calls(lambda q: ask_backend.retrieve_rows_batch([q], corpus=ask_corpus), questions, min_time), rows)
+    record(results, 'chat.search_relevant_rows', time_calls(chat_corpus.retriever.search, questions, min_time), rows)
+    record(results, 'chat.jaccard_search', time_calls(chat_corpus.jaccard_search, questions, min_time), rows)
+    record(results, 'entity_lookup', time_calls(ask_corpus.entities.lookup, questions, min_time), rows)
+
+
+def bench_fixed(results, ask_backend, chat_backend, min_time):
+    import pandas as pd
+
+    df = pd.read_csv(synthetic_csv(1000))
+    frame_rows = [(row,) for _, row in df.iterrows()]
+    record(results, 'create_row_text', time_calls(ask_backend.create_row_text, frame_rows, min_time))
+    str_rows = [(row,) for _, row in df.astype(str).iterrows()]
+    record(results, 'convert_row_to_text', time_calls(chat_backend.convert_row_to_text, str_rows, min_time))
+
+    texts = [chat_backend.convert_row_to_text(row) for row, in str_rows[:50]]
+    pairs = [(q, text) for q in QUESTIONS for text in texts]
+    record(results, 'simple_similarity', time_calls(chat_backend.simple_similarity, pairs, min_time))
+
+    messages = [(q,) for q in QUESTIONS + EDUBOT_MESSAGES]
+    record(results, 'ask.is_roman_urdu', time_calls(ask_backend.is_roman_urdu, messages, min_time))
+    record(results, 'chat.detect_roman_urdu', time_calls(chat_backend.detect_roman_urdu, messages, min_time))
+
+    profile_args = [(m, {'educationLevel': 'fsc'}) for m in EDUBOT_MESSAGES]
+    record(results, 'extract_profile_info', time_calls(chat_backend.extract_profile_info, profile_args, min_time))
+    reply_args = [(m, {'educationLevel': 'fsc'}, []) for m in EDUBOT_MESSAGES]
+    record(results, 'generate_counselor_response',
+           time_calls(chat_backend.generate_counselor_response, reply_args, min_time))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated catalogue sizes')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds spent per per-call measurement')
+    parser.add_argument('-o', '--output', help='result file (default: benchmarks/results/hot_paths-<commit>-<time>.json)')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+
+    import backend as ask_backend
+    chat_backend = load_chat_backend()
+
+    results = []
+    print('fixed-size inputs', file=sys.stderr)
+    bench_fixed(results, ask_backend, chat_backend, args.min_time)
+    for rows in sizes:
+        print(f"{rows} rows", file=sys.stderr)
+        bench_size(results, ask_backend, chat_backend, rows, args.min_time)
+
+    config = {
+        'sizes': sizes,
+        'min_time': args.min_time,
+        'retrieval_backend': ask_backend.RETRIEVAL_BACKEND,
+        'keyword_ranker': chat_backend.KEYWORD_RANKER,
+        'entity_lookup': ask_backend.ENTITY_LOOKUP,
+        'ann_index': ask_backend.ANN_INDEX,
+    }
+    print(write_results('hot_paths', config, results, args.output))
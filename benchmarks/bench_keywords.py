@@ -0,0 +1,66 @@
+"""Per-message cost of the counselor keyword matcher as the keyword tables grow
+
+Compares edugate.keywords.KeywordMatcher with the any(word in message)
+scans extract_profile_info and generate_counselor_response used to run.
+Run from the repo root: python benchmarks/bench_keywords.py
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edugate.keywords import KeywordMatcher
+
+MESSAGES = [
+    "I did FSC and want to study engineering in Germany, is there a scholarship?",
+    "What is the merit calculation for NUST and how do I prepare for the entry test?",
+    "My budget is tight, around 30000, and I am interested in business or finance in the UK",
+    "Can you suggest tutors for MDCAT preparation in Lahore?",
+    "I have a bachelors degree and want a fully funded masters abroad, maybe Canada or Australia",
+    "Tell me about universities in the United States that accept SAT scores for computer science",
+]
+
+
+def synthetic_tables(size, seed=0):
+    """Keyword tables with `size` random words spread over five groups of ten labels"""
+    rng = random.Random(seed)
+    tables = {f"group{g}": {f"label{l}": [] for l in range(10)} for g in range(5)}
+    for i in range(size):
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+        tables[f"group{i % 5}"][f"label{(i // 5) % 10}"].append(word)
+    return tables
+
+
+def naive_match(tables, message):
+    """The substring scan the counselor used before the automaton"""
+    message_lower = message.lower()
+    found = set()
+    for group, labels in tables.items():
+        for label, words in labels.items():
+            if any(word in message_lower for word in words):
+                found.add((group, label))
+    return found
+
+
+def time_per_message(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            fn(message)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES)) * 1e6
+
+
+if __name__ == '__main__':
+    print(f"{'keywords':>9}{'build ms':>10}{'automaton us/msg':>18}{'substring us/msg':>18}")
+    for size in [100, 1000, 10000, 100000]:
+        tables = synthetic_tables(size)
+        start = time.perf_counter()
+        matcher = KeywordMatcher(tables)
+        build_ms = (time.perf_counter() - start) * 1e3
+        repeat = max(1, 20000 // size)
+        automaton = time_per_message(matcher.match, repeat * 20)
+        naive = time_per_message(lambda message: naive_match(tables, message), repeat)
+        print(f"{size:>9}{build_ms:>10.1f}{automaton:>18.1f}{naive:>18.1f}")
@@ -0,0 +1,94 @@
+"""Startup time and memory of backend.py in fresh interpreters, against a budget
+
+Three phases, each measured --runs times in a new process:
+  import  `import backend`; what every worker fork, probe and CLI pays
+  live    import plus one /api/health/live request
+  ready   import plus warm_up(): model, translator and corpus loaded
+The run fails (exit 1) when the median import or live time exceeds its
+budget, so a change that drags torch or pandas back into import time is
+caught. Run from the repo root:
+
+    python benchmarks/bench_startup.py --runs 5 -o startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from common import ROOT, write_results
+
+CHILD = r'''
+import json, os, sys, time
+start = time.perf_counter()
+import backend
+result = {'import_s': time.perf_counter() - start}
+phase = sys.argv[1]
+if phase == 'live':
+    response = backend.app.test_client().get('/api/health/live')
+    result['status'] = response.status_code
+elif phase == 'ready':
+    result['ready'] = backend.warm_up()
+result['seconds'] = time.perf_counter() - start
+with open('/proc/self/statm') as f:
+    result['rss_mb'] = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+result['modules'] = sorted(m for m in ('pandas', 'torch', 'sentence_transformers', 'googletrans') if m in sys.modules)
+print(json.dumps(result))
+'''
+
+# Seconds; medians over the runs
+IMPORT_BUDGET = 1.0
+LIVE_BUDGET = 1.5
+
+
+def measure(phase, runs):
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, '-c', CHILD, phase], cwd=ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.exit(f"{phase} run failed:\n{completed.stderr[-2000:]}")
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET)
+    parser.add_argument('--live-budget', type=float, default=LIVE_BUDGET)
+    parser.add_argument('--ready-budget', type=float, default=0, help='seconds; 0 reports without a budget')
+    parser.add_argument('--skip-ready', action='store_true', help='do not load the model and data')
+    parser.add_argument('-o', '--output', help='result file (default: benchmarks/results/startup-<commit>-<time>.json)')
+    args = parser.parse_args()
+
+    budgets = {'import': args.import_budget, 'live': args.live_budget, 'ready': args.ready_budget}
+    phases = ['import', 'live'] + ([] if args.skip_ready else ['ready'])
+    results = []
+    over = []
+    for phase in phases:
+        samples = measure(phase, args.runs)
+        seconds = [sample['seconds'] for sample in samples]
+        median = statistics.median(seconds)
+        budget = budgets[phase] or None
+        entry = {
+            'name': f"startup.{phase}",
+            'unit': 's',
+            'n': len(seconds),
+            'p50': median,
+            'min': min(seconds),
+            'max': max(seconds),
+            'rss_mb': statistics.median(sample['rss_mb'] for sample in samples),
+            'modules': samples[-1]['modules'],
+            'budget': budget,
+        }
+        results.append(entry)
+        verdict = ''
+        if budget is not None:
+            verdict = 'ok' if median <= budget else 'OVER BUDGET'
+            if median > budget:
+                over.append(phase)
+        print(f"  {phase:<8}{median:>8.2f}s  rss {entry['rss_mb']:>7.0f} MB  budget {budget or '-':>5}  {verdict}"
+              f"  loaded: {', '.join(entry['modules']) or 'none'}", file=sys.stderr)
+
+    print(write_results('startup', {'runs': args.runs, 'budgets': budgets}, results, args.output))
+    sys.exit(1 if over else 0)
@@ -0,0 +1,81 @@
+"""Accuracy and speed of the Roman Urdu detector against the detectors it replaced
+
+Run from the repo root: python benchmarks/bench_urdu_detect.py
+"""
+import csv
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from edugate.urdu_detect import is_roman_urdu
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'roman_urdu_labeled.tsv')
+
+# The detectors backend.py and backend/app.py used before edugate.urdu_detect
+LEGACY_PATTERNS = [
+    r'\b(kya|hai|hain|ki|ka|ke|se|ko|ek|aur|ya|nahi|nahi|hai|haan)\b',
+    r'(ay|ain|ee|oo|aa)\b',
+    r'\b(test|exam|fees|passing|marks|date|fields|topics|rules)\b'
+]
+LEGACY_SUBSTRINGS = ['ki', 'kya', 'hain', 'hai', 'kya hain', 'se', 'tak', 'aur', 'ya']
+
+
+def legacy_regex(text):
+    text_lower = text.lower()
+    for pattern in LEGACY_PATTERNS:
+        if re.search(pattern, text_lower):
+            return True
+    return False
+
+
+def legacy_substring(text):
+    text_lower = text.lower()
+    return any(pattern in text_lower for pattern in LEGACY_SUBSTRINGS)
+
+
+def load_samples(path=DATA_FILE):
+    with open(path, encoding='utf-8') as f:
+        return [(row['label'] == 'urdu', row['text']) for row in csv.DictReader(f, delimiter='\t')]
+
+
+def evaluate(detector, samples, repeat=200):
+    tp = fp = fn = tn = 0
+    for is_urdu, text in samples:
+        predicted = detector(text)
+        if predicted and is_urdu:
+            tp += 1
+        elif predicted:
+            fp += 1
+        elif is_urdu:
+            fn += 1
+        else:
+            tn += 1
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in samples:
+            detector(text)
+    per_call = (time.perf_counter() - start) / (repeat * len(samples))
+
+    return {
+        'accuracy': (tp + tn) / len(samples),
+        'precision': tp / (tp + fp) if tp + fp else 0.0,
+        'recall': tp / (tp + fn) if tp + fn else 0.0,
+        'false_positives': fp,
+        'false_negatives': fn,
+        'us_per_call': per_call * 1e6,
+    }
+
+
+if __name__ == '__main__':
+    samples = load_samples()
+    print(f"{len(samples)} labelled questions ({sum(label for label, _ in samples)} Roman Urdu)")
+    print(f"{'detector':<18}{'accuracy':>10}{'precision':>11}{'recall':>8}{'FP':>5}{'FN':>5}{'us/call':>10}")
+    for name, detector in [('regex (backend)', legacy_regex), ('substring (app)', legacy_substring),
+                           ('urdu_detect', is_roman_urdu)]:
+        r = evaluate(detector, samples)
+        print(f"{name:<18}{r['accuracy']:>10.3f}{r['precision']:>11.3f}{r['recall']:>8.3f}"
+              f"{r['false_positives']:>5}{r['false_negatives']:>5}{r['us_per_call']:>10.2f}")
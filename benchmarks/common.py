@@ -0,0 +1,189 @@
+"""Shared helpers for the benchmark suite: synthetic data, timing and JSON results
+
+Every result file has the same envelope (benchmark name, git commit,
+machine, configuration, results list), so compare.py can diff any two
+runs of the same benchmark.
+"""
+import csv
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+DATA_DIR = os.path.join(ROOT, '.cache', 'benchmarks')
+
+sys.path.insert(0, ROOT)
+
+COLUMNS = ['Test Name', 'Frequency', 'Months Conducted', 'Fields Allowed', 'Topics', 'Marks Distribution',
+           'Rules', 'Accepted Alternative Tests', 'Source']
+
+FAMILIES = ['NAT', 'ECAT', 'MDCAT', 'NET', 'GAT', 'HAT', 'ETEA', 'GIKI', 'PIEAS', 'FAST', 'LUMS', 'UET']
+INSTITUTES = ['NTS', 'UET Lahore', 'NUST', 'PMDC', 'ETEA KP', 'HEC', 'COMSATS', 'Bahria', 'Air University']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+FIELDS = ['Pre-Engineering', 'Pre-Medical', 'Computer Science', 'Business', 'Arts', 'General Science',
+          'Commerce', 'Architecture', 'Law', 'Pharmacy']
+TOPICS = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'English', 'Verbal', 'Quantitative', 'Analytical',
+          'Computer', 'IQ', 'General Knowledge', 'Logical Reasoning', 'Islamiat', 'Pakistan Studies']
+FREQUENCIES = ['Once a year', 'Twice a year', 'Multiple times/year', 'Monthly', 'On demand']
+RULES = ['No negative marking', 'Negative marking 0.25', 'Valid for 1 year', 'Valid for 2 years',
+         'Calculator not allowed', 'Computer based']
+
+# English, Roman Urdu and entity-style questions, in the proportions students ask them
+QUESTIONS = [
+    "When is the ECAT test conducted?",
+    "What topics are covered in NAT-IE?",
+    "Which fields are allowed for MDCAT?",
+    "Is there negative marking in the NET test?",
+    "How many times a year is the GAT held?",
+    "What is the marks distribution of the ETEA test?",
+    "Which alternative tests does FAST accept?",
+    "NUST NET kab hota hai?",
+    "MDCAT ke topics kya hain?",
+    "ECAT mein negative marking hai ya nahi?",
+    "Computer science ke liye kaunsa test dena parega?",
+    "Tell me about tests for pre-medical students",
+    "Which test should I take for business admissions?",
+    "What is the official website for NTS?",
+]
+
+# One counselor conversation, replayed turn by turn by each edubot client
+EDUBOT_MESSAGES = [
+    "Hi, I just finished FSC pre-engineering",
+    "I want to study computer science, maybe abroad in Germany",
+    "My budget is around 50000 per semester",
+    "What scholarships can I apply for?",
+    "How is the NUST merit calculated?",
+    "Can you suggest how to prepare for the entry test?",
+]
+
+
+def synthetic_rows(rows, seed=0):
+    """Rows shaped like src/assets/asd.csv, with unique test names"""
+    rng = random.Random(seed)
+    for i in range(rows):
+        family = FAMILIES[i % len(FAMILIES)]
+        start = rng.randrange(12)
+        months = '; '.join(MONTHS[(start + k) % 12] for k in range(0, rng.randint(1, 4) * 3, 3))
+        mcqs = rng.choice([80, 100, 120, 150, 200])
+        yield [
+            f"{family}-{i:07d} ({rng.choice(INSTITUTES)})",
+            rng.choice(FREQUENCIES),
+            months,
+            f"{rng.choice(FIELDS)} (Undergraduate)",
+            '; '.join(rng.sample(TOPICS, rng.randint(3, 6))),
+            f"{mcqs} MCQs; {mcqs} marks",
+            '; '.join(rng.sample(RULES, 2)),
+            f"Accepted by universities using {rng.choice(INSTITUTES)} {family}",
+            f"{family.lower()}.edu.pk",
+        ]
+
+
+def synthetic_csv(rows, seed=0, directory=DATA_DIR):
+    """Path of a synthetic catalogue CSV, written once per (rows, seed)"""
+    path = os.path.join(directory, f"catalogue-{rows}-{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(synthetic_rows(rows, seed))
+        os.replace(tmp, path)
+    return path
+
+
+def load_chat_backend():
+    """Import backend/app.py, whose package name is shadowed by backend.py"""
+    spec = importlib.util.spec_from_file_location('chat_backend', os.path.join(ROOT, 'backend', 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples, scale=1e6):
+    """n/mean/p50/p95/p99/min/max of durations in seconds, scaled (default: microseconds)"""
+    values = sorted(s * scale for s in samples)
+    if not values:
+        return {'n': 0}
+    return {
+        'n': len(values),
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'min': values[0],
+        'max': values[-1],
+    }
+
+
+def time_calls(fn, args_list, min_time=0.2, max_calls=100000):
+    """Call fn(*args) cycling through args_list for at least min_time seconds; per-call durations"""
+    samples = []
+    deadline = time.perf_counter() + min_time
+    i = 0
+    while i < max_calls and (i < len(args_list) or time.perf_counter() < deadline):
+        args = args_list[i % len(args_list)]
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+        i += 1
+    return samples
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    """Machine and code version a result was measured on"""
+    import numpy
+    import pandas
+    return {
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+    }
+
+
+def write_results(benchmark, config, results, output=None):
+    """Write one result file and return its path"""
+    env = environment()
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        output = os.path.join(RESULTS_DIR, f"{benchmark}-{env['git_commit'] or 'nogit'}-{stamp}.json")
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    document = {
+        'benchmark': benchmark,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': env,
+        'config': config,
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+        f.write('\n')
+    return output
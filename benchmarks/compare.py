@@ -0,0 +1,65 @@
+"""Compare two result files of the same benchmark and flag regressions
+
+Results are matched by name and catalogue size; a p50 or p95 that grew
+by more than --threshold (or a load-test throughput that fell by more)
+is a regression, and the exit status is 1 if there is any.
+
+    python benchmarks/compare.py before.json after.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+
+# Lower is better for latencies, higher for throughput
+METRICS = [('p50', 1), ('p95', 1), ('throughput_rps', -1)]
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def keyed(document):
+    return {(result['name'], result.get('rows')): result for result in document['results']}
+
+
+def compare(before, after, threshold):
+    """(lines, regressions) for every result present in both files"""
+    old, new = keyed(before), keyed(after)
+    lines = []
+    regressions = 0
+    for key in sorted(old.keys() & new.keys(), key=lambda k: (k[0], k[1] or 0)):
+        name, rows = key
+        label = name if rows is None else f"{name} rows={rows}"
+        for metric, direction in METRICS:
+            a, b = old[key].get(metric), new[key].get(metric)
+            if not a or b is None:
+                continue
+            change = (b - a) / a
+            flag = ''
+            if change * direction > threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            elif change * direction < -threshold:
+                flag = '  improved'
+            lines.append(f"{label:<44}{metric:>16}{a:>14.2f}{b:>14.2f}{change:>+9.1%}{flag}")
+    for key in sorted(old.keys() - new.keys(), key=lambda k: (k[0], k[1] or 0)):
+        lines.append(f"{key[0]} rows={key[1]}: missing from the second file")
+    return lines, regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative change that counts (default 0.10)')
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    if before['benchmark'] != after['benchmark']:
+        sys.exit(f"cannot compare {before['benchmark']} with {after['benchmark']} results")
+    print(f"{before['benchmark']}: {before['environment'].get('git_commit')} -> {after['environment'].get('git_commit')}")
+    lines, regressions = compare(before, after, args.threshold)
+    print('\n'.join(lines))
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
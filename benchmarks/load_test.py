@@ -0,0 +1,198 @@
+"""Closed-loop load generator for /api/chat, /api/ask-bot and /api/edubot
+
+By default it starts a mock Mistral server with the given latency and
+serves both Flask apps in this process, so a run needs no network and no
+API key. In-process servers share the interpreter (and the GIL) with the
+client threads; for capacity planning start the server on its own, point
+it at `python -m edugate.mock_llm --latency 0.5` and pass --url.
+
+Each concurrency level runs N client threads that send --requests
+requests per endpoint back to back. Run from the repo root:
+
+    python benchmarks/load_test.py --concurrency 1,8,32 --latency 0.5 -o load.json
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+import requests
+
+from common import EDUBOT_MESSAGES, QUESTIONS, load_chat_backend, summarize, synthetic_csv, write_results
+
+ENDPOINTS = {
+    'chat': '/api/chat',
+    'ask-bot': '/api/ask-bot',
+    'edubot': '/api/edubot',
+}
+
+
+def payload(endpoint, i, session_id, unique):
+    """Request body for the i-th request of one client"""
+    if endpoint == 'edubot':
+        return {'sessionId': session_id, 'message': EDUBOT_MESSAGES[i % len(EDUBOT_MESSAGES)]}
+    question = QUESTIONS[i % len(QUESTIONS)]
+    if unique:
+        # Distinct questions, so the answer caches do not absorb the load
+        question = f"{question} ({session_id[:8]}-{i})"
+    return {'message': question} if endpoint == 'chat' else {'question': question}
+
+
+def run_level(url, endpoint, concurrency, total, unique, timeout):
+    """Send `total` requests from `concurrency` threads; latencies and status counts"""
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    issued = iter(range(total))
+
+    def client():
+        session = requests.Session()
+        session_id = str(uuid.uuid4())
+        while True:
+            with lock:
+                i = next(issued, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                response = session.post(url + ENDPOINTS[endpoint], json=payload(endpoint, i, session_id, unique),
+                                        timeout=timeout)
+                response.content
+                status = response.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - start
+
+
+def serve(app):
+    """Serve a WSGI app on a free local port; returns (base url, server)"""
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def start_in_process(args):
+    """Mock LLM plus both Flask apps; returns ({endpoint: base url}, mock server, shutdown)"""
+    from edugate.mock_llm import start_mock_server
+
+    mock = start_mock_server(latency=args.latency, token_latency=args.token_latency)
+    os.environ['MISTRAL_API_BASE'] = mock.base_url
+    os.environ.setdefault('MISTRAL_API_KEY', 'load-test')
+    os.environ.setdefault('CORPUS_WATCH_INTERVAL', '0')
+
+    import backend as ask_backend
+    chat_backend = load_chat_backend()
+
+    csv_path = synthetic_csv(args.rows) if args.rows else ask_backend.CSV_PATH
+    for module in (ask_backend, chat_backend):
+        module.corpus_loader.path = csv_path
+        module.corpus_loader.reload()
+    if not args.remote_translate:
+        # Roman Urdu the phrase table cannot handle stays untranslated instead of calling Google
+        ask_backend.urdu_translator.remote = lambda text: text
+
+    ask_url, ask_server = serve(ask_backend.app)
+    chat_url, chat_server = serve(chat_backend.app)
+    urls = {'chat': chat_url, 'ask-bot': ask_url, 'edubot': chat_url}
+
+    def shutdown():
+        for server in (ask_server, chat_server, mock):
+            server.shutdown()
+    return urls, mock, shutdown
+
+
+def run(urls, endpoints, levels, args, mock=None):
+    """Warm up, then run every concurrency level of every endpoint; one result per pair"""
+    results = []
+    for endpoint in endpoints:
+        run_level(urls[endpoint], endpoint, 1, args.warmup, args.unique, args.timeout)
+        for concurrency in levels:
+            llm_before = mock.request_count if mock else None
+            latencies, statuses, seconds = run_level(urls[endpoint], endpoint, concurrency, args.requests,
+                                                     args.unique, args.timeout)
+            entry = {
+                'name': f"{endpoint}@{concurrency}",
+                'endpoint': endpoint,
+                'concurrency': concurrency,
+                'requests': len(latencies),
+                'errors': len(latencies) - statuses.get(200, 0),
+                'statuses': {str(status): count for status, count in statuses.items()},
+                'seconds': seconds,
+                'throughput_rps': len(latencies) / seconds if seconds else None,
+                'unit': 'ms',
+                **summarize(latencies, scale=1e3),
+            }
+            if mock:
+                entry['llm_calls'] = mock.request_count - llm_before
+            results.append(entry)
+            print(f"  {entry['name']:<16}{entry['throughput_rps']:>9.1f} req/s   p50 {entry['p50']:>9.1f} ms"
+                  f"   p95 {entry['p95']:>9.1f} ms   p99 {entry['p99']:>9.1f} ms   errors {entry['errors']}",
+                  file=sys.stderr)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='base URL of a running server (default: serve in-process)')
+    parser.add_argument('--endpoints', default='chat,ask-bot,edubot')
+    parser.add_argument('--concurrency', default='1,8,32', help='comma-separated client thread counts')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and concurrency level')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per endpoint first')
+    parser.add_argument('--latency', type=float, default=0.2, help='mock LLM seconds per call (in-process only)')
+    parser.add_argument('--token-latency', type=float, default=0.0, help='mock LLM seconds per streamed word')
+    parser.add_argument('--rows', type=int, default=0, help='synthetic catalogue size (default: the repo CSV)')
+    parser.add_argument('--unique', action='store_true', help='make every question distinct to bypass caches')
+    parser.add_argument('--remote-translate', action='store_true', help='let Roman Urdu reach Google Translate')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('-o', '--output', help='result file (default: benchmarks/results/load-<commit>-<time>.json)')
+    args = parser.parse_args()
+    endpoints = [endpoint for endpoint in args.endpoints.split(',') if endpoint]
+    levels = [int(level) for level in args.concurrency.split(',') if level]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    # Per-request access logs and the backends' progress prints would drown the summary
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    mock = None
+    shutdown = None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if args.url:
+            urls = {endpoint: args.url.rstrip('/') for endpoint in endpoints}
+        else:
+            urls, mock, shutdown = start_in_process(args)
+        try:
+            results = run(urls, endpoints, levels, args, mock)
+        finally:
+            if shutdown:
+                shutdown()
+
+    config = {
+        'url': args.url,
+        'endpoints': endpoints,
+        'concurrency': levels,
+        'requests': args.requests,
+        'llm_latency': None if args.url else args.latency,
+        'token_latency': None if args.url else args.token_latency,
+        'rows': args.rows or None,
+        'unique': args.unique,
+    }
+    print(write_results('load', config, results, args.output))
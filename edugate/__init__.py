@@ -0,0 +1 @@
+"""Shared retrieval and chatbot helpers for the Education Gate backends"""
@@ -0,0 +1,141 @@
+"""Inverted-file (IVF) approximate nearest-neighbour index in NumPy
+
+Rows are clustered with spherical k-means into nlist lists; a query is
+scored against the centroids and then only against the rows of its
+nprobe closest lists. nprobe trades recall for latency: nprobe == nlist
+is an exact scan.
+"""
+import math
+import os
+
+import numpy as np
+
+from edugate.retrieval import EmbeddingIndex, normalize_rows, top_k_rows
+
+# Rows assigned per matrix product while clustering, to bound memory
+ASSIGN_CHUNK = 65536
+
+
+def default_nlist(n_rows):
+    """About sqrt(n) lists, the usual balance between centroid and list scans"""
+    return max(1, int(round(math.sqrt(n_rows))))
+
+
+def _assign(matrix, centroids):
+    labels = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), ASSIGN_CHUNK):
+        block = matrix[start:start + ASSIGN_CHUNK]
+        labels[start:start + ASSIGN_CHUNK] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(matrix, nlist, iterations=10, sample_size=None, seed=0):
+    """Unit-length centroids of nlist clusters of the (unit-length) rows"""
+    rng = np.random.default_rng(seed)
+    n_rows = len(matrix)
+    nlist = min(nlist, n_rows)
+    sample_size = min(n_rows, sample_size or max(nlist * 64, 10000))
+    sample = matrix[np.sort(rng.choice(n_rows, sample_size, replace=False))]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=nlist)
+        # Empty clusters restart from a random sample row
+        empty = counts == 0
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex(EmbeddingIndex):
+    """EmbeddingIndex that only scores the rows of the nprobe closest clusters
+
+    The row ids of every list are stored contiguously in `order`, with
+    list i spanning order[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, embeddings, nlist=None, nprobe=8, centroids=None, order=None, offsets=None, seed=0):
+        super().__init__(embeddings)
+        self.nprobe = nprobe
+        if centroids is None:
+            centroids = spherical_kmeans(self.matrix, nlist or default_nlist(len(self)), seed=seed)
+            labels = _assign(self.matrix, centroids)
+            order = np.argsort(labels, kind='stable').astype(np.int64)
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(centroids)))]).astype(np.int64)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.order = np.asarray(order, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    def search(self, query_embeddings, top_k=3, threshold=None, nprobe=None):
+        """Return a best-first list of (row index, cosine score) per query"""
+        queries = normalize_rows(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        if len(self) == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes = top_k_rows(queries @ self.centroids.T, nprobe)
+        results = []
+        for query, lists in zip(queries, probes):
+            ids = np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l, _ in lists])
+            if not len(ids):
+                results.append([])
+                continue
+            hits = top_k_rows((self.matrix[ids] @ query)[None, :], top_k, threshold)[0]
+            results.append([(int(ids[i]), score) for i, score in hits])
+        return results
+
+    def save(self, path):
+        """Write the clustering (not the embeddings) atomically to an .npz file"""
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, centroids=self.centroids, order=self.order, offsets=self.offsets)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, embeddings, nprobe=8):
+        """IVFIndex over embeddings from a saved clustering, or None if it does not fit"""
+        try:
+            with np.load(path) as saved:
+                centroids, order, offsets = saved['centroids'], saved['order'], saved['offsets']
+        except (OSError, KeyError, ValueError):
+            return None
+        index = cls.__new__(cls)
+        EmbeddingIndex.__init__(index, embeddings)
+        if len(order) != len(index) or (len(index) and centroids.shape[1] != index.matrix.shape[1]):
+            return None
+        index.nprobe = nprobe
+        index.centroids = centroids
+        index.order = order
+        index.offsets = offsets
+        return index
+
+
+def ivf_path(cache_dir, key, nlist):
+    """Where the clustering for one embeddings version and nlist is persisted"""
+    return os.path.join(cache_dir, f"ivf-{key[:16]}-{nlist}.npz")
+
+
+def load_or_build_ivf(embeddings, cache_dir, key, nlist=None, nprobe=8):
+    """IVFIndex for cached embeddings, reusing the clustering saved next to them"""
+    nlist = nlist or default_nlist(len(embeddings))
+    path = ivf_path(cache_dir, key, nlist)
+    index = IVFIndex.load(path, embeddings, nprobe=nprobe)
+    if index is not None:
+        print(f"✓ Loaded IVF index ({index.nlist} lists) from cache")
+        return index
+
+    index = IVFIndex(embeddings, nlist=nlist, nprobe=nprobe)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        index.save(path)
+    except OSError as e:
+        print(f"✗ Could not write IVF index: {e}")
+    print(f"✓ Built IVF index ({index.nlist} lists, nprobe={nprobe})")
+    return index
+
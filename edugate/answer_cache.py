@@ -0,0 +1,128 @@
+"""TTL + LRU cache of LLM answers with near-duplicate question matching"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(text):
+    """Lower-case, drop punctuation and collapse whitespace"""
+    return _SPACE_RE.sub(' ', _PUNCT_RE.sub(' ', text.lower())).strip()
+
+
+def _fingerprint(context):
+    return hashlib.blake2b('\n'.join(context).encode('utf-8'), digest_size=16).digest()
+
+
+class AnswerCache:
+    """Caches answers by normalized question, the IDs of the retrieved rows and the context sent
+
+    An exact key match is a hit. When an embed function is given, a question
+    that retrieved the same rows and context and whose embedding has at
+    least similarity_threshold cosine similarity to a cached question is a
+    hit too. Entries expire after ttl seconds and the least recently used
+    entry is evicted once max_size is reached. The context is part of the
+    key, so an answer built from rows that have since been reloaded with
+    new text never matches, even when it is stored after the reload; call
+    clear() on reload to free those entries.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600, similarity_threshold=0.95, embed=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._by_rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _vector(self, normalized):
+        if self.embed is None:
+            return None
+        vector = np.asarray(self.embed(normalized), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, question, row_ids, context=()):
+        """Return the cached answer for this question and context, or None"""
+        if self.max_size <= 0:
+            return None
+        normalized = normalize_question(question)
+        rows = (tuple(row_ids), _fingerprint(context))
+        key = (normalized, rows)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['answer']
+            candidates = list(self._by_rows.get(rows, ()))
+
+        if candidates and self.embed is not None:
+            vector = self._vector(normalized)
+            with self._lock:
+                live = [k for k in candidates if self._live_entry(k, now) is not None]
+                if live:
+                    matrix = np.stack([self._entries[k]['vector'] for k in live])
+                    scores = matrix @ vector
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.similarity_threshold:
+                        self._entries.move_to_end(live[best])
+                        self.hits += 1
+                        return self._entries[live[best]]['answer']
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, question, row_ids, answer, context=()):
+        """Store an answer for this question and context"""
+        if self.max_size <= 0:
+            return
+        normalized = normalize_question(question)
+        rows = (tuple(row_ids), _fingerprint(context))
+        key = (normalized, rows)
+        vector = self._vector(normalized)
+
+        with self._lock:
+            self._entries[key] = {'answer': answer, 'expires': time.monotonic() + self.ttl, 'vector': vector}
+            self._entries.move_to_end(key)
+            self._by_rows.setdefault(rows, set()).add(key)
+            while len(self._entries) > self.max_size:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget(old_key)
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+            self._by_rows.clear()
+
+    def _live_entry(self, key, now):
+        # Expired entries are dropped lazily when they are looked at or evicted
+        entry = self._entries.get(key)
+        if entry is not None and entry['expires'] <= now:
+            del self._entries[key]
+            self._forget(key)
+            return None
+        return entry
+
+    def _forget(self, key):
+        keys = self._by_rows.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_rows[key[1]]
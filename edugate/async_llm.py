@@ -0,0 +1,141 @@
+"""Asyncio Mistral client for the ASGI serving mode"""
+import asyncio
+import json
+import os
+import random
+
+import httpx
+
+from edugate import metrics
+from edugate.llm import DEFAULT_API_BASE, RETRY_STATUSES, LLMError
+
+
+class AsyncLLMClient:
+    """httpx-based counterpart of LLMClient for use on an event loop
+
+    Connections are pooled and kept alive, 429/5xx responses are retried
+    with exponential backoff, and an asyncio.Semaphore bounds calls in
+    flight. Every call accepts a deadline (an event-loop time); timeouts
+    shrink to fit it, and cancelling the calling task cancels the upstream
+    request.
+    """
+
+    def __init__(self, api_key=None, base_url=None, pool_size=100, max_concurrency=64,
+                 retries=3, backoff=0.5, connect_timeout=3.05, read_timeout=30):
+        self.api_key = api_key
+        self.base_url = (base_url or DEFAULT_API_BASE).rstrip('/')
+        self.retries = retries
+        self.backoff = backoff
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def _headers(self):
+        api_key = self.api_key or os.getenv('MISTRAL_API_KEY')
+        if not api_key:
+            raise LLMError('MISTRAL_API_KEY not configured')
+        return {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _timeout(self, read_timeout, deadline):
+        read = read_timeout or self.read_timeout
+        if deadline is not None:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            read = min(read, remaining)
+        return httpx.Timeout(read, connect=min(self.connect_timeout, read))
+
+    def _backoff_delay(self, attempt, response):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def _post(self, payload, read_timeout, deadline, stream=False):
+        """POST with retries on connect errors and retryable statuses"""
+        headers = self._headers()
+        url = f"{self.base_url}/chat/completions"
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                request = self._client.build_request('POST', url, json=payload, headers=headers,
+                                                     timeout=self._timeout(read_timeout, deadline))
+                response = await self._client.send(request, stream=stream)
+            except httpx.ConnectError as e:
+                if attempt == self.retries:
+                    metrics.inc('llm_errors_total', status='connection')
+                    raise LLMError(f"Request failed: {e}") from e
+            except httpx.HTTPError as e:
+                metrics.inc('llm_errors_total', status='connection')
+                raise LLMError(f"Request failed: {e}") from e
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    if response.status_code != 200:
+                        metrics.inc('llm_errors_total', status=response.status_code)
+                    return response
+                await response.aclose()
+            metrics.inc('llm_retries_total')
+            await asyncio.sleep(self._backoff_delay(attempt, response))
+
+    async def chat(self, messages, model, temperature=0.3, max_tokens=300, read_timeout=None, deadline=None):
+        """Return the stripped completion text for a list of chat messages"""
+        payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        async with self._slots:
+            with metrics.timed('llm'):
+                response = await self._post(payload, read_timeout, deadline)
+
+        if response.status_code != 200:
+            raise LLMError(f"{response.status_code} - {response.text[:200]}", response.status_code)
+        try:
+            return response.json()['choices'][0]['message']['content'].strip()
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMError(f"Malformed response: {e}") from e
+
+    async def stream_chat(self, messages, model, temperature=0.3, max_tokens=300, read_timeout=None, deadline=None):
+        """Yield completion text fragments as the API streams them"""
+        payload = {"model": model, "messages": messages, "temperature": temperature,
+                   "max_tokens": max_tokens, "stream": True}
+        async with self._slots:
+            response = await self._post(payload, read_timeout, deadline, stream=True)
+            try:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise LLMError(f"{response.status_code} - {response.text[:200]}", response.status_code)
+                async for line in response.aiter_lines():
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        break
+                    try:
+                        delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                    except (ValueError, KeyError, IndexError) as e:
+                        raise LLMError(f"Malformed stream chunk: {e}") from e
+                    if delta:
+                        yield delta
+            except httpx.HTTPError as e:
+                raise LLMError(f"Request failed: {e}") from e
+            finally:
+                await response.aclose()
+
+
+def create_async_client():
+    """AsyncLLMClient configured from the same environment as get_client()"""
+    return AsyncLLMClient(
+        base_url=os.getenv('MISTRAL_API_BASE'),
+        pool_size=int(os.getenv('ASYNC_LLM_POOL_SIZE', '100')),
+        max_concurrency=int(os.getenv('ASYNC_LLM_MAX_CONCURRENCY', '64')),
+        retries=int(os.getenv('LLM_RETRIES', '3')),
+        backoff=float(os.getenv('LLM_BACKOFF', '0.5')),
+        connect_timeout=float(os.getenv('LLM_CONNECT_TIMEOUT', '3.05')),
+        read_timeout=float(os.getenv('LLM_READ_TIMEOUT', '30')),
+    )
@@ -0,0 +1,70 @@
+"""Compact, read-only string columns
+
+A list of a million Python strings costs ~50 bytes of object header per
+entry on top of the text, and every read bumps a refcount, so after a
+fork each worker slowly copies the pages it touches. StringColumn keeps
+the UTF-8 bytes in one buffer and the row boundaries in an int64 array:
+two objects per column, and when saved to disk they can be memory-mapped
+so every process shares the same page-cache copy.
+"""
+import os
+
+import numpy as np
+
+
+class StringColumn:
+    """Immutable sequence of strings backed by a byte buffer and offsets
+
+    Row i is data[offsets[i]:offsets[i + 1]] decoded as UTF-8. Indexing,
+    len() and iteration behave like the list it was built from.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+        self._buffer = memoryview(np.ascontiguousarray(data, dtype=np.uint8))
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('StringColumn index out of range')
+        return str(self._buffer[int(self.offsets[i]):int(self.offsets[i + 1])], 'utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.offsets.nbytes
+
+    def save(self, prefix):
+        """Write <prefix>.utf8.npy and <prefix>.offsets.npy, each atomically"""
+        for suffix, array in (('utf8', self.data), ('offsets', self.offsets)):
+            path = f"{prefix}.{suffix}.npy"
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                np.save(f, np.asarray(array))
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, prefix):
+        """Memory-map a saved column; raises OSError or ValueError if it is missing or damaged"""
+        data = np.load(f"{prefix}.utf8.npy", mmap_mode='r')
+        offsets = np.load(f"{prefix}.offsets.npy", mmap_mode='r')
+        if offsets.ndim != 1 or not len(offsets) or int(offsets[-1]) != len(data):
+            raise ValueError(f"{prefix}: offsets do not match the data")
+        return cls(data, offsets)
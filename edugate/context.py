@@ -0,0 +1,98 @@
+"""Prompt context packed into a token budget
+
+The row texts hold every column of a row, including the source URL and
+long rule lists, whatever the question asked. ContextPacker instead
+rebuilds each retrieved row from its cells: only the columns the question
+names (or every column but the low-value ones when it names none), long
+cells trimmed, and columns whose value is the same in every row written
+once. Rows are added best first for as long as the estimated token count
+stays within the budget.
+"""
+import re
+
+from edugate.metrics import inc
+
+# Mistral's tokenizers split numbers into single digits and most words into pieces of a few
+# characters; counting that way slightly overestimates, which is the safe side for a budget
+_TOKEN_RE = re.compile(r'\d|[^\W\d_]{1,4}|[^\w\s]')
+
+
+def count_tokens(text):
+    """Local estimate of the number of LLM tokens in text"""
+    return len(_TOKEN_RE.findall(text))
+
+
+def trim_tokens(text, max_tokens):
+    """text cut after max_tokens estimated tokens, marked with an ellipsis when cut"""
+    if max_tokens <= 0:
+        return ''
+    for count, match in enumerate(_TOKEN_RE.finditer(text), 1):
+        if count == max_tokens:
+            end = match.end()
+            return text if not text[end:].strip() else text[:end].rstrip() + '…'
+    return text
+
+
+class ContextPacker:
+    """Formats retrieved rows as prompt context within `budget` tokens
+
+    Cells come from an EntityIndex, which already keeps them column-wise.
+    Every cell is cut to max_cell_tokens; drop_columns are left out unless
+    the question names them.
+    """
+
+    def __init__(self, budget=400, max_cell_tokens=48, drop_columns=('Source',)):
+        self.budget = budget
+        self.max_cell_tokens = max_cell_tokens
+        self.drop_columns = set(drop_columns)
+
+    def columns(self, entities, fields):
+        """Columns to show: the ones the question named, else all but drop_columns"""
+        if fields:
+            return [field for field in entities.fields if field in fields]
+        return [field for field in entities.fields if field not in self.drop_columns]
+
+    def render(self, entities, rows, columns):
+        """Context lines for rows, with columns shared by all of them on one line"""
+        cells = {row: {column: entities.value(row, column) for column in columns} for row in rows}
+        shared = []
+        if len(rows) > 1:
+            shared = [column for column in columns
+                      if cells[rows[0]][column] is not None
+                      and all(cells[row][column] == cells[rows[0]][column] for row in rows)]
+
+        lines = []
+        if shared:
+            lines.append('All rows below: ' + '. '.join(
+                f"{column}: {trim_tokens(cells[rows[0]][column], self.max_cell_tokens)}" for column in shared) + '.')
+        for row in rows:
+            parts = [f"{entities.name_column}: {entities.names[row]}"]
+            parts.extend(f"{column}: {trim_tokens(cells[row][column], self.max_cell_tokens)}"
+                         for column in columns if column not in shared and cells[row][column] is not None)
+            lines.append('. '.join(parts) + '.')
+        return lines
+
+    def pack(self, entities, row_ids, fields=()):
+        """(context lines, row IDs they cover): the most best-first rows that fit the budget
+
+        The first row is always included, cut to the budget if it does not
+        fit on its own.
+        """
+        row_ids = list(row_ids)
+        if not row_ids:
+            return [], []
+        columns = self.columns(entities, fields)
+
+        lines = self.render(entities, row_ids[:1], columns)
+        used = row_ids[:1]
+        for count in range(2, len(row_ids) + 1):
+            candidate = self.render(entities, row_ids[:count], columns)
+            if count_tokens('\n'.join(candidate)) > self.budget:
+                break
+            lines, used = candidate, row_ids[:count]
+        if count_tokens('\n'.join(lines)) > self.budget:
+            lines = [trim_tokens('\n'.join(lines), self.budget)]
+
+        inc('context_rows_total', len(used))
+        inc('context_tokens_total', count_tokens('\n'.join(lines)))
+        return lines, used
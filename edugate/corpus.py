@@ -0,0 +1,226 @@
+"""Process-level CSV corpus with precomputed row texts and a token index"""
+import io
+import os
+import threading
+import time
+from collections import defaultdict
+
+from edugate.columns import StringColumn
+from edugate.lexical import BM25Index
+from edugate.metrics import timed
+
+
+def tokenize(text):
+    """Lower-cased whitespace tokens, matching simple_similarity"""
+    return set(text.lower().split())
+
+
+class KeywordCorpus:
+    """Row texts, their token sets and an inverted index from token to rows"""
+
+    def __init__(self, df, row_to_text, with_bm25=False):
+        self.df = df
+        with timed('row_text'):
+            self.texts = [row_to_text(row) for _, row in df.iterrows()]
+        self.token_sets = [tokenize(text) for text in self.texts]
+
+        postings = defaultdict(list)
+        for row_id, tokens in enumerate(self.token_sets):
+            for token in tokens:
+                postings[token].append(row_id)
+        self.postings = dict(postings)
+        self.bm25 = BM25Index(self.texts) if with_bm25 else None
+
+        # Set by the owning backend once it has picked its scorers
+        self.retriever = None
+        self.entities = None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def jaccard_search(self, question, top_k=3, threshold=0.0):
+        """Return best-first (row index, Jaccard score) pairs above threshold
+
+        Only rows sharing at least one token with the question are scored;
+        every other row has a similarity of zero.
+        """
+        query = tokenize(question)
+        if not query:
+            return []
+
+        overlap = defaultdict(int)
+        for token in query:
+            for row_id in self.postings.get(token, ()):
+                overlap[row_id] += 1
+
+        scored = []
+        for row_id, shared in overlap.items():
+            union = len(query) + len(self.token_sets[row_id]) - shared
+            score = shared / union
+            if score > threshold:
+                scored.append((row_id, score))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:top_k]
+
+
+class RowCorpus:
+    """Row texts of a CSV; the owning backend attaches its indexes
+
+    Texts are held as a StringColumn (memory-mapped when they come from the
+    embedding cache) and no DataFrame or per-row dicts are kept: the entity
+    index stores the cells it answers from column-wise.
+    """
+
+    def __init__(self, texts):
+        self.texts = texts if isinstance(texts, StringColumn) else StringColumn.from_strings(texts)
+        self.embeddings = None
+        self.embedding_index = None
+        self.lexical_index = None
+        self.retriever = None
+        self.entities = None
+        self.version = 0
+
+    def __len__(self):
+        return len(self.texts)
+
+
+def read_csv_bytes(data):
+    """DataFrame from CSV bytes, falling back to Windows-1252 for files saved by Excel"""
+    # Imported here so processes that never load a CSV never pay for pandas
+    import pandas as pd
+    try:
+        return pd.read_csv(io.BytesIO(data))
+    except UnicodeDecodeError:
+        return pd.read_csv(io.BytesIO(data), encoding='cp1252')
+
+
+class CorpusLoader:
+    """Versioned corpus that is rebuilt off to the side and swapped in atomically
+
+    Readers call get() and keep using the corpus object it returns for the
+    whole request, so they never see a half-built index. Once a corpus
+    exists, get() does not wait for rebuilds: a changed mtime starts one
+    background rebuild and the old corpus is served until the new one is
+    published with a single reference assignment. Only the first load
+    blocks. Rebuilds are single-flight; callers that ask while one is
+    running share it. With watch_interval > 0 a daemon thread polls the
+    file so edits are picked up even when no requests arrive.
+    """
+
+    def __init__(self, path, build, on_publish=None, watch_interval=0):
+        self.path = path
+        self.build = build
+        self.on_publish = on_publish
+        self.watch_interval = watch_interval
+        self.version = 0
+        self.loaded_at = None
+        self.last_error = None
+        self._corpus = None
+        self._mtime = None
+        self._failed_mtime = None
+        self._rebuild = None
+        self._watcher = None
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            self.last_error = str(e)
+            return None
+
+    def get(self):
+        """Return the current corpus, starting a rebuild if the file changed"""
+        mtime = self._stat()
+        if mtime is not None and mtime != self._mtime and mtime != self._failed_mtime:
+            self.reload(wait=self._corpus is None)
+        return self._corpus
+
+    def reload(self, wait=True):
+        """Rebuild from the file now; True when the (shared) rebuild succeeded
+
+        With wait=False the rebuild runs on a background thread and the
+        return value only says whether one is running.
+        """
+        with self._lock:
+            rebuild = self._rebuild
+            owner = rebuild is None
+            if owner:
+                rebuild = self._rebuild = {'done': threading.Event(), 'ok': False}
+
+        if owner:
+            if wait:
+                self._run(rebuild)
+            else:
+                threading.Thread(target=self._run, args=(rebuild,), daemon=True).start()
+                return True
+        elif not wait:
+            return True
+
+        rebuild['done'].wait()
+        return rebuild['ok']
+
+    def _run(self, rebuild):
+        try:
+            # Stat before reading so an edit made during the build triggers another one
+            mtime = self._stat()
+            error = 'build failed'
+            try:
+                with timed('corpus_build'):
+                    corpus = self.build(self.path)
+            except Exception as e:
+                print(f"Error loading Excel: {e}")
+                corpus = None
+                error = str(e)
+
+            if corpus is None:
+                # Not retried until the file changes again
+                self._failed_mtime = mtime
+                self.last_error = error
+                return
+
+            corpus.version = self.version + 1
+            self._corpus = corpus
+            self.version = corpus.version
+            self._mtime = mtime
+            self._failed_mtime = None
+            self.loaded_at = time.time()
+            self.last_error = None
+            rebuild['ok'] = True
+            if self.on_publish is not None:
+                self.on_publish(corpus)
+            self._start_watcher()
+        finally:
+            with self._lock:
+                self._rebuild = None
+            rebuild['done'].set()
+
+    def _start_watcher(self):
+        if self.watch_interval > 0 and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+
+    def after_fork(self):
+        """Reset thread state in a forked child, which inherits none of the parent's threads"""
+        self._lock = threading.Lock()
+        self._rebuild = None
+        self._watcher = None
+        if self._corpus is not None:
+            self._start_watcher()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            self.get()
+
+    def status(self):
+        """Version and load state for health checks"""
+        corpus = self._corpus
+        return {
+            'version': self.version,
+            'rows': len(corpus) if corpus is not None else 0,
+            'loaded_at': self.loaded_at,
+            'reloading': self._rebuild is not None,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,170 @@
+"""On-disk cache of row texts and their embeddings"""
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from edugate.columns import StringColumn
+from edugate.retrieval import normalize_rows
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'embeddings')
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def _sha256(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def text_hash(text):
+    """Stable hash of a single row text"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Memory-mapped .npy files of row texts and embeddings plus a JSON manifest
+
+    The cache key covers the CSV bytes, the model name and the row-text
+    format, so any of them changing invalidates the fast path. Rows whose
+    text is unchanged keep their previous embedding and are not re-encoded.
+    Embeddings are stored unit-length and texts as a StringColumn, so every
+    worker maps the same read-only files instead of holding its own copy.
+    """
+
+    def __init__(self, model_name, text_format, cache_dir=None):
+        self.model_name = model_name
+        self.text_format = text_format
+        self.cache_dir = cache_dir or os.getenv('EMBEDDING_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.cache_dir, MANIFEST_FILE)
+
+    def key(self, csv_bytes):
+        """Cache key for a CSV file under the current model and text format"""
+        return _sha256(csv_bytes, self.model_name, self.text_format)
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read_embeddings(self, manifest):
+        try:
+            matrix = np.load(os.path.join(self.cache_dir, manifest['embeddings_file']), mmap_mode='r')
+        except (KeyError, OSError, ValueError):
+            return None
+        if matrix.ndim != 2 or list(matrix.shape) != manifest.get('shape'):
+            return None
+        return matrix
+
+    def _read_texts(self, manifest, n_rows):
+        try:
+            texts = StringColumn.load(os.path.join(self.cache_dir, manifest['texts_file']))
+        except (KeyError, OSError, ValueError):
+            return None
+        return texts if len(texts) == n_rows else None
+
+    def _read_hashes(self, manifest):
+        try:
+            return [h.decode('ascii') for h in np.load(os.path.join(self.cache_dir, manifest['hashes_file']))]
+        except (KeyError, OSError, ValueError):
+            return []
+
+    def load(self, csv_bytes):
+        """Return memory-mapped (texts, embeddings) for unchanged data, otherwise None"""
+        manifest = self._read_manifest()
+        if not manifest or manifest.get('key') != self.key(csv_bytes):
+            return None
+        matrix = self._read_embeddings(manifest)
+        if matrix is None:
+            return None
+        texts = self._read_texts(manifest, len(matrix))
+        if texts is None:
+            return None
+        return texts, matrix
+
+    def store(self, csv_bytes, texts, encode):
+        """Encode rows missing from the cache, persist everything and return the unit-length embeddings"""
+        texts = list(texts)
+        hashes = [text_hash(t) for t in texts]
+
+        # Reuse rows whose text already has an embedding from the previous run
+        previous = {}
+        manifest = self._read_manifest()
+        old_matrix = None
+        if manifest and manifest.get('model') == self.model_name and manifest.get('text_format') == self.text_format:
+            old_matrix = self._read_embeddings(manifest)
+            if old_matrix is not None:
+                previous = {h: i for i, h in enumerate(self._read_hashes(manifest))}
+
+        missing = [i for i, h in enumerate(hashes) if h not in previous]
+        fresh = np.asarray(encode([texts[i] for i in missing]), dtype=np.float32) if missing else None
+
+        dim = fresh.shape[1] if fresh is not None else (old_matrix.shape[1] if old_matrix is not None else 0)
+        matrix = np.empty((len(texts), dim), dtype=np.float32)
+        for pos, i in enumerate(missing):
+            matrix[i] = fresh[pos]
+        for i, h in enumerate(hashes):
+            if h in previous:
+                matrix[i] = old_matrix[previous[h]]
+        matrix = normalize_rows(matrix)
+
+        try:
+            self._write(csv_bytes, texts, hashes, matrix)
+        except OSError as e:
+            print(f"✗ Could not write embedding cache: {e}")
+
+        print(f"✓ Encoded {len(missing)} of {len(texts)} rows ({len(texts) - len(missing)} from cache)")
+        return matrix
+
+    def _write(self, csv_bytes, texts, hashes, matrix):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        key = self.key(csv_bytes)
+        previous = self._read_manifest()
+
+        # Each version gets its own files; swapping the manifest publishes them atomically
+        embeddings_file = f"embeddings-{key[:16]}.npy"
+        texts_file = f"texts-{key[:16]}"
+        hashes_file = f"hashes-{key[:16]}.npy"
+        for name, array in ((embeddings_file, matrix), (hashes_file, np.array(hashes, dtype='S40'))):
+            tmp = os.path.join(self.cache_dir, f"{name}.{os.getpid()}.tmp")
+            with open(tmp, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp, os.path.join(self.cache_dir, name))
+        StringColumn.from_strings(texts).save(os.path.join(self.cache_dir, texts_file))
+
+        manifest = {
+            'key': key,
+            'model': self.model_name,
+            'text_format': self.text_format,
+            'embeddings_file': embeddings_file,
+            'texts_file': texts_file,
+            'hashes_file': hashes_file,
+            'shape': list(matrix.shape),
+            'dtype': str(matrix.dtype),
+        }
+        tmp_manifest = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, self.manifest_path)
+
+        # Processes still mapping the old files keep them alive until they let go;
+        # this also drops the IVF clustering and quantized codes derived from them
+        old_key = (previous or {}).get('key', '')
+        if old_key and old_key[:16] != key[:16]:
+            for path in glob.glob(os.path.join(self.cache_dir, f"*-{old_key[:16]}*")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,177 @@
+"""Query embeddings through an LRU cache and micro-batched model calls
+
+Each /api/ask-bot request embeds one short question. Run separately,
+concurrent requests make many one-sentence forward passes that compete
+for the CPU, although a batched encode of MiniLM costs little more than
+a single one. EncoderService answers repeat questions from an LRU cache
+and queues the rest. The first waiting caller holds the queue open for up
+to max_wait seconds (or until max_batch texts are queued), then runs one
+encode for everything queued and hands the vectors back to their callers.
+Only one batch runs at a time; callers arriving meanwhile form the next.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from edugate import metrics
+from edugate.answer_cache import normalize_question
+
+
+class _Slot:
+    def __init__(self, text):
+        self.text = text
+        self.queued = time.monotonic()
+        self.started = self.finished = None
+        self.vector = None
+        self.error = None
+        self.done = False
+
+
+class EncoderService:
+    """encode(texts) with caching and micro-batching in front of a batch encode function
+
+    Texts that normalize to the same question share one cache entry and,
+    when queued together, one row of the batch (counted in `shared`). A
+    failed batch raises its exception in every caller that was waiting on it.
+    """
+
+    def __init__(self, encode, cache_size=2048, max_batch=32, max_wait=0.005):
+        self._encode = encode
+        self.cache_size = cache_size
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.after_fork()
+        self.requests = 0
+        self.cache_hits = 0
+        self.shared = 0
+        self.encoded = 0
+        self.failed = 0
+        self.batches = 0
+        self.encode_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def after_fork(self):
+        """Fresh lock and queue; another thread may have held them when the process forked"""
+        self._cond = threading.Condition()
+        self._cache = OrderedDict()
+        self._queue = []
+        self._slots = {}
+        self._collecting = False
+
+    def encode(self, texts):
+        """(len(texts), dim) float32 embeddings, in order"""
+        keys = [normalize_question(text) or text for text in texts]
+        vectors = {}
+        slots = {}
+        with self._cond:
+            self.requests += len(keys)
+            for key, text in zip(keys, texts):
+                if key in vectors or key in slots:
+                    continue
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    vectors[key] = vector
+                    continue
+                slot = self._slots.get(key)
+                if slot is None:
+                    slot = self._slots[key] = _Slot(text)
+                    self._queue.append((key, slot))
+                else:
+                    self.shared += 1
+                slots[key] = slot
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+
+        if slots:
+            self._wait(list(slots.values()))
+            # Per caller, so the Server-Timing of each request shows its own wait
+            metrics.observe_stage('encode_queue', max(slot.started - slot.queued for slot in slots.values()))
+            metrics.observe_stage('encode', max(slot.finished - slot.started for slot in slots.values()))
+            for key, slot in slots.items():
+                if slot.error is not None:
+                    raise slot.error
+                vectors[key] = slot.vector
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+    def _wait(self, slots):
+        while True:
+            with self._cond:
+                while not all(slot.done for slot in slots) and (self._collecting or not self._queue):
+                    self._cond.wait()
+                if all(slot.done for slot in slots):
+                    return
+                # Lead the next batch: give concurrent callers max_wait to join it
+                self._collecting = True
+                deadline = time.monotonic() + self.max_wait
+                while len(self._queue) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+            try:
+                self._run(batch)
+            finally:
+                with self._cond:
+                    self._collecting = False
+                    self._cond.notify_all()
+
+    def _run(self, batch):
+        started = time.monotonic()
+        try:
+            matrix = np.asarray(self._encode([slot.text for _, slot in batch]), dtype=np.float32)
+            error = None
+        except Exception as e:
+            matrix, error = None, e
+        finished = time.monotonic()
+        seconds = finished - started
+
+        with self._cond:
+            self.batches += 1
+            self.encode_seconds += seconds
+            for i, (key, slot) in enumerate(batch):
+                waited = started - slot.queued
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+                self._slots.pop(key, None)
+                slot.started, slot.finished = started, finished
+                slot.done = True
+                if error is not None:
+                    slot.error = error
+                    self.failed += 1
+                    continue
+                slot.vector = matrix[i]
+                self.encoded += 1
+                if self.cache_size > 0:
+                    self._cache[key] = slot.vector
+                    self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self):
+        """Counters and derived rates for health checks"""
+        with self._cond:
+            waited = self.encoded + self.failed
+            return {
+                'requests': self.requests,
+                'cache_hits': self.cache_hits,
+                'shared': self.shared,
+                'cache_size': len(self._cache),
+                'queued': len(self._queue),
+                'batches': self.batches,
+                'encoded': self.encoded,
+                'failed': self.failed,
+                'mean_batch_size': waited / self.batches if self.batches else None,
+                'mean_wait_ms': self.wait_seconds / waited * 1e3 if waited else None,
+                'max_wait_ms': self.max_wait_seconds * 1e3,
+                'encode_seconds': self.encode_seconds,
+                'texts_per_second': self.encoded / self.encode_seconds if self.encode_seconds else None,
+            }
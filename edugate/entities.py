@@ -0,0 +1,184 @@
+"""Entity index over test names and column names for direct lookups
+
+Questions such as "NAT-IE marks distribution" name a row (by its test
+name or an alias of it) and a column. EntityIndex finds both with dict
+lookups of the question's word n-grams, so a lookup costs the same for
+25 rows as for a million. Only a question that names its columns by
+their own names and says nothing else ("what is the NAT-IE marks
+distribution") is answered straight from the CSV cells; for anything
+more ("passing marks for ECAT") the named rows are the LLM context.
+"""
+import re
+from collections import defaultdict
+
+from edugate.columns import StringColumn
+
+# Extra ways students ask for each column; the column name itself always matches
+FIELD_SYNONYMS = {
+    'Frequency': ['how often', 'how many times', 'times a year', 'times per year', 'frequency'],
+    'Months Conducted': ['months', 'month', 'when', 'conducted', 'held', 'dates', 'date', 'schedule'],
+    'Fields Allowed': ['fields', 'field', 'eligible', 'eligibility', 'programs', 'programmes', 'who can take'],
+    'Topics': ['topics', 'topic', 'syllabus', 'subjects', 'covered'],
+    'Marks Distribution': ['marks distribution', 'marks', 'total marks', 'mcqs', 'mcq', 'how many questions',
+                           'pattern', 'paper pattern'],
+    'Rules': ['rules', 'negative marking', 'validity', 'valid'],
+    'Accepted Alternative Tests': ['alternative', 'alternatives', 'alternative tests', 'accepted tests', 'instead'],
+    'Source': ['source', 'website', 'official site', 'link'],
+}
+
+# Words that leave a question's meaning to the test and column it names
+QUESTION_WORDS = frozenset('what which is are was the a an of for in on about to and me tell give show list '
+                           'please s its their do does i want know'.split())
+
+# Short names the generated aliases miss, keyed by Test Name
+EXTRA_ALIASES = {
+    'NUST NET': ['nust', 'nust entry test'],
+    'Habib University Admission Test': ['habib'],
+    'Bahria University CBT': ['bahria'],
+}
+
+# Words that describe what kind of test it is rather than which one
+GENERIC_SUFFIXES = ('admission test', 'entry test', 'aptitude test', 'cbt', 'general', 'test')
+
+_PAREN_RE = re.compile(r'\s*\(([^)]*)\)')
+_SPACE_RE = re.compile(r'\s+')
+# Letters and digits; punctuation only separates words, so "nat-ie" == "nat ie"
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def test_aliases(name):
+    """Lower-case ways of writing a test name, e.g. "ECAT (UET)" -> ecat, uet ecat, ecat uet"""
+    name = _SPACE_RE.sub(' ', name.lower()).strip()
+    base = _PAREN_RE.sub('', name).strip()
+    aliases = {name, base}
+    for qualifier in _PAREN_RE.findall(name):
+        aliases.update({f"{qualifier} {base}", f"{base} {qualifier}"})
+
+    if '-' in base:
+        # The family prefix ("nat" of NAT-IE) is shared by every test of the family
+        aliases.add(base.split('-')[0])
+    for alias in list(aliases):
+        if '-' in alias:
+            aliases.update({alias.replace('-', ' '), alias.replace('-', '')})
+    for alias in list(aliases):
+        for suffix in GENERIC_SUFFIXES:
+            if alias.endswith(' ' + suffix):
+                aliases.add(alias[:-len(suffix) - 1])
+    return {alias for alias in aliases if alias}
+
+
+def _aliases(name):
+    return sorted(test_aliases(name) | {alias.lower() for alias in EXTRA_ALIASES.get(name, [])})
+
+
+def _key(phrase):
+    return ' '.join(_WORD_RE.findall(phrase.lower()))
+
+
+def _cell(value, missing):
+    text = None if missing else str(value).strip()
+    return text if text not in ('', 'nan') else None
+
+
+def _maximal(spans):
+    """Drop hits that lie inside a longer hit, so "nat-ie" wins over "nat" """
+    # Compared per distinct interval: one alias can name many rows
+    intervals = {span[:2] for span in spans}
+    inner = {i for i in intervals if any(o != i and o[0] <= i[0] and i[1] <= o[1] for o in intervals)}
+    return [span for span in spans if span[:2] not in inner]
+
+
+class EntityIndex:
+    """Test-name and column-name matcher over one data frame
+
+    Aliases that several tests share (the family prefix "nat" of the
+    NAT-* rows) match every one of those rows, unless more than
+    max_alias_rows share it and it no longer picks anything out; a longer
+    alias that contains a shorter one ("nat-ie") wins over it.
+    """
+
+    def __init__(self, df, name_column='Test Name', field_synonyms=None, max_rows=4, max_alias_rows=50):
+        self.name_column = name_column
+        self.max_rows = max_rows
+        field_synonyms = FIELD_SYNONYMS if field_synonyms is None else field_synonyms
+
+        names = [str(name) for name in df[name_column]] if name_column in df.columns else []
+        self.fields = [column for column in df.columns if column != name_column]
+
+        # Word n-gram -> rows (or columns) it names
+        tests = defaultdict(list)
+        for row, name in enumerate(names):
+            for key in {_key(alias) for alias in _aliases(name)}:
+                if key:
+                    tests[key].append(row)
+        self._tests = {key: rows for key, rows in tests.items() if len(rows) <= max_alias_rows}
+        fields = defaultdict(list)
+        for column in self.fields:
+            for phrase in [column] + field_synonyms.get(column, []):
+                key = _key(phrase)
+                if key and column not in fields[key]:
+                    fields[key].append(column)
+        self._fields = dict(fields)
+        self._column_keys = {_key(column) for column in self.fields}
+        # Every proper word prefix of a key, so a scan stops as soon as no key can follow
+        self._prefixes = set()
+        for key in list(self._tests) + list(self._fields):
+            words = key.split(' ')
+            self._prefixes.update(' '.join(words[:i]) for i in range(1, len(words)))
+
+        # Column-wise cell text in StringColumns ('' for empty cells); the frame itself is not kept
+        self.names = StringColumn.from_strings(names)
+        self._columns = {field: StringColumn.from_strings([_cell(value, missing) or '' for value, missing
+                                                           in zip(df[field].tolist(), df[field].isna().tolist())])
+                         for field in self.fields}
+
+    def lookup(self, question):
+        """(rows, columns, exact): positional row indexes and column names the question mentions, in text order
+
+        exact is True when a direct answer fits the question: every column
+        was named by its own name rather than a synonym, and no words other
+        than QUESTION_WORDS are left once the tests and columns are taken out.
+        """
+        words = _WORD_RE.findall(question.lower())
+        spans = []
+        for start in range(len(words)):
+            key = words[start]
+            end = start + 1
+            while True:
+                spans.extend((start, end, 'test', row) for row in self._tests.get(key, ()))
+                spans.extend((start, end, 'field', column) for column in self._fields.get(key, ()))
+                if end == len(words) or key not in self._prefixes:
+                    break
+                key = f"{key} {words[end]}"
+                end += 1
+
+        rows = []
+        fields = []
+        covered = set()
+        explicit = True
+        for start, end, group, label in _maximal(spans):
+            covered.update(range(start, end))
+            if group == 'field' and ' '.join(words[start:end]) not in self._column_keys:
+                explicit = False
+            target = rows if group == 'test' else fields
+            if label not in target:
+                target.append(label)
+        leftover = [word for i, word in enumerate(words) if i not in covered and word not in QUESTION_WORDS]
+        return rows, fields, bool(rows and fields) and explicit and not leftover
+
+    def value(self, row, field):
+        """Cell text, or None when it is empty"""
+        return self._columns[field][row] or None
+
+    def answer(self, rows, fields):
+        """Direct answer for named tests and columns, or None when the data cannot give one"""
+        if not rows or not fields or len(rows) > self.max_rows:
+            return None
+        lines = []
+        for row in rows:
+            for field in fields:
+                value = self.value(row, field)
+                if value is None:
+                    return None
+                lines.append(f"{self.names[row]} - {field}: {value}")
+        return "\n".join(lines)
@@ -0,0 +1,69 @@
+"""Hybrid retrieval that fuses several rankers with reciprocal-rank fusion"""
+
+# Standard RRF damping constant; larger values flatten the gap between ranks
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Fuse best-first (row, score) lists into one best-first (row, fused score) list"""
+    fused = {}
+    for ranking in rankings:
+        for rank, (row_id, _) in enumerate(ranking):
+            fused[row_id] = fused.get(row_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
+
+
+class HybridRetriever:
+    """Runs every scorer over a shared corpus and fuses their rankings
+
+    Each scorer is called as scorer(questions, top_k) and returns, per
+    question, a best-first list of (row index, score) that already has its
+    own relevance threshold applied. A row only reaches the fused result if
+    at least one scorer found it relevant, so an empty result means nothing
+    in the corpus is worth sending to the LLM.
+    """
+
+    def __init__(self, texts, scorers, top_k=3, candidates=10, rrf_k=RRF_K, min_score=0.0):
+        self.texts = texts
+        self.scorers = scorers
+        self.top_k = top_k
+        self.candidates = max(candidates, top_k)
+        self.rrf_k = rrf_k
+        self.min_score = min_score
+
+    def search(self, question, top_k=None):
+        """Scored, de-duplicated rows for one question"""
+        return self.search_batch([question], top_k=top_k)[0]
+
+    def search_batch(self, questions, top_k=None):
+        """Scored, de-duplicated rows for each question, best first
+
+        Each row is a dict with its index, text, fused score and the raw
+        score from every scorer that ranked it.
+        """
+        questions = list(questions)
+        top_k = top_k or self.top_k
+        per_scorer = {name: scorer(questions, self.candidates) for name, scorer in self.scorers.items()}
+
+        results = []
+        for q in range(len(questions)):
+            rankings = {name: hits[q] for name, hits in per_scorer.items()}
+            fused = reciprocal_rank_fusion(rankings.values(), k=self.rrf_k)
+
+            rows = []
+            seen_texts = set()
+            for row_id, score in fused:
+                if score <= self.min_score or len(rows) >= top_k:
+                    break
+                text = self.texts[row_id]
+                if text in seen_texts:
+                    continue
+                seen_texts.add(text)
+                rows.append({
+                    'index': row_id,
+                    'text': text,
+                    'score': score,
+                    'scores': {name: s for name, hits in rankings.items() for i, s in hits if i == row_id},
+                })
+            results.append(rows)
+        return results
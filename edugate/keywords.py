@@ -0,0 +1,101 @@
+"""Aho-Corasick keyword matching with word-boundary semantics
+
+The automaton is built once from nested keyword tables
+({group: {label: [phrases]}}) and finds every phrase of every table in
+one left-to-right pass over the text, so the cost per message depends on
+the message length and the number of hits, not on the table sizes.
+"""
+
+
+class KeywordMatches:
+    """Labels found in one text, grouped and in keyword-table order"""
+
+    def __init__(self, groups, found):
+        self._groups = groups
+        self._found = found
+
+    def labels(self, group):
+        """Every matched label of a group, in the order the table lists them"""
+        return [label for label in self._groups.get(group, ()) if (group, label) in self._found]
+
+    def first(self, group):
+        """The first matched label of a group in table order, or None"""
+        for label in self._groups.get(group, ()):
+            if (group, label) in self._found:
+                return label
+        return None
+
+    def has(self, group, label=None):
+        """True when the label (or any label of the group) matched"""
+        if label is not None:
+            return (group, label) in self._found
+        return any(found_group == group for found_group, _ in self._found)
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over lower-cased characters
+
+    A phrase only counts when it is not glued to a letter or digit on
+    either side, so "us" does not fire inside "business" and "ba" does
+    not fire inside "about".
+    """
+
+    def __init__(self, tables):
+        self._groups = {group: list(labels) for group, labels in tables.items()}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for group, labels in tables.items():
+            for label, phrases in labels.items():
+                for phrase in phrases:
+                    self._add(phrase.lower(), (group, label))
+        self._link()
+
+    def _add(self, phrase, payload):
+        state = 0
+        for char in phrase:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(phrase), payload))
+
+    def _link(self):
+        # Breadth-first so every failure target is final before it is inherited
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def match(self, text):
+        """Return a KeywordMatches for every whole-word phrase in the text"""
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        end = len(text)
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            if i + 1 < end and text[i + 1].isalnum():
+                continue
+            for length, payload in out[state]:
+                start = i + 1 - length
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                found.add(payload)
+        return KeywordMatches(self._groups, found)
@@ -0,0 +1,55 @@
+"""Expensive objects built on first use, once per process
+
+Models, API clients and the data stack cost seconds and hundreds of MB
+to create. Wrapping them in Lazy keeps `import backend` cheap for worker
+forks, health probes and CLIs that never touch them, while the first
+real use (or an explicit warm-up before forking) builds them exactly once.
+"""
+import threading
+import time
+
+from edugate.metrics import observe_stage
+
+
+class Lazy:
+    """Holds factory(), called on the first get()
+
+    Threads that ask while the factory runs wait for that one call. A
+    failed build is not remembered, so the next get() tries again.
+    """
+
+    def __init__(self, factory, name):
+        self.factory = factory
+        self.name = name
+        self.load_seconds = None
+        self.last_error = None
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        """The value, building it first if this is the first call"""
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                try:
+                    value = self.factory()
+                except Exception as e:
+                    self.last_error = str(e)
+                    raise
+                self.load_seconds = time.perf_counter() - start
+                observe_stage(f"load_{self.name}", self.load_seconds)
+                self._value = value
+                self.last_error = None
+                self._loaded = True
+        return self._value
+
+    def status(self):
+        """Load state for health checks"""
+        return {'loaded': self._loaded, 'load_seconds': self.load_seconds, 'error': self.last_error}
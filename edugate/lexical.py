@@ -0,0 +1,110 @@
+"""BM25 lexical ranking with sparse postings scored in one pass"""
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+from edugate.retrieval import top_k_rows
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Question words that carry no signal about which row is relevant
+STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'about', 'by', 'can', 'do', 'does', 'for', 'how', 'i', 'in', 'is',
+    'it', 'me', 'of', 'on', 'or', 'tell', 'the', 'there', 'to', 'what', 'when', 'which', 'who',
+])
+
+# Longest suffixes first so "testing" loses "ing" rather than just "g"
+SUFFIXES = ('ing', 'ies', 'es', 'ed', 's')
+
+
+def stem(token):
+    """Strip a common English suffix, leaving at least three characters"""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            if suffix == 'ies':
+                return token[:-3] + 'y'
+            return token[:-len(suffix)]
+    return token
+
+
+def analyze(text):
+    """Lower-case, split on punctuation, drop stopwords and stem"""
+    return [stem(token) for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over row texts stored as a term-major sparse matrix
+
+    Each term owns a contiguous slice of (row, weight) postings, so scoring
+    a query is a sparse matrix-vector product: gather the slices for the
+    query terms and sum them per row with np.bincount.
+    """
+
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        docs = [Counter(analyze(text)) for text in texts]
+        self.n_rows = len(docs)
+
+        lengths = np.array([sum(doc.values()) for doc in docs], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.n_rows and lengths.sum() else 1.0
+
+        postings = {}
+        for row_id, doc in enumerate(docs):
+            for term, tf in doc.items():
+                postings.setdefault(term, []).append((row_id, tf))
+
+        self.vocabulary = {}
+        self.idf = np.zeros(len(postings), dtype=np.float32)
+        offsets = [0]
+        rows = []
+        weights = []
+        for term_id, (term, entries) in enumerate(postings.items()):
+            self.vocabulary[term] = term_id
+            idf = self._idf(len(entries))
+            self.idf[term_id] = idf
+            for row_id, tf in entries:
+                norm = k1 * (1 - b + b * lengths[row_id] / avg_length)
+                rows.append(row_id)
+                weights.append(idf * tf * (k1 + 1) / (tf + norm))
+            offsets.append(len(rows))
+
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.rows = np.array(rows, dtype=np.int64)
+        self.weights = np.array(weights, dtype=np.float32)
+
+    def __len__(self):
+        return self.n_rows
+
+    def _idf(self, doc_freq):
+        return math.log(1 + (self.n_rows - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def scores(self, query):
+        """Score every row against the query, normalized to roughly 0-1
+
+        Scores are divided by what a row of average length containing every
+        query term once would get. Terms missing from the corpus count
+        towards that bound, so a query of unknown words cannot look like a
+        strong match.
+        """
+        terms = set(analyze(query))
+        if not terms or not self.n_rows:
+            return np.zeros(self.n_rows, dtype=np.float32)
+
+        term_ids = [self.vocabulary[t] for t in terms if t in self.vocabulary]
+        bound = float(self.idf[term_ids].sum()) + (len(terms) - len(term_ids)) * self._idf(0)
+        if not term_ids:
+            return np.zeros(self.n_rows, dtype=np.float32)
+
+        slices = [np.arange(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+        picked = np.concatenate(slices)
+        totals = np.bincount(self.rows[picked], weights=self.weights[picked], minlength=self.n_rows)
+        return (totals / bound).astype(np.float32)
+
+    def search(self, query, top_k=3, threshold=0.0):
+        """Return best-first (row index, normalized score) pairs above threshold"""
+        if not self.n_rows or top_k <= 0:
+            return []
+        return top_k_rows(self.scores(query)[None, :], top_k, threshold)[0]
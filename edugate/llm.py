@@ -0,0 +1,189 @@
+"""Shared Mistral chat client with pooled connections, retries and bounded concurrency"""
+import json
+import os
+import threading
+
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from edugate import metrics
+
+# Point at a local stub (see edugate.mock_llm) to run without api.mistral.ai
+DEFAULT_API_BASE = 'https://api.mistral.ai/v1'
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LLMError(Exception):
+    """Raised when the LLM cannot produce a completion"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMClient:
+    """Mistral chat-completions client meant to be shared by every request
+
+    One requests.Session keeps HTTP connections alive across calls, urllib3
+    retries 429/5xx responses with exponential backoff (honouring
+    Retry-After), and a semaphore caps how many calls are in flight so a
+    burst of requests cannot stampede the API.
+    """
+
+    def __init__(self, api_key=None, base_url=None, pool_size=10, max_concurrency=8,
+                 retries=3, backoff=0.5, connect_timeout=3.05, read_timeout=30):
+        self.api_key = api_key
+        self.base_url = (base_url or DEFAULT_API_BASE).rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _headers(self):
+        api_key = self.api_key or os.getenv('MISTRAL_API_KEY')
+        if not api_key:
+            raise LLMError('MISTRAL_API_KEY not configured')
+        return {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _payload(self, messages, model, temperature, max_tokens, stream=False):
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def chat(self, messages, model, temperature=0.3, max_tokens=300, read_timeout=None):
+        """Return the stripped completion text for a list of chat messages"""
+        payload = self._payload(messages, model, temperature, max_tokens)
+        headers = self._headers()
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=timeout[1]):
+            _count_error('busy')
+            raise LLMError('Too many concurrent LLM requests')
+        metrics.observe_stage('llm_queue', time.perf_counter() - start)
+        try:
+            with metrics.timed('llm'):
+                response = self.session.post(f"{self.base_url}/chat/completions", json=payload, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            _count_error('connection')
+            raise LLMError(f"Request failed: {e}") from e
+        finally:
+            self._slots.release()
+
+        _count_retries(response)
+        if response.status_code != 200:
+            _count_error(response.status_code)
+            raise LLMError(f"{response.status_code} - {response.text[:200]}", response.status_code)
+        try:
+            return response.json()['choices'][0]['message']['content'].strip()
+        except (ValueError, KeyError, IndexError) as e:
+            _count_error('malformed')
+            raise LLMError(f"Malformed response: {e}") from e
+
+    def stream_chat(self, messages, model, temperature=0.3, max_tokens=300, read_timeout=None):
+        """Yield completion text fragments as the API streams them
+
+        The read timeout applies between chunks rather than to the whole
+        completion, and the concurrency slot is held until the stream ends.
+        """
+        payload = self._payload(messages, model, temperature, max_tokens, stream=True)
+        headers = self._headers()
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+
+        if not self._slots.acquire(timeout=timeout[1]):
+            _count_error('busy')
+            raise LLMError('Too many concurrent LLM requests')
+        start = time.perf_counter()
+        first = True
+        try:
+            response = self.session.post(f"{self.base_url}/chat/completions", json=payload, headers=headers,
+                                         timeout=timeout, stream=True)
+            _count_retries(response)
+            with response:
+                if response.status_code != 200:
+                    _count_error(response.status_code)
+                    raise LLMError(f"{response.status_code} - {response.text[:200]}", response.status_code)
+                response.encoding = 'utf-8'
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        break
+                    try:
+                        delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                    except (ValueError, KeyError, IndexError) as e:
+                        _count_error('malformed')
+                        raise LLMError(f"Malformed stream chunk: {e}") from e
+                    if delta:
+                        if first:
+                            metrics.observe_stage('llm_first_token', time.perf_counter() - start)
+                            first = False
+                        yield delta
+            metrics.observe_stage('llm_stream', time.perf_counter() - start)
+        except requests.RequestException as e:
+            _count_error('connection')
+            raise LLMError(f"Request failed: {e}") from e
+        finally:
+            self._slots.release()
+
+
+def _count_error(status):
+    metrics.inc('llm_errors_total', status=status)
+
+
+def _count_retries(response):
+    # urllib3 records every retried attempt in the Retry object it finished with
+    retries = getattr(getattr(response, 'raw', None), 'retries', None)
+    if retries is not None and retries.history:
+        metrics.inc('llm_retries_total', len(retries.history))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide LLMClient configured from the environment"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient(
+                    base_url=os.getenv('MISTRAL_API_BASE'),
+                    pool_size=int(os.getenv('LLM_POOL_SIZE', '10')),
+                    max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+                    retries=int(os.getenv('LLM_RETRIES', '3')),
+                    backoff=float(os.getenv('LLM_BACKOFF', '0.5')),
+                    connect_timeout=float(os.getenv('LLM_CONNECT_TIMEOUT', '3.05')),
+                    read_timeout=float(os.getenv('LLM_READ_TIMEOUT', '30')),
+                )
+    return _client
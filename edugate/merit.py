@@ -0,0 +1,270 @@
+"""Merit aggregates for single students and whole applicant lists
+
+An aggregate is a weighted sum of marks, each divided by its total: the
+counselor's standard formula is FSc/1100 x 0.30 + test/100 x 0.50 +
+interview/20 x 0.20. Universities differ in components, totals and
+weights, so schemes come from a table (DEFAULT_SCHEMES, extended or
+overridden by a JSON file of the same shape). A scheme scores a whole
+DataFrame with one matrix-vector product; rows with a missing or
+out-of-range mark get an error instead of an aggregate. CSV uploads are
+read and scored in chunks, then ranked per program and written back out
+in chunks.
+"""
+import io
+import json
+import re
+
+import numpy as np
+
+# key -> name and {component: [total marks, weight]}; weights of a scheme sum to 1
+DEFAULT_SCHEMES = {
+    'default': {
+        'name': 'Standard formula',
+        'components': {'fsc': [1100, 0.30], 'test': [100, 0.50], 'interview': [20, 0.20]},
+    },
+    'nust': {
+        'name': 'NUST (NET)',
+        'components': {'test': [200, 0.75], 'fsc': [1100, 0.15], 'matric': [1100, 0.10]},
+    },
+    'uet': {
+        'name': 'UET Lahore (ECAT)',
+        'components': {'matric': [1100, 0.17], 'fsc': [1100, 0.50], 'test': [400, 0.33]},
+    },
+}
+
+COMPONENT_LABELS = {'matric': 'Matric', 'fsc': 'FSc', 'test': 'Entry Test', 'interview': 'Interview'}
+
+# Column headers and chat words for each component, compared lowercased without punctuation
+ALIASES = {
+    'matric': 'matric', 'ssc': 'matric', 'olevel': 'matric', 'olevels': 'matric',
+    'fsc': 'fsc', 'hssc': 'fsc', 'inter': 'fsc', 'intermediate': 'fsc', 'alevel': 'fsc', 'alevels': 'fsc',
+    'test': 'test', 'entrytest': 'test', 'net': 'test', 'ecat': 'test', 'mdcat': 'test',
+    'interview': 'interview',
+    'program': 'program', 'programme': 'program', 'degree': 'program',
+}
+_HEADER_SUFFIXES = ('marksobtained', 'obtained', 'marks', 'score')
+
+_MARK_WORDS = r'matric|ssc|o[- ]?levels?|f\.?sc|hssc|intermediate|inter|a[- ]?levels?|entry test|test|net|ecat|mdcat|interview'
+_MONTHS = r'jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?'
+# A number followed by a unit, a count or a month ("in 2 months", "86%", "100 MCQs", "15 March",
+# "15th") is not a mark
+_NOT_MARK = (r'(?![\d.]|\s*(?:%|percent\b|(?:st|nd|rd|th)\b|(?:months?|years?|weeks?|days?|hours?|minutes?|mins?'
+             r'|mcqs?|questions?|seats?|students?|applicants?|candidates?|attempts?|times|sections?|subjects?'
+             rf'|{_MONTHS})\b))')
+_MARK_AFTER_RE = re.compile(rf'\b({_MARK_WORDS})\b([^\d\n]{{0,15}}?)(\d+(?:\.\d+)?){_NOT_MARK}', re.IGNORECASE)
+_MARK_BEFORE_RE = re.compile(rf'(?<![\d.])(\d+(?:\.\d+)?)\s*(?:marks\s*)?(?:in|for)\s+(?:my\s+|the\s+)?({_MARK_WORDS})\b', re.IGNORECASE)
+# Between a test word and its number these mean the number is a date, a grade, a count or a total
+# ("test is on 15", "test for grade 12", "ECAT has 100", "NET total is 200")
+_NOT_MARK_GAP_RE = re.compile(r'\b(?:on|at|by|before|after|until|till|since|from|grade|class|year|part|level|semester'
+                              r'|has|have|had|contains?|total|out|max|maximum|of)\b', re.IGNORECASE)
+# Wording that says a message is about the student's own marks: "got 160", "scored", "my marks", "160/200"
+_MARKS_WORDING_RE = re.compile(r'\b(?:got|get|getting|scored?|scoring|obtained|secured|marks?|result)\b|\d\s*/\s*\d',
+                               re.IGNORECASE)
+
+# Largest total in the default table; bigger numbers in chat are years, phone numbers and the like
+MAX_CHAT_MARK = 1100
+
+CSV_CHUNK_ROWS = 5000
+
+
+class MeritError(ValueError):
+    """Unknown scheme or unusable applicant data; reported to the client as a 400"""
+
+
+def canonical_column(header):
+    """Component or 'program' a column header stands for, or the header unchanged"""
+    name = re.sub(r'[^a-z]', '', str(header).lower())
+    for suffix in _HEADER_SUFFIXES:
+        if name.endswith(suffix) and name != suffix:
+            name = name[:-len(suffix)]
+            break
+    return ALIASES.get(name, header)
+
+
+def canonical_columns(frame):
+    """frame with recognized headers renamed; the first of several headers for one component wins"""
+    renames = {}
+    for column in frame.columns:
+        name = canonical_column(column)
+        if name != column and name not in frame.columns and name not in renames.values():
+            renames[column] = name
+    return frame.rename(columns=renames) if renames else frame
+
+
+def parse_marks(text, merit_intent=False):
+    """{component: mark} from phrases like "FSc 950, NET 160" or "I got 150 in ECAT"
+
+    Test names come up with dates, counts and grades as often as with
+    marks, so a message only counts when it is about merit (merit_intent),
+    uses marks wording ("got", "scored", "marks", "160/200") or lists
+    marks for more than one component.
+    """
+    marks = {}
+    pairs = [(word, value) for word, gap, value in _MARK_AFTER_RE.findall(text) if not _NOT_MARK_GAP_RE.search(gap)]
+    pairs += [(word, value) for value, word in _MARK_BEFORE_RE.findall(text)]
+    for word, value in pairs:
+        component = ALIASES.get(re.sub(r'[^a-z]', '', word.lower()))
+        value = float(value)
+        if component in COMPONENT_LABELS and value <= MAX_CHAT_MARK:
+            marks.setdefault(component, value)
+    if merit_intent or len(marks) > 1 or _MARKS_WORDING_RE.search(text):
+        return marks
+    return {}
+
+
+class MeritScheme:
+    """One university's weighting: components with their total marks and weights"""
+
+    def __init__(self, key, name, components):
+        self.key = key
+        self.name = name
+        self.columns = list(components)
+        self.totals = np.array([float(components[c][0]) for c in self.columns])
+        self.weights = np.array([float(components[c][1]) for c in self.columns])
+        if not self.columns or (self.totals <= 0).any() or (self.weights < 0).any() or abs(self.weights.sum() - 1) > 1e-6:
+            raise ValueError(f"merit scheme {key!r}: totals must be positive and weights non-negative and sum to 1")
+
+    def describe(self):
+        return {
+            'key': self.key,
+            'name': self.name,
+            'formula': self.formula(),
+            'components': [{'component': c, 'total': t, 'weight': w}
+                           for c, t, w in zip(self.columns, self.totals.tolist(), self.weights.tolist())],
+        }
+
+    def formula(self):
+        return ' + '.join(f"{COMPONENT_LABELS.get(c, c)}/{t:g} × {w:.2f}"
+                          for c, t, w in zip(self.columns, self.totals, self.weights))
+
+    def applies_to(self, marks):
+        """Whether marks has every component of this scheme"""
+        return all(marks.get(c) is not None for c in self.columns)
+
+    def score(self, frame):
+        """(aggregate percentages, error messages) for every row; NaN and a message where a mark is unusable"""
+        import pandas as pd
+        missing = [c for c in self.columns if c not in frame.columns]
+        if missing:
+            raise MeritError(f"{self.name} needs columns: {', '.join(missing)}")
+        marks = frame[self.columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        valid = ((marks >= 0) & (marks <= self.totals)).all(axis=1)
+        aggregates = np.where(valid, (marks / self.totals) @ self.weights * 100, np.nan).round(4)
+
+        errors = np.full(len(frame), '', dtype=object)
+        for row in np.flatnonzero(~valid):
+            problems = []
+            for column, mark, total in zip(self.columns, marks[row], self.totals):
+                if np.isnan(mark):
+                    problems.append(f"{column} missing")
+                elif not 0 <= mark <= total:
+                    problems.append(f"{column} not between 0 and {total:g}")
+            errors[row] = '; '.join(problems)
+        return aggregates, errors
+
+    def score_frame(self, frame):
+        """Copy of frame with 'aggregate' and 'error' columns"""
+        frame = canonical_columns(frame)
+        aggregates, errors = self.score(frame)
+        return frame.assign(aggregate=aggregates, error=errors)
+
+
+def load_schemes(path=None):
+    """DEFAULT_SCHEMES plus or overridden by the JSON file at path, as MeritSchemes by key"""
+    table = dict(DEFAULT_SCHEMES)
+    if path:
+        with open(path, encoding='utf-8') as f:
+            table.update(json.load(f))
+    return {key: MeritScheme(key, spec.get('name', key), spec['components']) for key, spec in table.items()}
+
+
+def get_scheme(schemes, key):
+    scheme = schemes.get(key)
+    if scheme is None:
+        raise MeritError(f"Unknown merit scheme {key!r}; expected one of: {', '.join(schemes)}")
+    return scheme
+
+
+def rank(frame, cutoffs=None, program_column='program'):
+    """frame sorted best first within each program, with 'rank' and, given cutoffs, 'eligible' columns
+
+    Rows without an aggregate come last and are not ranked. cutoffs is a
+    minimum aggregate for everyone or a {program: minimum} dict; programs
+    missing from the dict have no cutoff.
+    """
+    has_program = program_column in frame.columns
+    if has_program:
+        groups = frame[program_column].fillna('')
+        ranks = frame['aggregate'].groupby(groups).rank(method='min', ascending=False)
+    else:
+        ranks = frame['aggregate'].rank(method='min', ascending=False)
+    frame = frame.assign(rank=ranks.astype('Int64'))
+
+    if cutoffs is not None:
+        if isinstance(cutoffs, dict):
+            if not has_program:
+                raise MeritError(f"Per-program cutoffs need a '{program_column}' column")
+            minimum = frame[program_column].map(cutoffs).astype(float).fillna(-np.inf)
+        else:
+            minimum = float(cutoffs)
+        frame = frame.assign(eligible=frame['aggregate'] >= minimum)
+
+    if has_program:
+        return frame.sort_values([program_column, 'aggregate'], ascending=[True, False], na_position='last', kind='stable')
+    return frame.sort_values('aggregate', ascending=False, na_position='last', kind='stable')
+
+
+def program_summary(frame, program_column='program'):
+    """Per program: applicants, scored, top and closing (lowest eligible) aggregate, and eligible count"""
+    import pandas as pd
+    programs = frame[program_column].fillna('') if program_column in frame.columns else ''
+    data = pd.DataFrame({program_column: programs, 'aggregate': frame['aggregate']}, index=frame.index)
+    has_cutoff = 'eligible' in frame.columns
+    data['admitted'] = frame['aggregate'].where(frame['eligible']) if has_cutoff else frame['aggregate']
+    groups = data.groupby(program_column)
+    summary = groups.agg(applicants=('aggregate', 'size'), scored=('aggregate', 'count'),
+                         top=('aggregate', 'max'), closing=('admitted', 'min'))
+    if has_cutoff:
+        summary['eligible'] = groups['admitted'].count()
+    return summary.reset_index()
+
+
+def to_records(frame):
+    """JSON-ready rows, with NaN and NA as None"""
+    return json.loads(frame.to_json(orient='records'))
+
+
+def read_applicants(stream, chunksize=CSV_CHUNK_ROWS):
+    """DataFrames of up to chunksize applicants from a CSV file object, cells kept as text"""
+    import pandas as pd
+    try:
+        reader = pd.read_csv(stream, chunksize=chunksize, dtype=str, keep_default_na=False, skipinitialspace=True)
+        for chunk in reader:
+            yield canonical_columns(chunk)
+    except pd.errors.EmptyDataError:
+        raise MeritError('The uploaded CSV is empty') from None
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise MeritError(f"Could not read the uploaded CSV: {e}") from None
+
+
+def score_csv(stream, scheme, ranked=True, cutoffs=None, chunksize=CSV_CHUNK_ROWS):
+    """CSV text chunks of the applicants in stream with their aggregates
+
+    Unranked, each chunk is scored and written as soon as it is read.
+    Ranking needs every aggregate first, so the whole list is scored and
+    sorted before the first chunk is written.
+    """
+    frames = (scheme.score_frame(chunk) for chunk in read_applicants(stream, chunksize))
+    if ranked:
+        import pandas as pd
+        scored = list(frames)
+        if not scored:
+            return
+        frames = [rank(pd.concat(scored, ignore_index=True), cutoffs)]
+    header = True
+    for frame in frames:
+        for start in range(0, len(frame), chunksize):
+            out = io.StringIO()
+            frame.iloc[start:start + chunksize].to_csv(out, index=False, header=header)
+            header = False
+            yield out.getvalue()
@@ -0,0 +1,279 @@
+"""In-process latency histograms and counters with Prometheus text output
+
+Stages are timed with `with timed('retrieval'):`. Every observation goes
+into a fixed-bucket histogram (one bisect and one locked increment), so
+recording costs about a microsecond. When a request is being tracked
+(see instrument_flask and MetricsMiddleware) the stage timings are also
+collected for an optional Server-Timing response header.
+"""
+import bisect
+import contextvars
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; roughly x2.5 steps from 0.1ms to 60s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+PREFIX = 'edugate_'
+
+SERVER_TIMING = os.getenv('SERVER_TIMING', '0') == '1'
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class Histogram:
+    """Bucketed latency distribution with quantile estimates"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class Registry:
+    """Counters, histograms and callback counters rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._callbacks = {}
+        self._help = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def counter_func(self, name, func, **labels):
+        """Report func() as a counter, for components that already count (caches, translators)"""
+        self._callbacks[(name, tuple(sorted(labels.items())))] = func
+
+    def quantiles(self, name, **labels):
+        """{quantile: seconds} for one histogram, or None if it has no data"""
+        with self._lock:
+            histogram = self._histograms.get((name, tuple(sorted(labels.items()))))
+            if histogram is None or not histogram.count:
+                return None
+            return {q: histogram.quantile(q) for q in QUANTILES}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """Prometheus text exposition of everything recorded so far"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h.counts), h.sum, h.count, {q: h.quantile(q) for q in QUANTILES})
+                          for key, h in self._histograms.items()}
+        for key, func in list(self._callbacks.items()):
+            try:
+                counters[key] = func()
+            except Exception:
+                continue
+
+        lines = []
+        for name in sorted({key[0] for key in counters}):
+            lines.append(f"# HELP {PREFIX}{name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{PREFIX}{name}{_label_text(labels)} {value}")
+
+        for name in sorted({key[0] for key in histograms}):
+            lines.append(f"# HELP {PREFIX}{name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for (metric, labels), (counts, total, count, _) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, n in zip(BUCKETS + (math.inf,), counts):
+                    cumulative += n
+                    le = '+Inf' if bound == math.inf else repr(bound)
+                    lines.append(f"{PREFIX}{name}_bucket{_label_text(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{_label_text(labels)} {total}")
+                lines.append(f"{PREFIX}{name}_count{_label_text(labels)} {count}")
+
+            # Precomputed quantiles for dashboards that read the endpoint directly
+            lines.append(f"# HELP {PREFIX}{name}_quantile Estimated p50/p95/p99 of {PREFIX}{name}")
+            lines.append(f"# TYPE {PREFIX}{name}_quantile gauge")
+            for (metric, labels), (_, _, _, quantiles) in sorted(histograms.items()):
+                if metric == name:
+                    for q, value in quantiles.items():
+                        lines.append(f"{PREFIX}{name}_quantile{_label_text(labels + (('quantile', str(q)),))} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+registry.describe('stage_duration_seconds', 'Time spent in each pipeline stage')
+registry.describe('request_duration_seconds', 'End-to-end request latency')
+registry.describe('requests_total', 'Requests by endpoint and status')
+registry.describe('llm_errors_total', 'Failed LLM calls by status')
+registry.describe('llm_retries_total', 'LLM calls retried after a connection error or 429/5xx')
+registry.describe('answer_cache_total', 'Answer cache lookups by result')
+registry.describe('translations_total', 'Roman Urdu translations by source')
+registry.describe('query_embeddings_total', 'Query embeddings by source')
+registry.describe('encoder_batches_total', 'Batched query encodes')
+
+
+def inc(name, amount=1, **labels):
+    registry.inc(name, amount, **labels)
+
+
+def observe_stage(stage, seconds):
+    """Record one stage duration, and keep it for Server-Timing if a request is tracked"""
+    registry.observe('stage_duration_seconds', seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage):
+    """Time the enclosed block as one pipeline stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def begin_request():
+    """Start collecting stage timings for the current request; returns a token for end_request"""
+    return _request_timings.set([]), time.perf_counter()
+
+
+def finish_stages(token):
+    """Stop collecting stage timings for the request; returns its Server-Timing header value
+
+    Called when the headers go out, so a streamed body's own time is not in it.
+    """
+    var_token, start = token
+    elapsed = time.perf_counter() - start
+    timings = _request_timings.get() or []
+    try:
+        _request_timings.reset(var_token)
+    except ValueError:
+        # Reset from a different context; nothing to undo
+        pass
+    parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings]
+    parts.append(f"total;dur={elapsed * 1000:.2f}")
+    return ', '.join(parts)
+
+
+def end_request(token, endpoint, status):
+    """Record the request once its whole body has been sent"""
+    registry.observe('request_duration_seconds', time.perf_counter() - token[1], endpoint=endpoint)
+    registry.inc('requests_total', endpoint=endpoint, status=status)
+
+
+def instrument_flask(app, server_timing=None):
+    """Time every request of a Flask app and serve /api/metrics"""
+    from flask import Response, g, request
+
+    server_timing = SERVER_TIMING if server_timing is None else server_timing
+
+    @app.before_request
+    def _metrics_begin():
+        g.metrics_token = begin_request()
+
+    @app.after_request
+    def _metrics_end(response):
+        token = g.pop('metrics_token', None)
+        if token is not None:
+            endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+            header = finish_stages(token)
+            if server_timing:
+                response.headers['Server-Timing'] = header
+            # SSE and NDJSON bodies are still being generated here; the server closes the
+            # response once the last chunk is sent, so the duration covers the whole stream
+            status = response.status_code
+            response.call_on_close(lambda: end_request(token, endpoint, status))
+        return response
+
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus metrics endpoint"""
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+class MetricsMiddleware:
+    """ASGI middleware that times HTTP requests and adds Server-Timing"""
+
+    def __init__(self, app, server_timing=None):
+        self.app = app
+        self.server_timing = SERVER_TIMING if server_timing is None else server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        token = begin_request()
+        status = {'code': 500}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                header = finish_stages(token)
+                if self.server_timing:
+                    message = {**message, 'headers': list(message.get('headers', [])) + [
+                        (b'server-timing', header.encode('latin-1'))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # After the last body chunk, so streamed responses are timed end to end. The router
+            # stores the matched route in the scope; its template keeps path parameters
+            # (session ids) out of the label values
+            route = scope.get('route')
+            end_request(token, getattr(route, 'path', None) or 'unmatched', status['code'])
@@ -0,0 +1,126 @@
+"""Local stand-in for the Mistral chat-completions API
+
+Run it with `python -m edugate.mock_llm --port 8001 --latency 0.2` and set
+MISTRAL_API_BASE=http://127.0.0.1:8001/v1 before starting a backend.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions with a canned reply after a fixed delay
+
+    Requests with "stream": true get the reply word by word as
+    Server-Sent Events, token_latency seconds apart.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; without TCP_NODELAY the
+    # second waits on the client's delayed ACK (~40ms) on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        with server.lock:
+            server.request_count += 1
+            fail = server.fail_next > 0
+            if fail:
+                server.fail_next -= 1
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._send_json(404, {'error': 'not found'})
+        if fail:
+            return self._send_json(server.fail_status, {'error': 'injected failure'})
+
+        time.sleep(server.latency)
+        question = body.get('messages', [{}])[-1].get('content', '')
+        if body.get('stream'):
+            return self._send_stream(server.reply(question), body.get('model'))
+        self._send_json(200, {
+            'id': f"mock-{server.request_count}",
+            'object': 'chat.completion',
+            'model': body.get('model'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': server.reply(question)},
+                'finish_reason': 'stop',
+            }],
+        })
+
+    def _send_stream(self, reply, model):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        words = reply.split(' ')
+        for i, word in enumerate(words):
+            delta = word if i == 0 else ' ' + word
+            chunk = {'model': model, 'choices': [{'index': 0, 'delta': {'content': delta}, 'finish_reason': None}]}
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+            time.sleep(self.server.token_latency)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """Threaded mock server; fail_next makes the next N calls return fail_status"""
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency=0.0, token_latency=0.0, reply=None,
+                 fail_next=0, fail_status=503):
+        super().__init__(address, MockLLMHandler)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.reply = reply or (lambda question: f"Mock answer for: {question[-80:]}")
+        self.fail_next = fail_next
+        self.fail_status = fail_status
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_mock_server(**kwargs):
+    """Start a MockLLMServer on a background thread and return it"""
+    server = MockLLMServer(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock Mistral chat-completions server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to wait before answering')
+    args = parser.parse_args()
+
+    server = MockLLMServer((args.host, args.port), latency=args.latency)
+    print(f"Mock Mistral API listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,144 @@
+"""Quantized embedding matrices scored approximately, then rescored exactly
+
+float16 halves and int8 quarters the memory that the full scan keeps
+resident and reads on every query. Each query is scored against the
+quantized codes, the best top_k * rescore rows are re-scored against the
+float32 embeddings, and those exact scores are what callers see. The
+float32 matrix is memory-mapped from the embedding cache, so rescoring
+reads only the few rows it needs, and those pages are shared with every
+other process on the machine.
+
+int8 codes use one symmetric scale per row: row ~= codes * scale.
+NumPy converts float16 to float32 slowly, so int8 scans faster as well
+as taking less memory; float16 only keeps more precision.
+"""
+import os
+
+import numpy as np
+
+from edugate.retrieval import EmbeddingIndex, normalize_rows, top_k_rows
+
+KINDS = ('float16', 'int8')
+
+# Rows quantized per step while building
+BUILD_CHUNK = 65536
+
+# Rows converted to float32 per matrix product while scanning; small enough that the
+# converted block stays in cache, which keeps an int8 scan about as fast as a float32 one
+SCORE_CHUNK = 1024
+
+
+def quantize(matrix, kind):
+    """(codes, scales) of a unit-row float32 matrix; scales is None for float16"""
+    if kind == 'float16':
+        codes = np.empty(matrix.shape, dtype=np.float16)
+        for start in range(0, len(matrix), BUILD_CHUNK):
+            codes[start:start + BUILD_CHUNK] = matrix[start:start + BUILD_CHUNK]
+        return codes, None
+    if kind == 'int8':
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), BUILD_CHUNK):
+            block = np.asarray(matrix[start:start + BUILD_CHUNK], dtype=np.float32)
+            block_scales = np.abs(block).max(axis=1, initial=0.0) / 127
+            block_scales[block_scales == 0] = 1.0
+            codes[start:start + BUILD_CHUNK] = np.rint(block / block_scales[:, None])
+            scales[start:start + BUILD_CHUNK] = block_scales
+        return codes, scales
+    raise ValueError(f"unknown quantization {kind!r}; expected one of {', '.join(KINDS)}")
+
+
+class QuantizedIndex(EmbeddingIndex):
+    """EmbeddingIndex whose full scan runs over float16 or int8 codes
+
+    `matrix` stays the exact (usually memory-mapped) float32 embeddings and
+    is only read for the rescored candidates.
+    """
+
+    def __init__(self, embeddings, codes=None, scales=None, kind='int8', rescore=4, normalized=False):
+        super().__init__(embeddings, normalized=normalized)
+        if codes is None:
+            codes, scales = quantize(self.matrix, kind)
+        self.codes = codes
+        self.scales = scales
+        self.kind = kind
+        self.rescore = max(1, rescore)
+
+    def approximate_scores(self, queries):
+        """(n_queries, n_rows) scores of normalized queries against the codes"""
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        block = np.empty((SCORE_CHUNK, self.codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK):
+            codes = self.codes[start:start + SCORE_CHUNK]
+            np.copyto(block[:len(codes)], codes, casting='unsafe')
+            scores[:, start:start + len(codes)] = queries @ block[:len(codes)].T
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def search(self, query_embeddings, top_k=3, threshold=None):
+        """Return a best-first list of (row index, cosine score) per query"""
+        queries = normalize_rows(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        if len(self) == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        candidates = top_k_rows(self.approximate_scores(queries), top_k * self.rescore)
+        results = []
+        for query, hits in zip(queries, candidates):
+            ids = np.array(sorted(i for i, _ in hits), dtype=np.int64)
+            exact = (np.asarray(self.matrix[ids], dtype=np.float32) @ query)[None, :]
+            results.append([(int(ids[i]), score) for i, score in top_k_rows(exact, top_k, threshold)[0]])
+        return results
+
+    def save(self, prefix):
+        """Write <prefix>.codes.npy (and int8 <prefix>.scales.npy), each atomically"""
+        arrays = [('codes', self.codes)] + ([('scales', self.scales)] if self.scales is not None else [])
+        for name, array in arrays:
+            path = f"{prefix}.{name}.npy"
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, prefix, embeddings, kind='int8', rescore=4, normalized=False):
+        """QuantizedIndex over embeddings with memory-mapped saved codes, or None if they do not fit"""
+        try:
+            codes = np.load(f"{prefix}.codes.npy", mmap_mode='r')
+            scales = np.load(f"{prefix}.scales.npy", mmap_mode='r') if kind == 'int8' else None
+        except (OSError, ValueError):
+            return None
+        index = cls.__new__(cls)
+        EmbeddingIndex.__init__(index, embeddings, normalized=normalized)
+        if str(codes.dtype) != kind or codes.shape != index.matrix.shape or (scales is not None and len(scales) != len(codes)):
+            return None
+        index.codes = codes
+        index.scales = scales
+        index.kind = kind
+        index.rescore = max(1, rescore)
+        return index
+
+
+def quantized_prefix(cache_dir, key, kind):
+    """Where the codes for one embeddings version and kind are persisted"""
+    return os.path.join(cache_dir, f"quantized-{key[:16]}-{kind}")
+
+
+def load_or_build_quantized(embeddings, cache_dir, key, kind='int8', rescore=4, normalized=False):
+    """QuantizedIndex for cached embeddings, reusing the codes saved next to them"""
+    prefix = quantized_prefix(cache_dir, key, kind)
+    index = QuantizedIndex.load(prefix, embeddings, kind=kind, rescore=rescore, normalized=normalized)
+    if index is not None:
+        print(f"✓ Loaded {kind} embeddings from cache")
+        return index
+
+    index = QuantizedIndex(embeddings, kind=kind, rescore=rescore, normalized=normalized)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        index.save(prefix)
+        # Serve from the mapped file so this process shares its pages with the others
+        index = QuantizedIndex.load(prefix, embeddings, kind=kind, rescore=rescore, normalized=normalized) or index
+    except OSError as e:
+        print(f"✗ Could not write {kind} embeddings: {e}")
+    print(f"✓ Quantized {len(index)} embeddings to {kind} (rescoring top_k x {index.rescore})")
+    return index
@@ -0,0 +1,74 @@
+"""Vectorized top-k retrieval over sentence embeddings"""
+import numpy as np
+
+
+def normalize_rows(matrix):
+    """Scale each row of a 2-D float32 matrix to unit length"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def has_unit_rows(matrix, tolerance=1e-3, chunk=65536):
+    """True if every row is unit length (or all zeros), checked in chunks to bound memory"""
+    for start in range(0, len(matrix), chunk):
+        block = np.asarray(matrix[start:start + chunk], dtype=np.float32)
+        norms = np.sqrt(np.einsum('ij,ij->i', block, block))
+        if not np.all((np.abs(norms - 1) <= tolerance) | (norms == 0)):
+            return False
+    return True
+
+
+class EmbeddingIndex:
+    """Pre-normalized embedding matrix scored with one matrix product per batch
+
+    Already-normalized float32 input (such as the memory-mapped embedding
+    cache) is used as is rather than copied, so processes mapping the same
+    file share one copy of it. normalized=True skips checking that, which
+    would read every row.
+    """
+
+    def __init__(self, embeddings, normalized=False):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(matrix), -1) if matrix.size else np.zeros((0, 0), np.float32)
+        self.matrix = matrix if normalized or has_unit_rows(matrix) else normalize_rows(matrix)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def search(self, query_embeddings, top_k=3, threshold=None):
+        """Return a best-first list of (row index, cosine score) per query"""
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        n_rows = len(self)
+        if n_rows == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = normalize_rows(queries) @ self.matrix.T
+        return top_k_rows(scores, top_k, threshold)
+
+
+def top_k_rows(scores, top_k, threshold=None):
+    """Pick the top_k columns of each score row with a partial sort"""
+    n_queries, n_rows = scores.shape
+    k = min(top_k, n_rows)
+    if k < n_rows:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(n_rows), (n_queries, 1))
+
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    if threshold is None:
+        keep = np.ones_like(top_scores, dtype=bool)
+    else:
+        keep = top_scores > threshold
+
+    results = []
+    for indices, row_scores, mask in zip(top, top_scores, keep):
+        results.append([(int(i), float(s)) for i, s in zip(indices[mask], row_scores[mask])])
+    return results
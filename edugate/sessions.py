@@ -0,0 +1,173 @@
+"""Server-side counselor sessions: the user profile plus a bounded rolling history"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'sessions.sqlite3')
+
+# Client-generated IDs are accepted only in this shape
+SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,128}$')
+
+
+def valid_session_id(session_id):
+    """True for a string that can be used as a session key"""
+    return isinstance(session_id, str) and bool(SESSION_ID_RE.match(session_id))
+
+
+def _merge(session, profile_updates, messages, max_history):
+    profile = dict(session['profile'])
+    profile.update(profile_updates or {})
+    history = (session['history'] + list(messages))[-max_history:]
+    return {'profile': profile, 'history': history, 'turns': session['turns'] + len(messages)}
+
+
+def _empty_session():
+    return {'profile': {}, 'history': [], 'turns': 0}
+
+
+class MemorySessionStore:
+    """Sessions in a process-local dict with LRU eviction and idle expiry
+
+    A session expires ttl seconds after its last update; at most
+    max_sessions are kept. history keeps the last max_history messages
+    while turns counts every message ever added.
+    """
+
+    def __init__(self, max_sessions=10000, ttl=86400, max_history=20):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_history = max_history
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def after_fork(self):
+        """Replace a lock that may have been held by another thread at fork()"""
+        self._lock = threading.Lock()
+
+    def _live(self, session_id, now):
+        entry = self._sessions.get(session_id)
+        if entry is not None and entry['expires'] <= now:
+            del self._sessions[session_id]
+            return None
+        return entry
+
+    def get(self, session_id):
+        """The stored session, or None when it is unknown or expired"""
+        with self._lock:
+            entry = self._live(session_id, time.monotonic())
+            if entry is None:
+                return None
+            self._sessions.move_to_end(session_id)
+            return entry['session']
+
+    def update(self, session_id, profile_updates=None, messages=()):
+        """Merge profile fields and append messages, creating the session if needed"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(session_id, now)
+            session = _merge(entry['session'] if entry else _empty_session(), profile_updates, messages,
+                             self.max_history)
+            self._sessions[session_id] = {'session': session, 'expires': now + self.ttl}
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore:
+    """Sessions in a local SQLite database shared by every worker process
+
+    Updates read and write the row inside one immediate transaction, so
+    concurrent turns from different workers do not lose messages. Expired
+    rows are purged on write.
+    """
+
+    def __init__(self, path=None, ttl=86400, max_history=20):
+        self.path = path or os.getenv('SESSION_DB_PATH', DEFAULT_DB_PATH)
+        self.ttl = ttl
+        self.max_history = max_history
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = self._connect()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=5, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, profile TEXT NOT NULL, '
+            'history TEXT NOT NULL, turns INTEGER NOT NULL, updated REAL NOT NULL)'
+        )
+        db.execute('CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)')
+        return db
+
+    def after_fork(self):
+        """Open a connection of this process's own; SQLite handles must not cross fork()"""
+        self._lock = threading.Lock()
+        if self.path != ':memory:':
+            self._db = self._connect()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM sessions WHERE updated > ?',
+                                    (time.time() - self.ttl,)).fetchone()[0]
+
+    def _read(self, session_id, now):
+        row = self._db.execute('SELECT profile, history, turns FROM sessions WHERE id = ? AND updated > ?',
+                               (session_id, now - self.ttl)).fetchone()
+        if row is None:
+            return None
+        return {'profile': json.loads(row[0]), 'history': json.loads(row[1]), 'turns': row[2]}
+
+    def get(self, session_id):
+        """The stored session, or None when it is unknown or expired"""
+        with self._lock:
+            return self._read(session_id, time.time())
+
+    def update(self, session_id, profile_updates=None, messages=()):
+        """Merge profile fields and append messages, creating the session if needed"""
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                session = _merge(self._read(session_id, now) or _empty_session(), profile_updates, messages,
+                                 self.max_history)
+                self._db.execute(
+                    'INSERT OR REPLACE INTO sessions (id, profile, history, turns, updated) VALUES (?, ?, ?, ?, ?)',
+                    (session_id, json.dumps(session['profile']), json.dumps(session['history']), session['turns'], now)
+                )
+                self._db.execute('DELETE FROM sessions WHERE updated <= ?', (now - self.ttl,))
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+            return session
+
+    def delete(self, session_id):
+        with self._lock:
+            self._db.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+
+def create_session_store():
+    """Session store configured from the environment (SESSION_STORE=memory|sqlite)"""
+    ttl = float(os.getenv('SESSION_TTL', '86400'))
+    max_history = int(os.getenv('SESSION_MAX_HISTORY', '20'))
+    if os.getenv('SESSION_STORE', 'memory').lower() == 'sqlite':
+        try:
+            return SQLiteSessionStore(ttl=ttl, max_history=max_history)
+        except sqlite3.Error as e:
+            print(f"✗ SQLite session store unavailable, using memory: {e}")
+    return MemorySessionStore(max_sessions=int(os.getenv('SESSION_CACHE_SIZE', '10000')), ttl=ttl,
+                              max_history=max_history)
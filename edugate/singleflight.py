@@ -0,0 +1,128 @@
+"""Coalescing of concurrent identical upstream calls
+
+When a popular question arrives in a burst, every request misses the
+answer cache at once and each would start its own LLM or translation
+call. A SingleFlight lets the first caller for a key make the call while
+the others wait for it and share its result, or its exception. This is
+not a cache: the key is forgotten as soon as the call finishes.
+"""
+import asyncio
+import os
+import threading
+import time
+
+# Seconds a caller waits for someone else's call before giving up; a call running
+# longer than this no longer takes new waiters, the next caller starts a fresh one
+DEFAULT_TIMEOUT = float(os.getenv('SINGLEFLIGHT_TIMEOUT', '60'))
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised to a waiter whose shared call did not finish within the timeout"""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.started = time.monotonic()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key; concurrent callers with that key get its outcome
+
+    do() returns the value or raises the exception of whichever call it
+    joined. `calls` counts calls made and `coalesced` callers that shared one.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.calls = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def _join(self, key, now):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and (self.timeout is None or now - call.started < self.timeout):
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.calls += 1
+            return call, True
+
+    def _finish(self, key, call):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def do(self, key, fn, *args, **kwargs):
+        """fn(*args, **kwargs), unless a call for key is already running; then wait for that one"""
+        call, leader = self._join(key, time.monotonic())
+        if leader:
+            try:
+                call.value = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                self._finish(key, call)
+                call.done.set()
+            return call.value
+
+        remaining = None if self.timeout is None else max(0.0, self.timeout - (time.monotonic() - call.started))
+        if not call.done.wait(remaining):
+            raise SingleFlightTimeout(f"shared call for {key!r} did not finish in {self.timeout}s")
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop
+
+    The call runs as its own task, so a waiter that is cancelled (say, by
+    its request deadline) does not cancel it for the others.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.calls = 0
+        self.coalesced = 0
+        self._tasks = {}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    async def do(self, key, factory):
+        """await factory(), unless a call for key is already running; then await that one"""
+        now = time.monotonic()
+        entry = self._tasks.get(key)
+        if entry is not None and (self.timeout is None or now - entry[1] < self.timeout):
+            self.coalesced += 1
+            task, started = entry
+            remaining = None if self.timeout is None else max(0.0, self.timeout - (now - started))
+        else:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = (task, now)
+            self.calls += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+            remaining = None
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), remaining)
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise SingleFlightTimeout(f"shared call for {key!r} did not finish in {self.timeout}s") from None
+
+    def _finish(self, key, task):
+        if self._tasks.get(key, (None,))[0] is task:
+            del self._tasks[key]
+        # Retrieve the outcome so an error nobody waited for is not reported as unhandled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,75 @@
+"""Server-Sent Events helpers for streaming chat answers"""
+import json
+
+from flask import Response, request, stream_with_context
+
+
+def wants_stream(data):
+    """True when the client asked for Server-Sent Events"""
+    return bool(data.get('stream')) or request.accept_mimetypes.best == 'text/event-stream'
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_answer(fields, context, tokens, fallback_answer, on_complete=None):
+    """Yield the events of one streamed answer
+
+    A 'context' event carries the retrieved rows and the response fields
+    known up front, each 'token' event carries one completion fragment,
+    and the final 'done' event carries the same fields as the JSON
+    response. If the token source fails, 'done' carries fallback_answer
+    and an error message instead.
+    """
+    yield sse_event('context', {**fields, 'context': context})
+
+    parts = []
+    try:
+        for token in tokens:
+            parts.append(token)
+            yield sse_event('token', {'text': token})
+    except Exception as e:
+        print(f"Streaming error: {e}")
+        yield sse_event('done', {**fields, 'answer': fallback_answer, 'error': str(e)})
+        return
+
+    answer = ''.join(parts).strip()
+    if on_complete is not None and answer:
+        on_complete(answer)
+    yield sse_event('done', {**fields, 'answer': answer})
+
+
+def sse_response(events):
+    """Flask response that flushes each event as soon as it is produced"""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+async def astream_answer(fields, context, tokens, fallback_answer, on_complete=None):
+    """Async counterpart of stream_answer; tokens may be a list or an async iterator"""
+    yield sse_event('context', {**fields, 'context': context})
+
+    parts = []
+    try:
+        if hasattr(tokens, '__aiter__'):
+            async for token in tokens:
+                parts.append(token)
+                yield sse_event('token', {'text': token})
+        else:
+            for token in tokens:
+                parts.append(token)
+                yield sse_event('token', {'text': token})
+    except Exception as e:
+        print(f"Streaming error: {e}")
+        yield sse_event('done', {**fields, 'answer': fallback_answer, 'error': str(e) or type(e).__name__})
+        return
+
+    answer = ''.join(parts).strip()
+    if on_complete is not None and answer:
+        on_complete(answer)
+    yield sse_event('done', {**fields, 'answer': answer})
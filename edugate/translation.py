@@ -0,0 +1,254 @@
+"""Roman Urdu to English translation with a memo cache and an offline phrase table"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from edugate.answer_cache import normalize_question
+from edugate.lazy import Lazy
+from edugate.singleflight import SingleFlight
+
+# The user's cache directory, so importing a backend never writes into the source tree
+DEFAULT_CACHE_PATH = os.path.join(os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                                  'edugate', 'translations.sqlite3')
+
+# Roman Urdu phrases students use around education questions. Longer phrases
+# win over their parts, and an empty translation drops the phrase (particles
+# such as the genitive "ki/ka/ke" that English word order does not need).
+# Words that are also common English ("the", "me", "main") are left out.
+PHRASE_TABLE = {
+    'kya hai': 'what is', 'kya hain': 'what are', 'kya hota hai': 'what is', 'kya hoti hai': 'what is',
+    'kya hote hain': 'what are', 'kab hai': 'when is', 'kab hota hai': 'when is', 'kab hoti hai': 'when is',
+    'kab hote hain': 'when are', 'kab hain': 'when are', 'kab tak': 'until when', 'kitne hain': 'how many',
+    'kitni hai': 'how much is', 'kitna hai': 'how much is', 'kitni hoti hai': 'how much is',
+    'kaise karen': 'how to do', 'kaise kare': 'how to do', 'kahan se': 'where from', 'kis tarah': 'how',
+    'kaun sa': 'which', 'kon sa': 'which', 'kaun si': 'which', 'kon si': 'which', 'ke liye': 'for',
+    'ki liye': 'for', 'ke baad': 'after', 'se pehle': 'before', 'ke bare mein': 'about', 'ke baare mein': 'about',
+    'hoti hai': 'is', 'hota hai': 'is', 'hote hain': 'are', 'kar sakta hoon': 'can I do', 'kar sakti hoon': 'can I do',
+    'de sakta hoon': 'can I take', 'de sakti hoon': 'can I take', 'dena hai': 'to take', 'deni hai': 'to take',
+    'kya': 'what', 'kab': 'when', 'kitne': 'how many', 'kitni': 'how much', 'kitna': 'how much',
+    'kaise': 'how', 'kese': 'how', 'kahan': 'where', 'kidhar': 'where', 'kaun': 'who', 'kon': 'who',
+    'konsa': 'which', 'konsi': 'which', 'kyun': 'why', 'kyu': 'why', 'kyon': 'why',
+    'hai': 'is', 'hain': 'are', 'tha': 'was', 'thi': 'was',
+    'ki': '', 'ka': '', 'ke': '', 'ko': 'to', 'se': 'from', 'mein': 'in',
+    'par': 'on', 'pe': 'on', 'tak': 'until', 'aur': 'and', 'ya': 'or', 'bhi': 'also', 'sirf': 'only',
+    'nahi': 'not', 'nahin': 'not', 'koi': 'any', 'sab': 'all', 'sabse': 'most', 'zyada': 'more',
+    'kam': 'less', 'pehle': 'before', 'baad': 'after', 'saal': 'year', 'mahine': 'months', 'mahina': 'month',
+    'din': 'day', 'tareekh': 'date', 'tarikh': 'date', 'imtihan': 'exam', 'imtehan': 'exam',
+    'parhai': 'study', 'dakhla': 'admission', 'daakhla': 'admission', 'nambar': 'marks',
+    'mujhe': 'I', 'mera': 'my', 'meri': 'my', 'mere': 'my', 'hum': 'we', 'humein': 'we', 'aap': 'you',
+    'batao': 'tell me', 'bataen': 'tell me', 'bataiye': 'tell me', 'bataein': 'tell me',
+    'chahiye': 'need', 'chahte': 'want', 'chahti': 'want', 'chahta': 'want',
+    'lagti': 'costs', 'lagta': 'costs', 'milti': 'available', 'milta': 'available',
+    'hoga': 'will be', 'hogi': 'will be', 'honge': 'will be', 'wala': '', 'wali': '', 'wale': '',
+}
+
+MAX_PHRASE_WORDS = max(len(phrase.split()) for phrase in PHRASE_TABLE)
+
+# English question phrases are moved to the front to undo Urdu verb-final order
+QUESTION_PHRASES = ('what is', 'what are', 'when is', 'when are', 'until when', 'how many', 'how much is',
+                    'how much', 'how to do', 'where from', 'which', 'what', 'when', 'how', 'where', 'who', 'why')
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def vocabulary(texts):
+    """Lower-case word set of the given texts, used as known English terms"""
+    words = set()
+    for text in texts:
+        words.update(_WORD_RE.findall(text.lower()))
+    return words
+
+
+def local_translate(text, known_terms=()):
+    """Rewrite Roman Urdu with the phrase table, or return None if it cannot
+
+    Every word must either be part of a phrase-table entry or already be a
+    known English term (a number or a word from the FAQ data), otherwise the
+    remote translator is needed. Returns None when no Urdu phrase matched.
+    """
+    words = _WORD_RE.findall(normalize_question(text))
+    if not words:
+        return None
+
+    translated = []
+    question = None
+    matched = False
+    i = 0
+    while i < len(words):
+        for size in range(min(MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            phrase = ' '.join(words[i:i + size])
+            if phrase in PHRASE_TABLE:
+                english = PHRASE_TABLE[phrase]
+                if question is None and english in QUESTION_PHRASES:
+                    question = english
+                elif english:
+                    translated.append(english)
+                matched = True
+                i += size
+                break
+        else:
+            word = words[i]
+            if not (word.isdigit() or word in known_terms):
+                return None
+            translated.append(word)
+            i += 1
+
+    if not matched:
+        return None
+    if question is not None:
+        translated.insert(0, question)
+    return ' '.join(translated)
+
+
+class TranslationCache:
+    """Bounded LRU of normalized source text to translation, persisted in SQLite
+
+    A small in-memory LRU sits in front of the database so repeat phrases
+    do not touch disk. Pass path=':memory:' to keep everything in process.
+    """
+
+    def __init__(self, path=None, max_entries=10000, memory_entries=1024):
+        self.path = path or os.getenv('TRANSLATION_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = self._connect()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS translations (source TEXT PRIMARY KEY, translation TEXT NOT NULL, used REAL NOT NULL)'
+        )
+        db.execute('CREATE INDEX IF NOT EXISTS translations_used ON translations (used)')
+        db.commit()
+        return db
+
+    def after_fork(self):
+        """Open a connection of this process's own; SQLite handles must not cross fork()"""
+        self._lock = threading.Lock()
+        if self.path != ':memory:':
+            self._db = self._connect()
+
+    def _remember(self, source, translation):
+        self._memory[source] = translation
+        self._memory.move_to_end(source)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, source):
+        """Cached translation of a normalized source, or None"""
+        with self._lock:
+            if source in self._memory:
+                self._memory.move_to_end(source)
+                return self._memory[source]
+            row = self._db.execute('SELECT translation FROM translations WHERE source = ?', (source,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE translations SET used = ? WHERE source = ?', (time.time(), source))
+            self._db.commit()
+            self._remember(source, row[0])
+            return row[0]
+
+    def put(self, source, translation):
+        """Store a translation, evicting the least recently used beyond max_entries"""
+        with self._lock:
+            self._remember(source, translation)
+            self._db.execute(
+                'INSERT OR REPLACE INTO translations (source, translation, used) VALUES (?, ?, ?)',
+                (source, translation, time.time())
+            )
+            self._db.execute(
+                'DELETE FROM translations WHERE source IN ('
+                'SELECT source FROM translations ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+
+class RomanUrduTranslator:
+    """Memo cache, then the offline phrase table, then the remote translator
+
+    remote(text) returns the translation, or the original text when it
+    fails; failures are not cached. Concurrent misses for the same
+    normalized text share one remote call. cache may be a Lazy, in which
+    case the database is only opened by the first translation.
+    """
+
+    def __init__(self, remote, cache=None, known_terms=()):
+        self.remote = remote
+        self.cache = cache
+        self.known_terms = set(known_terms)
+        self.inflight = SingleFlight()
+        self.cache_hits = 0
+        self.local_hits = 0
+        self.remote_calls = 0
+
+    def _cache(self):
+        if isinstance(self.cache, Lazy):
+            return self.cache.get()
+        return self.cache
+
+    def lookup(self, text):
+        """Translate without a network call, or return None"""
+        source = normalize_question(text)
+        cache = self._cache()
+        if cache is not None:
+            cached = cache.get(source)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+
+        local = local_translate(source, self.known_terms)
+        if local is not None:
+            self.local_hits += 1
+            if cache is not None:
+                cache.put(source, local)
+        return local
+
+    def remember(self, text, translation):
+        """Cache a remote translation unless it failed"""
+        translation = (translation or '').strip()
+        cache = self._cache()
+        if cache is not None and translation and translation != text:
+            cache.put(normalize_question(text), translation)
+
+    def translate(self, text):
+        """Translate Roman Urdu to English, calling the remote translator only on a miss"""
+        translation = self.lookup(text)
+        if translation is not None:
+            return translation
+        return self.inflight.do(normalize_question(text), self._translate_remote, text)
+
+    def _translate_remote(self, text):
+        self.remote_calls += 1
+        translation = self.remote(text)
+        self.remember(text, translation)
+        return translation
+
+    def after_fork(self):
+        """Reopen the cache's SQLite handle in a forked worker; an unopened Lazy cache is left alone"""
+        if isinstance(self.cache, Lazy) and not self.cache.loaded:
+            return
+        cache = self._cache()
+        if cache is not None:
+            cache.after_fork()
+
+
+def create_translation_cache():
+    """TranslationCache configured from the environment, or None when disabled"""
+    max_entries = int(os.getenv('TRANSLATION_CACHE_SIZE', '10000'))
+    if max_entries <= 0:
+        return None
+    try:
+        return TranslationCache(max_entries=max_entries)
+    except (sqlite3.Error, OSError) as e:
+        print(f"✗ Translation cache disabled: {e}")
+        return None
@@ -0,0 +1,133 @@
+"""Single-pass Roman Urdu detector with precompiled word sets and a character n-gram model
+
+Each token gets a probability of being Roman Urdu: Urdu function words
+count as 1, known English words as 0, Urdu words that are also English
+words ("say", "bare") as HOMOGRAPH_WEIGHT, and anything else is scored
+by a character-trigram likelihood ratio trained on the word lists below. A
+text is Roman Urdu when the mean probability crosses THRESHOLD and at
+least one function word is present, so English questions that merely
+mention "test", "fees" or a proper noun do not trigger translation.
+"""
+import math
+import re
+from functools import lru_cache
+
+# Grammatical words that almost never appear in English text
+URDU_FUNCTION_WORDS = frozenset("""
+    kya kia kiya hai hain hay hy ki ka ke ko se tak aur ya nahi nahin nai mein mai kab kitne kitni
+    kitna kaise kese kaisay kahan kidhar kaun kon konsa konsi kyun kyu kyon hota hoti hote tha thi thay
+    bhi mujhe mujhay mera meri mujh aap ap apna apni apne humein hamara tum tumhara batao bataen
+    bataein bataiye chahiye chahta chahti chahte wala wali wale hoga hogi honge sakta sakti sakte
+    karna karni karne karen kare karo karein raha rahi rahe yeh woh wo jo jab agar lekin magar phir abhi
+    sab koi kuch bohat bahut zyada kam liye baad pehle baare sirf dena deni lena leni hona jata jati
+""".split())
+
+# Urdu function words that are also English words ("bare minimum", "ho hum");
+# they lean towards Urdu but never make a text Roman Urdu on their own
+URDU_HOMOGRAPHS = frozenset("say bare hum ho mere".split())
+
+HOMOGRAPH_WEIGHT = 0.5
+
+# Everyday English and education vocabulary, including words the old
+# regex detector mistook for Urdu
+ENGLISH_WORDS = frozenset("""
+    a an the is are was were be been being am do does did done have has had having can could will would
+    shall should may might must what when where which who whom whose why how i me my mine you your we us
+    our they them their he him his she her it its this that these those there here and or but not no yes
+    if then than so to of in on at by for from with about into over under after before between during
+    all any some each every many much more most less few other another such only also very just too
+    please tell give show explain know need want get take make find help list
+    test tests exam exams entry fee fees passing pass marks mark marking negative date dates deadline
+    fields field topics topic rules rule syllabus pattern paper papers result results merit admission
+    admissions university universities college colleges program programs degree degrees engineering
+    medical business law science arts computer scholarship scholarships apply application registration
+    online offline center centre centers venue schedule month months year years time times conducted
+    held frequency distribution mcqs mcq questions question total score scores valid validity accepted
+    alternative alternatives source sources nts nat gat ecat mdcat nust net usat sat act gre gmat lums
+    iba fast giki pieas uet comsats etea habib air bahria szabist ucp hec fsc matric intermediate
+    general subject mathematics maths physics chemistry biology english verbal quantitative analytical
+    preparation prepare study course courses book books notes mock practice tutor tutors best good
+    next last first second new old same different required requirement requirements eligibility
+    eligible criteria percentage aggregate calculate calculation cost costs price semester
+""".split())
+
+# Extra Roman Urdu content words for the character model
+URDU_TRAINING_WORDS = URDU_FUNCTION_WORDS | URDU_HOMOGRAPHS | frozenset("""
+    samjhao samjha samajh parhai parhna parhni imtihan imtehan dakhla daakhla tareekh tarikh nambar
+    saal mahine mahina din raat subah shaam waqt jaldi der acha accha bura theek thik shukriya meharbani
+    zaroor zaroori asaan mushkil tayyari tayari kitab kitaben ustad ustaad talib ilm daftar shehar
+    mulk bachay bachon larka larki walid walida ghar paisa paise rupay rupaye kharcha kharch
+    lagti lagta milti milta milega milegi jana jaana aana ana dekhna dekho suno bolo likho parho
+    pata maloom janana chahiye wajah tarah jaisa jaisi aisa aisi waisa dusra dusri pehla pehli aakhri
+""".split())
+
+THRESHOLD = 0.25
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def _trigrams(word):
+    padded = f"^{word}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _train(words):
+    counts = {}
+    total = 0
+    for word in words:
+        for gram in _trigrams(word):
+            counts[gram] = counts.get(gram, 0) + 1
+            total += 1
+    return counts, total
+
+
+def _build_model():
+    urdu_counts, urdu_total = _train(URDU_TRAINING_WORDS)
+    english_counts, english_total = _train(ENGLISH_WORDS)
+    vocabulary = len(set(urdu_counts) | set(english_counts)) + 1
+    # Log-likelihood ratio per trigram with add-one smoothing; unseen trigrams score 0
+    ratios = {}
+    for gram in set(urdu_counts) | set(english_counts):
+        p_urdu = (urdu_counts.get(gram, 0) + 1) / (urdu_total + vocabulary)
+        p_english = (english_counts.get(gram, 0) + 1) / (english_total + vocabulary)
+        ratios[gram] = math.log(p_urdu / p_english)
+    return ratios
+
+
+TRIGRAM_RATIOS = _build_model()
+
+
+@lru_cache(maxsize=4096)
+def token_probability(token):
+    """Probability that a single lower-case token is Roman Urdu"""
+    if token in URDU_FUNCTION_WORDS:
+        return 1.0
+    if token in URDU_HOMOGRAPHS:
+        return HOMOGRAPH_WEIGHT
+    if token in ENGLISH_WORDS:
+        return 0.0
+    grams = _trigrams(token)
+    llr = sum(TRIGRAM_RATIOS.get(gram, 0.0) for gram in grams) / len(grams)
+    return 1.0 / (1.0 + math.exp(-4.0 * llr))
+
+
+def roman_urdu_score(text):
+    """Return (score, function word count) for a text in one pass over its tokens"""
+    total = 0.0
+    count = 0
+    function_words = 0
+    for token in _TOKEN_RE.findall(text.lower()):
+        probability = token_probability(token)
+        if probability == 1.0 and token in URDU_FUNCTION_WORDS:
+            function_words += 1
+        total += probability
+        count += 1
+    if not count:
+        return 0.0, 0
+    return total / count, function_words
+
+
+def is_roman_urdu(text, threshold=THRESHOLD):
+    """True when the text reads as Roman Urdu rather than English"""
+    score, function_words = roman_urdu_score(text)
+    return function_words > 0 and score >= threshold
@@ -0,0 +1,41 @@
+"""Gunicorn settings for backend.py: warm up once in the master, then fork workers
+
+    gunicorn -c gunicorn.conf.py
+
+With preload the master imports backend.py, loads the sentence
+transformer, the translator client and the corpus, and only then forks.
+Every worker starts ready and shares those pages copy-on-write instead of
+loading its own copy. gc.freeze() moves everything allocated so far into
+a generation the collector never scans; without it the first collection
+in each worker writes to every object header and un-shares the pages.
+Forked workers reopen their SQLite handles and watcher threads through
+the os.register_at_fork hooks in backend.py. Row texts and embeddings
+are memory-mapped from the embedding cache, so workers share them even
+with WARM_START=0.
+"""
+import gc
+import os
+import time
+
+wsgi_app = os.getenv('GUNICORN_APP', 'backend:app')
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# WARM_START=0 forks straight away and lets each worker load on first use
+preload_app = os.getenv('WARM_START', '1') == '1'
+
+
+def when_ready(server):
+    """Runs in the master after the preloaded app is imported and before any worker forks"""
+    if not preload_app:
+        return
+    import backend
+
+    start = time.perf_counter()
+    ready = backend.warm_up()
+    gc.collect()
+    gc.freeze()
+    server.log.info("Warm-up %s in %.1fs; %d objects frozen for copy-on-write sharing",
+                    'finished' if ready else 'incomplete', time.perf_counter() - start, gc.get_freeze_count())
@@ -92,7 +92,8 @@ export default function AiEdubotPage() {
 
   const createNewSession = () => {
     const newSession: ChatSession = {
-      id: Date.now().toString(),
+      // Also the server-side session key, so it must be unguessable
+      id: crypto.randomUUID(),
       title: `Chat ${new Date().toLocaleDateString()}`,
       messages: [],
       createdAt: new Date(),
@@ -128,18 +129,29 @@ export default function AiEdubotPage() {
     try {
       // Call EduHire AI backend API
       const apiUrl = process.env.VITE_API_URL || '/api';
-      const response = await fetch(`${apiUrl}/edubot`, {
+      const postTurn = (seed: boolean) => fetch(`${apiUrl}/edubot`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
+        // Profile and history are kept server-side under the session ID; they are only
+        // sent to seed a new session or one the server no longer has
         body: JSON.stringify({
+          sessionId: currentSessionId,
           message: text,
-          userProfile,
-          conversationHistory: updatedMessages,
+          ...(seed && {
+            userProfile,
+            conversationHistory: messages.map(({ sender, content }) => ({ sender, content })),
+          }),
         }),
       });
 
+      let response = await postTurn(messages.length === 0);
+      if (response.status === 409) {
+        // Restarted, expired, evicted or served by another worker: resend what we have
+        response = await postTurn(true);
+      }
+
       if (!response.ok) {
         throw new Error('Failed to get response from backend');
       }
@@ -224,6 +236,8 @@ export default function AiEdubotPage() {
 
   const handleDeleteSession = () => {
     if (sessionToDelete) {
+      const apiUrl = process.env.VITE_API_URL || '/api';
+      fetch(`${apiUrl}/edubot/sessions/${sessionToDelete}`, { method: 'DELETE' }).catch(() => {});
       const newSessions = sessions.filter(s => s.id !== sessionToDelete);
       setSessions(newSessions);
       if (currentSessionId === sessionToDelete) {
@@ -0,0 +1,25 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# Tests import the edugate package and the backends from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'app.py')
+
+
+@pytest.fixture(scope='session')
+def chat_backend():
+    """backend/app.py with in-memory caches and the memory session store"""
+    # Kept for the whole session: the translation cache reads its path on first use
+    mp = pytest.MonkeyPatch()
+    mp.setenv('TRANSLATION_CACHE_PATH', ':memory:')
+    mp.setenv('CORPUS_WATCH_INTERVAL', '0')
+    mp.setenv('SESSION_STORE', 'memory')
+    spec = importlib.util.spec_from_file_location('chat_backend', APP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    mp.undo()
@@ -0,0 +1,59 @@
+import numpy as np
+
+from edugate.ann import IVFIndex, default_nlist, load_or_build_ivf
+from edugate.retrieval import EmbeddingIndex
+
+
+def clustered(n_clusters=8, per_cluster=50, dim=16, seed=0):
+    """Rows scattered tightly around random unit directions"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(n_clusters, dim))
+    rows = np.repeat(centres, per_cluster, axis=0) + rng.normal(scale=0.05, size=(n_clusters * per_cluster, dim))
+    return rows.astype(np.float32)
+
+
+def test_default_nlist_is_about_sqrt_n():
+    assert default_nlist(10000) == 100
+    assert default_nlist(0) == 1
+
+
+def test_full_probe_matches_the_exact_scan():
+    embeddings = clustered()
+    queries = embeddings[[3, 120, 399]] + 0.01
+    exact = EmbeddingIndex(embeddings).search(queries, top_k=5)
+    index = IVFIndex(embeddings, nlist=8)
+    approximate = index.search(queries, top_k=5, nprobe=index.nlist)
+    for want, got in zip(exact, approximate):
+        assert [row for row, _ in got] == [row for row, _ in want]
+        np.testing.assert_allclose([s for _, s in got], [s for _, s in want], rtol=1e-5)
+
+
+def test_one_probe_finds_neighbours_in_well_separated_clusters():
+    embeddings = clustered()
+    index = IVFIndex(embeddings, nlist=8, nprobe=1)
+    hits = index.search(embeddings[[10, 210]], top_k=3)
+    assert hits[0][0][0] == 10 and all(row < 50 for row, _ in hits[0])
+    assert hits[1][0][0] == 210 and all(200 <= row < 250 for row, _ in hits[1])
+
+
+def test_every_row_is_in_exactly_one_list():
+    index = IVFIndex(clustered(), nlist=8)
+    assert sorted(index.order.tolist()) == list(range(400))
+    assert index.offsets[0] == 0 and index.offsets[-1] == 400
+
+
+def test_saved_clustering_is_reused(tmp_path, capsys):
+    embeddings = clustered()
+    built = load_or_build_ivf(embeddings, str(tmp_path), 'a' * 64, nlist=8)
+    loaded = load_or_build_ivf(embeddings, str(tmp_path), 'a' * 64, nlist=8)
+    assert 'Loaded IVF index' in capsys.readouterr().out
+    np.testing.assert_array_equal(loaded.order, built.order)
+    assert loaded.search(embeddings[:1], top_k=1)[0][0][0] == 0
+
+
+def test_clustering_for_other_embeddings_is_not_loaded(tmp_path):
+    path = str(tmp_path / 'ivf.npz')
+    IVFIndex(clustered(), nlist=8).save(path)
+    assert IVFIndex.load(path, clustered(per_cluster=10)) is None
+    assert IVFIndex.load(str(tmp_path / 'missing.npz'), clustered()) is None
+
@@ -0,0 +1,97 @@
+import numpy as np
+
+from edugate import answer_cache
+from edugate.answer_cache import AnswerCache, normalize_question
+
+CONTEXT = ['NUST NET: held in March']
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_question():
+    assert normalize_question('  When is  NUST-NET?? ') == 'when is nust net'
+
+
+def test_exact_hit_after_normalization():
+    cache = AnswerCache()
+    cache.put('When is NET?', [1, 2], 'In March', CONTEXT)
+    assert cache.get('when is net', [1, 2], CONTEXT) == 'In March'
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_key_includes_rows_and_context():
+    cache = AnswerCache()
+    cache.put('When is NET?', [1, 2], 'In March', CONTEXT)
+    assert cache.get('When is NET?', [2, 1], CONTEXT) is None
+    assert cache.get('When is NET?', [1, 2], ['NUST NET: held in June']) is None
+
+
+def test_answer_stored_after_a_reload_does_not_serve_the_new_data():
+    # A request that retrieved the old rows finishes after the reload cleared the cache
+    cache = AnswerCache()
+    cache.clear()
+    cache.put('When is NET?', [1], 'In March', ['NUST NET: held in March'])
+    assert cache.get('When is NET?', [1], ['NUST NET: held in June']) is None
+    assert cache.get('When is NET?', [1], ['NUST NET: held in March']) == 'In March'
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, 'monotonic', clock)
+    cache = AnswerCache(ttl=60)
+    cache.put('q', [1], 'a', CONTEXT)
+    clock.now += 59
+    assert cache.get('q', [1], CONTEXT) == 'a'
+    clock.now += 2
+    assert cache.get('q', [1], CONTEXT) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(max_size=2)
+    cache.put('first', [1], 'a', CONTEXT)
+    cache.put('second', [1], 'b', CONTEXT)
+    assert cache.get('first', [1], CONTEXT) == 'a'
+    cache.put('third', [1], 'c', CONTEXT)
+    assert cache.get('second', [1], CONTEXT) is None
+    assert cache.get('first', [1], CONTEXT) == 'a'
+    assert cache.get('third', [1], CONTEXT) == 'c'
+
+
+def fake_embed(text):
+    """Bag of letters, so reworded questions with the same letters are near-identical"""
+    vector = np.zeros(26, dtype=np.float32)
+    for char in text:
+        if 'a' <= char <= 'z':
+            vector[ord(char) - 97] += 1
+    return vector
+
+
+def test_near_duplicate_question_over_the_same_rows_hits():
+    cache = AnswerCache(embed=fake_embed, similarity_threshold=0.95)
+    cache.put('when is the net held', [1], 'In March', CONTEXT)
+    assert cache.get('the net is held when', [1], CONTEXT) == 'In March'
+    assert cache.get('the net is held when', [2], CONTEXT) is None
+    assert cache.get('what are the fees', [1], CONTEXT) is None
+
+
+def test_near_duplicate_lookup_skips_expired_entries(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, 'monotonic', clock)
+    cache = AnswerCache(ttl=10, embed=fake_embed)
+    cache.put('when is the net held', [1], 'In March', CONTEXT)
+    clock.now += 11
+    assert cache.get('the net is held when', [1], CONTEXT) is None
+
+
+def test_zero_size_disables_the_cache():
+    cache = AnswerCache(max_size=0)
+    cache.put('q', [1], 'a', CONTEXT)
+    assert cache.get('q', [1], CONTEXT) is None
+    assert len(cache) == 0
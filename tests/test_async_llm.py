@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from edugate.async_llm import AsyncLLMClient
+from edugate.llm import LLMError
+from edugate.mock_llm import start_mock_server
+
+MESSAGES = [{'role': 'user', 'content': 'Which universities offer CS?'}]
+
+
+@pytest.fixture
+def server():
+    server = start_mock_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run(server, call, **kwargs):
+    """Run call(client) on a fresh event loop with a client for server"""
+    kwargs.setdefault('backoff', 0)
+
+    async def main():
+        client = AsyncLLMClient(api_key='test-key', base_url=server.base_url, **kwargs)
+        try:
+            return await call(client)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main())
+
+
+def test_chat_returns_the_completion_text(server):
+    server.reply = lambda question: ' NUST, FAST and LUMS '
+    assert run(server, lambda client: client.chat(MESSAGES, 'm')) == 'NUST, FAST and LUMS'
+
+
+def test_stream_chat_yields_fragments(server):
+    server.reply = lambda question: 'NUST and FAST'
+
+    async def collect(client):
+        return [token async for token in client.stream_chat(MESSAGES, 'm')]
+
+    assert run(server, collect) == ['NUST', ' and', ' FAST']
+
+
+def test_transient_failures_are_retried(server):
+    server.fail_next = 2
+    assert run(server, lambda client: client.chat(MESSAGES, 'm'), retries=3).startswith('Mock answer')
+    assert server.request_count == 3
+
+
+def test_client_errors_raise_without_retrying(server):
+    server.fail_next = 10
+    server.fail_status = 400
+    with pytest.raises(LLMError) as excinfo:
+        run(server, lambda client: client.chat(MESSAGES, 'm'), retries=3)
+    assert excinfo.value.status_code == 400
+    assert server.request_count == 1
+
+
+def test_passed_deadline_times_out_before_any_request(server):
+    async def call(client):
+        return await client.chat(MESSAGES, 'm', deadline=asyncio.get_running_loop().time() - 1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        run(server, call)
+    assert server.request_count == 0
+
+
+def test_slow_upstream_is_cut_off_at_the_deadline(server):
+    server.latency = 1.0
+
+    async def call(client):
+        return await client.chat(MESSAGES, 'm', deadline=asyncio.get_running_loop().time() + 0.1)
+
+    with pytest.raises(LLMError, match='Request failed'):
+        run(server, call)
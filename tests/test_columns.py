@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from edugate.columns import StringColumn
+
+STRINGS = ['NUST NET', '', 'ایم ڈی کیٹ', 'ECAT (UET)']
+
+
+def test_behaves_like_the_list_it_was_built_from():
+    column = StringColumn.from_strings(STRINGS)
+    assert len(column) == 4
+    assert list(column) == STRINGS
+    assert column[-1] == 'ECAT (UET)'
+    assert column[1:3] == STRINGS[1:3]
+    with pytest.raises(IndexError):
+        column[4]
+
+
+def test_saved_column_is_memory_mapped(tmp_path):
+    prefix = str(tmp_path / 'texts')
+    StringColumn.from_strings(STRINGS).save(prefix)
+    loaded = StringColumn.load(prefix)
+    assert list(loaded) == STRINGS
+    assert isinstance(loaded.data, np.memmap)
+
+
+def test_damaged_column_is_rejected(tmp_path):
+    prefix = str(tmp_path / 'texts')
+    StringColumn.from_strings(STRINGS).save(prefix)
+    np.save(f"{prefix}.offsets.npy", np.array([0, 3], dtype=np.int64))
+    with pytest.raises(ValueError):
+        StringColumn.load(prefix)
+    with pytest.raises(OSError):
+        StringColumn.load(str(tmp_path / 'missing'))
+
+
+def test_empty_column():
+    column = StringColumn.from_strings([])
+    assert len(column) == 0 and list(column) == []
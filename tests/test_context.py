@@ -0,0 +1,62 @@
+import pandas as pd
+
+from edugate.context import ContextPacker, count_tokens, trim_tokens
+from edugate.entities import EntityIndex
+
+DF = pd.DataFrame({
+    'Test Name': ['NAT-IE', 'NAT-IM', 'ECAT'],
+    'Topics': ['Maths, Physics', 'Biology, Chemistry', 'Maths, Physics, Chemistry'],
+    'Frequency': ['4 times a year', '4 times a year', 'Once a year'],
+    'Source': ['https://nts.org.pk', 'https://nts.org.pk', 'https://uet.edu.pk'],
+})
+
+entities = EntityIndex(DF)
+
+
+def test_numbers_count_digit_by_digit():
+    assert count_tokens('2024') == 4
+    assert count_tokens('fee is Rs. 3000') > count_tokens('fee is')
+
+
+def test_trim_tokens_marks_cut_text():
+    assert trim_tokens('one two three', 100) == 'one two three'
+    # "alpha" is two tokens: "alph" and "a"
+    assert trim_tokens('alpha beta gamma delta', 2) == 'alpha…'
+    assert trim_tokens('anything', 0) == ''
+
+
+def test_named_columns_only():
+    lines, used = ContextPacker().pack(entities, [2], fields=['Topics'])
+    assert lines == ['Test Name: ECAT. Topics: Maths, Physics, Chemistry.']
+    assert used == [2]
+
+
+def test_unnamed_columns_leave_out_low_value_ones():
+    lines, _ = ContextPacker().pack(entities, [2])
+    assert 'Frequency: Once a year' in lines[0]
+    assert 'Source' not in lines[0]
+
+
+def test_values_shared_by_every_row_are_written_once():
+    lines, used = ContextPacker().pack(entities, [0, 1])
+    assert lines[0] == 'All rows below: Frequency: 4 times a year.'
+    assert lines[1:] == ['Test Name: NAT-IE. Topics: Maths, Physics.',
+                         'Test Name: NAT-IM. Topics: Biology, Chemistry.']
+    assert used == [0, 1]
+
+
+def test_rows_are_added_best_first_within_the_budget():
+    one_row = count_tokens(ContextPacker().pack(entities, [2])[0][0])
+    lines, used = ContextPacker(budget=one_row + 5).pack(entities, [2, 0, 1])
+    assert used == [2]
+    assert count_tokens('\n'.join(lines)) <= one_row + 5
+
+
+def test_first_row_is_cut_to_the_budget():
+    lines, used = ContextPacker(budget=5).pack(entities, [2, 0])
+    assert used == [2]
+    assert lines[0].endswith('…') and count_tokens(lines[0]) <= 6
+
+
+def test_nothing_retrieved():
+    assert ContextPacker().pack(entities, []) == ([], [])
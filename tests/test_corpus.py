@@ -0,0 +1,123 @@
+import os
+import threading
+
+import pandas as pd
+
+from edugate.corpus import CorpusLoader, KeywordCorpus, read_csv_bytes
+
+
+def row_text(row):
+    return f"{row['Test Name']}: {row['Answer']}"
+
+
+def make_corpus():
+    df = pd.DataFrame({'Test Name': ['NUST NET', 'ECAT', 'MDCAT'],
+                       'Answer': ['held in march and may', 'held in july', 'held in august']})
+    return KeywordCorpus(df, row_text)
+
+
+def test_jaccard_search_scores_only_rows_sharing_tokens():
+    corpus = make_corpus()
+    hits = corpus.jaccard_search('when is ecat held', top_k=3)
+    assert hits[0][0] == 1
+    assert {row for row, _ in hits} == {0, 1, 2}
+    assert corpus.jaccard_search('scholarship', top_k=3) == []
+
+
+def test_jaccard_search_threshold_and_top_k():
+    corpus = make_corpus()
+    assert len(corpus.jaccard_search('held', top_k=2)) == 2
+    assert corpus.jaccard_search('held', top_k=3, threshold=0.9) == []
+
+
+class Built:
+    """Stand-in corpus recording what it was built from"""
+
+    def __init__(self, text):
+        self.text = text
+        self.version = 0
+
+    def __len__(self):
+        return 1
+
+
+def touch(path, text):
+    """Rewrite the file and move its mtime forward so the change is always seen"""
+    stat = os.stat(path)
+    path.write_text(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_first_load_blocks_and_unchanged_files_are_not_rebuilt(tmp_path):
+    path = tmp_path / 'faq.csv'
+    path.write_text('a\n1\n')
+    builds = []
+    loader = CorpusLoader(str(path), lambda p: builds.append(p) or Built(path.read_text()))
+
+    assert loader.get().text == 'a\n1\n'
+    assert loader.get().version == 1
+    assert len(builds) == 1
+
+
+def test_changed_file_is_rebuilt_in_the_background(tmp_path):
+    path = tmp_path / 'faq.csv'
+    path.write_text('a\n1\n')
+    release = threading.Event()
+    published = []
+
+    def build(p):
+        if published:
+            release.wait(5)
+        return Built(path.read_text())
+
+    loader = CorpusLoader(str(path), build, on_publish=published.append)
+    first = loader.get()
+    touch(path, 'a\n2\n')
+
+    # The old corpus is served while the new one is built
+    assert loader.get() is first
+    assert loader.status()['reloading']
+    release.set()
+    assert loader.reload()
+    assert loader.get().text == 'a\n2\n'
+    assert [corpus.version for corpus in published][-1] == loader.version
+
+
+def test_failed_rebuild_keeps_the_last_corpus_until_the_file_changes(tmp_path):
+    path = tmp_path / 'faq.csv'
+    path.write_text('good')
+    builds = []
+
+    def build(p):
+        builds.append(p)
+        text = path.read_text()
+        if text == 'bad':
+            raise ValueError('bad csv')
+        return Built(text)
+
+    loader = CorpusLoader(str(path), build)
+    first = loader.get()
+    touch(path, 'bad')
+    assert not loader.reload()
+    assert loader.get() is first
+    assert loader.status()['last_error'] == 'bad csv'
+    assert len(builds) == 2
+
+    touch(path, 'fixed')
+    assert loader.reload()
+    assert loader.get().text == 'fixed'
+
+
+def test_loader_keeps_the_last_corpus_when_the_file_goes_away(tmp_path):
+    path = tmp_path / 'faq.csv'
+    path.write_text('a\n1\n')
+    loader = CorpusLoader(str(path), lambda p: Built('corpus'))
+    first = loader.get()
+    path.unlink()
+    assert loader.get() is first
+    assert loader.status()['last_error']
+
+
+def test_read_csv_bytes_falls_back_to_windows_1252():
+    df = read_csv_bytes('Test Name,Answer\nNAT,fee \u2013 Rs 3000\n'.encode('cp1252'))
+    assert df.loc[0, 'Answer'] == 'fee \u2013 Rs 3000'
@@ -0,0 +1,102 @@
+import pytest
+
+HISTORY = [
+    {'sender': 'user', 'content': 'hi', 'id': 1},
+    {'sender': 'bot', 'content': 'hello', 'id': 2},
+    {'sender': 'user', 'content': 'I am in FSc pre-engineering', 'id': 3},
+]
+
+
+@pytest.fixture
+def client(chat_backend):
+    return chat_backend.app.test_client()
+
+
+def ask(client, **body):
+    response = client.post('/api/edubot', json=body)
+    return response.status_code, response.get_json()
+
+
+def test_new_session_starts_from_an_empty_history(client, chat_backend):
+    status, payload = ask(client, sessionId='session-new-1', message='hi', conversationHistory=[])
+    assert status == 200 and payload['sessionId'] == 'session-new-1'
+    assert chat_backend.session_store.get('session-new-1')['turns'] == 2
+
+
+def test_later_turns_only_send_the_message(client, chat_backend):
+    ask(client, sessionId='session-later-1', message='hi', conversationHistory=[])
+    status, payload = ask(client, sessionId='session-later-1', message='I am in FSc pre-engineering')
+    assert status == 200
+    assert payload['updatedProfile']
+    assert chat_backend.session_store.get('session-later-1')['turns'] == 4
+
+
+def test_unknown_session_without_history_asks_for_a_resend(client):
+    status, payload = ask(client, sessionId='session-lost-1', message='which universities?')
+    assert status == 409
+    assert payload['sessionExpired'] is True
+    assert payload['sessionId'] == 'session-lost-1'
+
+
+def test_resend_reseeds_a_lost_session(client, chat_backend):
+    ask(client, sessionId='session-lost-2', message='hi', conversationHistory=[])
+    chat_backend.session_store.delete('session-lost-2')
+    assert ask(client, sessionId='session-lost-2', message='which universities?')[0] == 409
+
+    status, payload = ask(client, sessionId='session-lost-2', message='which universities?',
+                          userProfile={'educationLevel': 'FSc'}, conversationHistory=HISTORY)
+    assert status == 200
+    assert payload['updatedProfile']['educationLevel'] == 'FSc'
+    session = chat_backend.session_store.get('session-lost-2')
+    assert session['history'][:3] == [{'sender': m['sender'], 'content': m['content']} for m in HISTORY]
+    assert session['history'][3] == {'sender': 'user', 'content': 'which universities?'}
+    assert session['turns'] == 5
+
+
+def test_resent_history_ending_with_the_message_is_not_duplicated(client, chat_backend):
+    history = HISTORY + [{'sender': 'user', 'content': 'which universities?'}]
+    ask(client, sessionId='session-lost-3', message='which universities?', conversationHistory=history)
+    contents = [m['content'] for m in chat_backend.session_store.get('session-lost-3')['history']]
+    assert contents.count('which universities?') == 1
+
+
+def test_invalid_session_id_and_empty_message_are_rejected(client):
+    assert ask(client, sessionId='bad id', message='hi')[0] == 400
+    assert ask(client, message='   ')[0] == 400
+
+
+def test_stateless_requests_still_work(client):
+    status, payload = ask(client, message='hi', userProfile={}, conversationHistory=[])
+    assert status == 200 and 'sessionId' not in payload
+
+
+def test_deleting_a_session(client, chat_backend):
+    ask(client, sessionId='session-del-1', message='hi', conversationHistory=[])
+    assert client.delete('/api/edubot/sessions/session-del-1').status_code == 200
+    assert chat_backend.session_store.get('session-del-1') is None
+
+
+@pytest.mark.parametrize('message', [
+    'the entry test is on 15 March',
+    'ECAT has 100 MCQs?',
+    'Which test for grade 12 students',
+])
+def test_test_dates_counts_and_grades_are_not_stored_as_marks(client, message):
+    status, payload = ask(client, message=message, userProfile={}, conversationHistory=[])
+    assert status == 200
+    assert 'marks' not in payload['updatedProfile']
+
+
+def test_stored_marks_only_answer_merit_turns(client):
+    sid = 'session-merit-1'
+    status, payload = ask(client, sessionId=sid, message='Matric 1000, FSc 950, NET 160', conversationHistory=[])
+    assert payload['answer'].startswith("Here's your merit")
+    assert payload['updatedProfile']['marks'] == {'matric': 1000, 'fsc': 950, 'test': 160}
+
+    for message in ['the entry test is on 15 March', 'ECAT has 100 MCQs?', 'Which test for grade 12 students']:
+        status, payload = ask(client, sessionId=sid, message=message)
+        assert status == 200
+        assert not payload['answer'].startswith("Here's your merit")
+        assert payload['updatedProfile']['marks'] == {'matric': 1000, 'fsc': 950, 'test': 160}
+
+    assert ask(client, sessionId=sid, message='what is my merit?')[1]['answer'].startswith("Here's your merit")
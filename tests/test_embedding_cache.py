@@ -0,0 +1,97 @@
+import json
+import os
+
+import numpy as np
+
+from edugate.embedding_cache import EmbeddingCache, text_hash
+
+
+class CountingEncoder:
+    """Deterministic fake encoder that records which texts it was asked for"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), sum(map(ord, t)) % 97, 1.0] for t in texts], dtype=np.float32)
+
+
+def test_store_then_load_round_trips(tmp_path):
+    cache = EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path))
+    encode = CountingEncoder()
+    matrix = cache.store(b'csv-1', ['alpha', 'beta'], encode)
+
+    texts, loaded = cache.load(b'csv-1')
+    assert list(texts) == ['alpha', 'beta']
+    assert np.array_equal(np.asarray(loaded), matrix)
+
+
+def test_changed_csv_model_or_format_misses(tmp_path):
+    EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path)).store(b'csv-1', ['alpha'], CountingEncoder())
+    assert EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path)).load(b'csv-2') is None
+    assert EmbeddingCache('model-b', 'v1', cache_dir=str(tmp_path)).load(b'csv-1') is None
+    assert EmbeddingCache('model-a', 'v2', cache_dir=str(tmp_path)).load(b'csv-1') is None
+
+
+def test_only_changed_rows_are_reencoded(tmp_path):
+    cache = EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path))
+    encode = CountingEncoder()
+    first = cache.store(b'csv-1', ['alpha', 'beta', 'gamma'], encode)
+    second = cache.store(b'csv-2', ['beta', 'delta', 'alpha'], encode)
+
+    assert encode.calls[-1] == ['delta']
+    assert np.array_equal(second[0], first[1])
+    assert np.array_equal(second[2], first[0])
+
+
+def test_another_model_reencodes_everything(tmp_path):
+    encode = CountingEncoder()
+    EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path)).store(b'csv-1', ['alpha', 'beta'], encode)
+    EmbeddingCache('model-b', 'v1', cache_dir=str(tmp_path)).store(b'csv-1', ['alpha', 'beta'], encode)
+    assert encode.calls[-1] == ['alpha', 'beta']
+
+
+def test_unreadable_manifest_is_a_miss(tmp_path):
+    cache = EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path))
+    cache.store(b'csv-1', ['alpha'], CountingEncoder())
+    with open(cache.manifest_path, 'w') as f:
+        f.write('{not json')
+    assert cache.load(b'csv-1') is None
+
+
+def test_new_version_removes_the_files_derived_from_the_old_one(tmp_path):
+    cache = EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path))
+    cache.store(b'csv-1', ['alpha', 'beta'], CountingEncoder())
+    old = cache.key(b'csv-1')[:16]
+    # Stand-ins for the IVF clustering and quantized codes built from this version
+    for name in [f"ivf-{old}-8.npz", f"quantized-{old}-int8.codes.npy"]:
+        (tmp_path / name).write_bytes(b'')
+
+    cache.store(b'csv-2', ['alpha', 'gamma'], CountingEncoder())
+    assert not [path for path in os.listdir(tmp_path) if old in path]
+    assert cache.load(b'csv-2') is not None
+
+
+def test_loaded_embeddings_are_memory_mapped(tmp_path):
+    cache = EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path))
+    cache.store(b'csv-1', ['alpha', 'beta'], CountingEncoder())
+    _, matrix = cache.load(b'csv-1')
+    assert isinstance(matrix, np.memmap)
+    np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-6)
+
+
+def test_manifest_without_a_hashes_file_reencodes_every_row(tmp_path):
+    cache = EmbeddingCache('model-a', 'v1', cache_dir=str(tmp_path))
+    cache.store(b'csv-1', ['alpha', 'beta'], CountingEncoder())
+    with open(cache.manifest_path) as f:
+        manifest = json.load(f)
+    del manifest['hashes_file']
+    # Inline hashes are not a supported format and are ignored
+    manifest['row_hashes'] = [text_hash('alpha'), text_hash('beta')]
+    with open(cache.manifest_path, 'w') as f:
+        json.dump(manifest, f)
+
+    encode = CountingEncoder()
+    cache.store(b'csv-2', ['alpha', 'beta'], encode)
+    assert encode.calls == [['alpha', 'beta']]
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from edugate.encoder import EncoderService
+
+
+class RecordingEncoder:
+    """Batch encode function that records every batch and can be slowed down"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return np.array([[len(t), t.count('a'), 1.0] for t in texts], dtype=np.float32)
+
+
+def test_vectors_come_back_in_order():
+    encoder = EncoderService(RecordingEncoder(), max_wait=0)
+    vectors = encoder.encode(['aa', 'b', 'aaa'])
+    np.testing.assert_array_equal(vectors[:, 1], [2, 0, 3])
+
+
+def test_repeat_questions_are_served_from_the_cache():
+    encode = RecordingEncoder()
+    encoder = EncoderService(encode, max_wait=0)
+    first = encoder.encode(['When is NET?'])
+    second = encoder.encode(['when is net'])
+    np.testing.assert_array_equal(first, second)
+    assert len(encode.batches) == 1
+    assert encoder.stats()['cache_hits'] == 1
+
+
+def test_duplicates_in_one_call_are_encoded_once():
+    encode = RecordingEncoder()
+    vectors = EncoderService(encode, max_wait=0).encode(['fee?', 'Fee', 'topics'])
+    assert encode.batches == [['fee?', 'topics']]
+    np.testing.assert_array_equal(vectors[0], vectors[1])
+
+
+def test_concurrent_callers_are_batched_together():
+    encode = RecordingEncoder(delay=0.02)
+    encoder = EncoderService(encode, max_wait=0.05, max_batch=32)
+    results = {}
+
+    def ask(i):
+        results[i] = encoder.encode([f"question {i}"])
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(len(batch) for batch in encode.batches) == 8
+    assert len(encode.batches) < 8
+    for i, vector in results.items():
+        assert vector[0, 0] == len(f"question {i}")
+
+
+def test_batches_are_capped_at_max_batch():
+    encode = RecordingEncoder()
+    EncoderService(encode, max_wait=0, max_batch=2).encode(['a', 'b', 'c', 'd', 'e'])
+    assert [len(batch) for batch in encode.batches] == [2, 2, 1]
+
+
+def test_failed_batch_raises_and_is_not_cached():
+    calls = []
+
+    def flaky(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RuntimeError('model crashed')
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    encoder = EncoderService(flaky, max_wait=0)
+    with pytest.raises(RuntimeError):
+        encoder.encode(['fee'])
+    assert encoder.encode(['fee']).shape == (1, 2)
+    assert encoder.stats()['failed'] == 1
+
+
+def test_cache_is_bounded():
+    encoder = EncoderService(RecordingEncoder(), max_wait=0, cache_size=2)
+    encoder.encode(['a', 'b', 'c'])
+    assert encoder.stats()['cache_size'] == 2
+
+
+def test_empty_input():
+    assert EncoderService(RecordingEncoder()).encode([]).shape == (0, 0)
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from edugate import entities
+from edugate.entities import EntityIndex
+
+DF = pd.DataFrame({
+    'Test Name': ['NAT-IE', 'NAT-IM', 'ECAT (UET)', 'NUST NET'],
+    'Marks Distribution': ['English 20, Maths 30', 'English 20, Biology 30', 'Maths 30, Physics 30', None],
+    'Topics': ['Maths, Physics', 'Biology, Chemistry', 'FSc syllabus', 'Maths, Physics, English'],
+})
+
+index = EntityIndex(DF)
+
+
+def test_aliases_cover_qualifiers_dashes_and_families():
+    assert {'ecat', 'uet ecat', 'ecat uet'} <= entities.test_aliases('ECAT (UET)')
+    assert {'nat-ie', 'nat ie', 'natie', 'nat'} <= entities.test_aliases('NAT-IE')
+    assert 'habib university' in entities.test_aliases('Habib University Admission Test')
+
+
+def test_question_naming_a_test_and_a_column_is_exact():
+    assert index.lookup('What is the NAT-IE marks distribution?') == ([0], ['Marks Distribution'], True)
+    assert index.answer([0], ['Marks Distribution']) == 'NAT-IE - Marks Distribution: English 20, Maths 30'
+
+
+def test_longer_alias_wins_over_the_family_prefix():
+    assert index.lookup('nat ie topics')[0] == [0]
+    assert index.lookup('nat topics')[0] == [0, 1]
+
+
+def test_synonyms_pick_columns_but_are_not_exact():
+    rows, fields, exact = index.lookup('syllabus for ecat')
+    assert (rows, fields) == ([2], ['Topics'])
+    assert not exact
+
+
+def test_extra_words_leave_the_question_to_the_llm():
+    rows, fields, exact = index.lookup('passing marks distribution for ECAT')
+    assert rows == [2] and fields == ['Marks Distribution']
+    assert not exact
+
+
+def test_alias_from_the_extra_table():
+    assert index.lookup('nust topics') == ([3], ['Topics'], True)
+
+
+def test_no_direct_answer_for_empty_cells_or_too_many_rows():
+    assert index.answer([3], ['Marks Distribution']) is None
+    assert EntityIndex(DF, max_rows=1).answer([0, 1], ['Topics']) is None
+    assert index.answer([0], []) is None
+
+
+def test_unrelated_question_names_nothing():
+    assert index.lookup('hello there') == ([], [], False)
@@ -0,0 +1,45 @@
+import pytest
+
+from edugate.hybrid import HybridRetriever, reciprocal_rank_fusion
+
+TEXTS = ['row zero', 'row one', 'row two', 'row one']
+
+
+def fixed(rankings):
+    """Scorer returning the same best-first ranking for every question"""
+    return lambda questions, top_k: [rankings[:top_k] for _ in questions]
+
+
+def test_rrf_rewards_rows_ranked_by_several_scorers():
+    fused = reciprocal_rank_fusion([[(1, 0.9), (0, 0.8)], [(2, 0.7), (1, 0.6)]], k=60)
+    assert fused[0][0] == 1
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+    assert [row for row, _ in fused[1:]] == [2, 0]
+
+
+def test_rrf_breaks_ties_by_row_index():
+    assert [row for row, _ in reciprocal_rank_fusion([[(5, 1.0)], [(3, 1.0)]])] == [3, 5]
+
+
+def test_search_fuses_scorers_and_keeps_raw_scores():
+    retriever = HybridRetriever(TEXTS, {'embedding': fixed([(0, 0.9), (1, 0.5)]),
+                                        'bm25': fixed([(1, 0.8)])}, top_k=2)
+    rows = retriever.search('question')
+    assert [row['index'] for row in rows] == [1, 0]
+    assert rows[0]['scores'] == {'embedding': 0.5, 'bm25': 0.8}
+    assert rows[1]['scores'] == {'embedding': 0.9}
+
+
+def test_rows_with_the_same_text_are_returned_once():
+    retriever = HybridRetriever(TEXTS, {'a': fixed([(1, 0.9), (3, 0.8), (2, 0.1)])}, top_k=3)
+    assert [row['index'] for row in retriever.search('q')] == [1, 2]
+
+
+def test_nothing_relevant_gives_an_empty_result():
+    retriever = HybridRetriever(TEXTS, {'a': fixed([]), 'b': fixed([])})
+    assert retriever.search_batch(['q1', 'q2']) == [[], []]
+
+
+def test_min_score_drops_weak_fused_rows():
+    retriever = HybridRetriever(TEXTS, {'a': fixed([(0, 0.9), (2, 0.1)])}, top_k=3, min_score=1 / 62)
+    assert [row['index'] for row in retriever.search('q')] == [0]
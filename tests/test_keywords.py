@@ -0,0 +1,51 @@
+from edugate.keywords import KeywordMatcher
+
+TABLES = {
+    'field': {
+        'business': ['business', 'bba', 'ba'],
+        'engineering': ['engineering', 'software engineering', 'engineer'],
+        'cs': ['computer science', 'cs'],
+    },
+    'country': {
+        'usa': ['usa', 'us', 'united states'],
+        'uk': ['uk', 'united kingdom'],
+    },
+}
+
+matcher = KeywordMatcher(TABLES)
+
+
+def test_phrases_only_match_whole_words():
+    matches = matcher.match('Tell me about business schools')
+    assert matches.labels('field') == ['business']
+    assert not matches.has('country')
+
+
+def test_multi_word_and_overlapping_phrases():
+    matches = matcher.match('Software Engineering or computer science in the United States?')
+    assert matches.labels('field') == ['engineering', 'cs']
+    assert matches.first('country') == 'usa'
+
+
+def test_phrase_that_is_a_suffix_of_another_still_matches():
+    # "engineer" is only reachable through the failure link of the "software engineering" branch
+    assert matcher.match('I want to be a software engineer').has('field', 'engineering')
+
+
+def test_labels_come_back_in_table_order():
+    matches = matcher.match('uk or us, cs or bba')
+    assert matches.labels('country') == ['usa', 'uk']
+    assert matches.first('field') == 'business'
+
+
+def test_punctuation_and_text_edges_are_boundaries():
+    assert matcher.match('cs').has('field', 'cs')
+    assert matcher.match('(BBA)!').has('field', 'business')
+    assert not matcher.match('physics').has('field')
+
+
+def test_no_match():
+    matches = matcher.match('hello there')
+    assert matches.first('field') is None
+    assert matches.labels('country') == []
+    assert not matches.has('field', 'cs')
@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from edugate.lazy import Lazy
+from edugate.translation import RomanUrduTranslator, TranslationCache
+
+
+def test_factory_runs_on_first_get_only():
+    calls = []
+    lazy = Lazy(lambda: calls.append(1) or 'model', 'model')
+    assert not lazy.loaded and calls == []
+    assert lazy.get() == 'model'
+    assert lazy.get() == 'model'
+    assert calls == [1]
+    assert lazy.status()['loaded'] and lazy.status()['load_seconds'] is not None
+
+
+def test_concurrent_callers_share_one_build():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    lazy = Lazy(factory, 'model')
+    values = []
+    threads = [threading.Thread(target=lambda: values.append(lazy.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len({id(value) for value in values}) == 1
+
+
+def test_failed_build_is_retried():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('download failed')
+        return 'model'
+
+    lazy = Lazy(factory, 'model')
+    with pytest.raises(RuntimeError):
+        lazy.get()
+    assert lazy.status() == {'loaded': False, 'load_seconds': None, 'error': 'download failed'}
+    assert lazy.get() == 'model'
+    assert lazy.status()['error'] is None
+
+
+def test_translation_cache_is_opened_by_the_first_translation(tmp_path):
+    path = tmp_path / 'translations.sqlite3'
+    cache = Lazy(lambda: TranslationCache(str(path)), 'translation_cache')
+    translator = RomanUrduTranslator(lambda text: 'remote', cache)
+    translator.after_fork()
+    assert not cache.loaded and not path.exists()
+
+    assert translator.translate('hostel milta hai') == 'remote'
+    assert cache.loaded and path.exists()
+    assert translator.translate('hostel milta hai') == 'remote'
+    assert translator.remote_calls == 1
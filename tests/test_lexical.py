@@ -0,0 +1,52 @@
+import numpy as np
+
+from edugate.lexical import BM25Index, analyze, stem
+
+TEXTS = [
+    'NUST NET is held four times a year for engineering programs',
+    'ECAT is the entry test for UET engineering universities',
+    'MDCAT is required for medical colleges',
+    'Scholarships cover tuition fees for needy students',
+]
+
+
+def test_analyze_drops_stopwords_and_stems():
+    assert analyze('What are the Scholarships for students?') == ['scholarship', 'student']
+    assert stem('universities') == 'university'
+    assert stem('is') == 'is'
+
+
+def test_search_ranks_the_row_sharing_rare_terms_first():
+    index = BM25Index(TEXTS)
+    hits = index.search('medical colleges test', top_k=2)
+    assert hits[0][0] == 2
+    assert hits[0][1] > hits[1][1]
+
+
+def test_scores_are_normalized_and_unknown_words_lower_them():
+    index = BM25Index(TEXTS)
+    full = index.scores('mdcat medical colleges')
+    diluted = index.scores('mdcat medical colleges xyzzy plugh')
+    assert 0 < full.max() <= 1.5
+    assert diluted[2] < full[2]
+
+
+def test_queries_without_known_terms_score_zero():
+    index = BM25Index(TEXTS)
+    assert not index.scores('the what is').any()
+    assert index.search('xyzzy') == []
+
+
+def test_term_postings_cover_the_rows_containing_it():
+    index = BM25Index(TEXTS)
+    term_id = index.vocabulary['engineer']
+    rows = index.rows[index.offsets[term_id]:index.offsets[term_id + 1]]
+    assert sorted(rows.tolist()) == [0, 1]
+    scores = index.scores('engineering')
+    assert np.count_nonzero(scores) == 2
+
+
+def test_empty_index():
+    index = BM25Index([])
+    assert len(index) == 0
+    assert index.search('anything') == []
@@ -0,0 +1,87 @@
+import pytest
+
+from edugate.llm import LLMClient, LLMError
+from edugate.mock_llm import start_mock_server
+
+MESSAGES = [{'role': 'user', 'content': 'What is the NUST fee?'}]
+
+
+@pytest.fixture
+def server():
+    server = start_mock_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client_for(server, **kwargs):
+    kwargs.setdefault('backoff', 0)
+    return LLMClient(api_key='test-key', base_url=server.base_url, **kwargs)
+
+
+def test_chat_returns_the_completion_text(server):
+    server.reply = lambda question: f"  answer to {question}  "
+    assert client_for(server).chat(MESSAGES, 'mistral-small') == 'answer to What is the NUST fee?'
+
+
+def test_transient_failures_are_retried(server):
+    server.fail_next = 2
+    assert client_for(server, retries=3).chat(MESSAGES, 'm').startswith('Mock answer')
+    assert server.request_count == 3
+
+
+def test_persistent_failure_raises_with_the_status(server):
+    server.fail_next = 10
+    server.fail_status = 503
+    with pytest.raises(LLMError) as excinfo:
+        client_for(server, retries=1).chat(MESSAGES, 'm')
+    assert excinfo.value.status_code == 503
+    assert server.request_count == 2
+
+
+def test_client_errors_are_not_retried(server):
+    server.fail_next = 10
+    server.fail_status = 400
+    with pytest.raises(LLMError) as excinfo:
+        client_for(server, retries=3).chat(MESSAGES, 'm')
+    assert excinfo.value.status_code == 400
+    assert server.request_count == 1
+
+
+def test_missing_api_key_raises_before_any_request(server, monkeypatch):
+    monkeypatch.delenv('MISTRAL_API_KEY', raising=False)
+    with pytest.raises(LLMError, match='MISTRAL_API_KEY'):
+        LLMClient(base_url=server.base_url).chat(MESSAGES, 'm')
+    assert server.request_count == 0
+
+
+def test_unreachable_server_raises_llm_error():
+    client = LLMClient(api_key='k', base_url='http://127.0.0.1:9/v1', retries=0, connect_timeout=0.5)
+    with pytest.raises(LLMError, match='Request failed'):
+        client.chat(MESSAGES, 'm')
+
+
+def test_calls_beyond_the_concurrency_cap_give_up(server):
+    client = client_for(server, max_concurrency=1, read_timeout=0.05)
+    client._slots.acquire()
+    with pytest.raises(LLMError, match='Too many concurrent'):
+        client.chat(MESSAGES, 'm')
+    assert server.request_count == 0
+    client._slots.release()
+    assert client.chat(MESSAGES, 'm').startswith('Mock answer')
+
+
+def test_stream_chat_yields_fragments_in_order(server):
+    server.reply = lambda question: 'NUST fee is low'
+    fragments = list(client_for(server).stream_chat(MESSAGES, 'm'))
+    assert fragments == ['NUST', ' fee', ' is', ' low']
+
+
+def test_stream_chat_error_releases_its_slot(server):
+    client = client_for(server, max_concurrency=1)
+    server.fail_next = 1
+    server.fail_status = 400
+    with pytest.raises(LLMError) as excinfo:
+        list(client.stream_chat(MESSAGES, 'm'))
+    assert excinfo.value.status_code == 400
+    assert list(client.stream_chat(MESSAGES, 'm'))
@@ -0,0 +1,120 @@
+import io
+
+import pandas as pd
+import pytest
+
+from edugate.merit import (MeritError, MeritScheme, canonical_column, get_scheme, load_schemes, parse_marks, rank,
+                           score_csv)
+
+schemes = load_schemes()
+
+
+@pytest.mark.parametrize('text', [
+    'the entry test is on 15 March',
+    'ECAT has 100 MCQs?',
+    'Which test for grade 12 students',
+])
+def test_dates_counts_and_grades_are_not_marks(text):
+    assert parse_marks(text) == {}
+    assert parse_marks(text, merit_intent=True) == {}
+
+
+@pytest.mark.parametrize('text, marks', [
+    ('Matric 1000, FSc 950, NET 160', {'matric': 1000, 'fsc': 950, 'test': 160}),
+    ('and I got 160 in NET', {'test': 160}),
+    ('NET 160/200', {'test': 160}),
+    ('I scored 150 in ECAT', {'test': 150}),
+    ('my ecat marks are 150', {'test': 150}),
+])
+def test_marks_wording_is_parsed(text, marks):
+    assert parse_marks(text) == marks
+
+
+def test_a_bare_number_needs_a_merit_question():
+    assert parse_marks('NET 160') == {}
+    assert parse_marks('NET 160', merit_intent=True) == {'test': 160}
+
+
+def test_units_and_out_of_range_numbers_are_ignored():
+    assert parse_marks('I got 86% in FSc') == {}
+    assert parse_marks('I got 2024 in matric') == {}
+    assert parse_marks('NET in 2 months, I scored 150 in ECAT') == {'test': 150}
+
+
+def test_headers_map_to_components():
+    assert canonical_column('FSc Marks') == 'fsc'
+    assert canonical_column('NET Score') == 'test'
+    assert canonical_column('Matric Marks Obtained') == 'matric'
+    assert canonical_column('Name') == 'Name'
+
+
+def test_default_scheme_scores_the_counselor_formula():
+    frame = pd.DataFrame({'FSc': [1100, 550], 'Test': [100, 50], 'Interview': [20, 10]})
+    scored = schemes['default'].score_frame(frame)
+    assert scored['aggregate'].tolist() == [100.0, 50.0]
+    assert scored['error'].tolist() == ['', '']
+
+
+def test_missing_and_out_of_range_marks_get_an_error():
+    frame = pd.DataFrame({'fsc': ['950', ''], 'test': [120, 80], 'interview': [15, 15]})
+    scored = schemes['default'].score_frame(frame)
+    assert scored['aggregate'].isna().all()
+    assert scored['error'].tolist() == ['test not between 0 and 100', 'fsc missing']
+
+
+def test_missing_columns_and_unknown_schemes_are_merit_errors():
+    with pytest.raises(MeritError):
+        schemes['nust'].score_frame(pd.DataFrame({'fsc': [900]}))
+    with pytest.raises(MeritError):
+        get_scheme(schemes, 'bogus')
+
+
+def test_invalid_scheme_weights_are_rejected():
+    with pytest.raises(ValueError):
+        MeritScheme('bad', 'Bad', {'fsc': [1100, 0.5], 'test': [100, 0.2]})
+
+
+def test_schemes_file_overrides_and_extends(tmp_path):
+    path = tmp_path / 'schemes.json'
+    path.write_text('{"fast": {"name": "FAST", "components": {"test": [100, 0.5], "fsc": [1100, 0.5]}}}')
+    loaded = load_schemes(str(path))
+    assert set(loaded) == {'default', 'nust', 'uet', 'fast'}
+    assert loaded['fast'].applies_to({'test': 60, 'fsc': 900})
+    assert not loaded['fast'].applies_to({'test': 60})
+
+
+def test_rank_within_programs_with_cutoffs():
+    frame = pd.DataFrame({'program': ['CS', 'CS', 'EE', 'CS'], 'aggregate': [70.0, 90.0, 60.0, float('nan')]})
+    ranked = rank(frame, cutoffs={'CS': 80})
+    assert ranked['program'].tolist() == ['CS', 'CS', 'CS', 'EE']
+    assert ranked['aggregate'].tolist()[:2] == [90.0, 70.0]
+    assert ranked['rank'].tolist() == [1, 2, pd.NA, 1]
+    # EE has no cutoff, and an applicant without an aggregate is never eligible
+    assert ranked['eligible'].tolist() == [True, False, False, True]
+
+
+def test_per_program_cutoffs_need_a_program_column():
+    with pytest.raises(MeritError):
+        rank(pd.DataFrame({'aggregate': [50.0]}), cutoffs={'CS': 40})
+
+
+def test_score_csv_ranks_across_chunks():
+    csv = 'Name,Program,FSc Marks,Test,Interview\n' + ''.join(
+        f"s{i},CS,{500 + i * 50},{40 + i * 5},{10}\n" for i in range(10))
+    out = ''.join(score_csv(io.BytesIO(csv.encode()), schemes['default'], chunksize=3))
+    frame = pd.read_csv(io.StringIO(out))
+    assert frame['Name'].tolist() == [f"s{i}" for i in reversed(range(10))]
+    assert frame['rank'].tolist() == list(range(1, 11))
+
+
+def test_unranked_csv_keeps_the_upload_order():
+    csv = 'fsc,test,interview\n900,80,15\n1000,90,18\n'
+    out = ''.join(score_csv(io.BytesIO(csv.encode()), schemes['default'], ranked=False, chunksize=1))
+    frame = pd.read_csv(io.StringIO(out))
+    assert frame['fsc'].tolist() == [900, 1000]
+    assert 'rank' not in frame.columns
+
+
+def test_empty_csv_is_a_merit_error():
+    with pytest.raises(MeritError):
+        list(score_csv(io.BytesIO(b''), schemes['default']))
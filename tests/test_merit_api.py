@@ -0,0 +1,41 @@
+import io
+
+import pandas as pd
+import pytest
+
+CSV = 'ID,Program,Matric Marks,FSc Marks,NET Score\n1,CS,1000,950,160\n2,CS,900,800,120\n3,EE,1050,1000,180\n'
+
+
+@pytest.fixture
+def client(chat_backend):
+    return chat_backend.app.test_client()
+
+
+def scored(response):
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return pd.read_csv(io.StringIO(response.get_data(as_text=True)))
+
+
+def test_single_student_gets_every_scheme_that_applies(client):
+    payload = client.post('/api/merit', json={'marks': {'Matric': 1000, 'FSc': 950, 'NET': 160}}).get_json()
+    assert {result['scheme'] for result in payload['results']} == {'nust', 'uet'}
+
+
+def test_unknown_scheme_is_a_400(client):
+    response = client.post('/api/merit', json={'marks': {'fsc': 950}, 'scheme': 'bogus'})
+    assert response.status_code == 400
+
+
+def test_csv_body_and_file_upload_score_the_same(client):
+    raw = scored(client.post('/api/merit/csv?scheme=nust', data=CSV, content_type='text/csv'))
+    upload = scored(client.post('/api/merit/csv?scheme=nust', data={'file': (io.BytesIO(CSV.encode()), 'a.csv')},
+                                content_type='multipart/form-data'))
+    pd.testing.assert_frame_equal(raw, upload)
+    assert raw['ID'].tolist() == [1, 2, 3]
+    assert raw['rank'].tolist() == [1, 2, 1]
+
+
+def test_multipart_without_a_file_field_is_a_400(client):
+    response = client.post('/api/merit/csv', data={'other': 'x'}, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert "'file'" in response.get_json()['error']
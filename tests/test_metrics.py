@@ -0,0 +1,104 @@
+import time
+
+import pytest
+from flask import Flask, Response
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from edugate import metrics
+from edugate.metrics import Histogram, MetricsMiddleware, Registry, instrument_flask, timed
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+
+def test_histogram_quantiles_interpolate_inside_buckets():
+    histogram = Histogram(buckets=(1.0, 2.0))
+    for value in [0.5, 1.5, 1.5, 1.5]:
+        histogram.observe(value)
+    assert histogram.quantile(0.25) == pytest.approx(1.0)
+    assert histogram.quantile(0.5) == pytest.approx(1 + 1 / 3)
+    assert histogram.count == 4 and histogram.sum == pytest.approx(5.0)
+
+
+def test_empty_histogram_has_no_quantiles():
+    assert Registry().quantiles('stage_duration_seconds', stage='x') is None
+
+
+def test_render_counters_histograms_and_callbacks():
+    registry = Registry()
+    registry.describe('requests_total', 'Requests')
+    registry.inc('requests_total', endpoint='/api/chat', status=200)
+    registry.inc('requests_total', endpoint='/api/chat', status=200)
+    registry.observe('stage_duration_seconds', 0.003, stage='retrieval')
+    registry.counter_func('answer_cache_total', lambda: 7, result='hit')
+    text = registry.render()
+    assert '# TYPE edugate_requests_total counter' in text
+    assert 'edugate_requests_total{endpoint="/api/chat",status="200"} 2' in text
+    assert 'edugate_answer_cache_total{result="hit"} 7' in text
+    assert 'edugate_stage_duration_seconds_bucket{stage="retrieval",le="0.005"} 1' in text
+    assert 'edugate_stage_duration_seconds_count{stage="retrieval"} 1' in text
+    assert 'edugate_stage_duration_seconds_quantile{stage="retrieval",quantile="0.5"}' in text
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.inc('llm_errors_total', status='a "quoted"\nvalue')
+    assert 'status="a \\"quoted\\"\\nvalue"' in registry.render()
+
+
+def test_timed_stages_are_recorded_and_collected_for_the_request():
+    token = metrics.begin_request()
+    with timed('retrieval'):
+        pass
+    header = metrics.finish_stages(token)
+    assert header.startswith('retrieval;dur=') and 'total;dur=' in header
+    assert metrics.registry.quantiles('stage_duration_seconds', stage='retrieval') is not None
+
+
+def test_flask_streamed_response_is_timed_until_its_last_chunk():
+    app = Flask(__name__)
+    instrument_flask(app, server_timing=True)
+
+    @app.route('/stream')
+    def stream():
+        def chunks():
+            yield 'a'
+            time.sleep(0.05)
+            yield 'b'
+        return Response(chunks(), mimetype='text/event-stream')
+
+    response = app.test_client().get('/stream')
+    assert 'total;dur=' in response.headers['Server-Timing']
+    assert response.get_data(as_text=True) == 'ab'
+    response.close()
+    assert metrics.registry.quantiles('request_duration_seconds', endpoint='/stream')[0.5] >= 0.05
+    assert 'edugate_requests_total{endpoint="/stream",status="200"} 1' in metrics.registry.render()
+    assert 'edugate_requests_total' in app.test_client().get('/api/metrics').get_data(as_text=True)
+
+
+def test_asgi_middleware_labels_requests_by_route_template():
+    async def session(request):
+        return PlainTextResponse('ok')
+
+    async def stream(request):
+        async def chunks():
+            yield b'a'
+            yield b'b'
+        return StreamingResponse(chunks())
+
+    app = Starlette(routes=[Route('/sessions/{session_id}', session), Route('/stream', stream)])
+    client = TestClient(MetricsMiddleware(app, server_timing=True))
+    response = client.get('/sessions/abcdefgh1234')
+    assert 'total;dur=' in response.headers['server-timing']
+    assert client.get('/stream').text == 'ab'
+    client.get('/missing')
+    text = metrics.registry.render()
+    for endpoint in ['/sessions/{session_id}', '/stream', 'unmatched']:
+        assert f'edugate_request_duration_seconds_count{{endpoint="{endpoint}"}} 1' in text
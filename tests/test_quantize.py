@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from edugate.quantize import QuantizedIndex, load_or_build_quantized, quantize, quantized_prefix
+from edugate.retrieval import EmbeddingIndex, normalize_rows
+
+
+def embeddings(n=500, dim=32, seed=0):
+    return normalize_rows(np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32))
+
+
+@pytest.mark.parametrize('kind, tolerance', [('float16', 1e-3), ('int8', 2e-2)])
+def test_codes_approximate_the_rows(kind, tolerance):
+    matrix = embeddings()
+    codes, scales = quantize(matrix, kind)
+    restored = codes.astype(np.float32) * (scales[:, None] if scales is not None else 1)
+    assert np.abs(restored - matrix).max() < tolerance
+
+
+def test_zero_rows_quantize_without_dividing_by_zero():
+    codes, scales = quantize(np.zeros((2, 4), dtype=np.float32), 'int8')
+    assert not codes.any() and np.all(scales == 1.0)
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        quantize(embeddings(n=2), 'int4')
+
+
+@pytest.mark.parametrize('kind', ['float16', 'int8'])
+def test_rescored_results_match_the_exact_scan(kind):
+    matrix = embeddings()
+    queries = matrix[[5, 250]] + 0.05
+    exact = EmbeddingIndex(matrix).search(queries, top_k=5)
+    approximate = QuantizedIndex(matrix, kind=kind, rescore=4).search(queries, top_k=5)
+    for want, got in zip(exact, approximate):
+        assert [row for row, _ in got] == [row for row, _ in want]
+        # Scores come from the float32 rows, not the codes
+        np.testing.assert_allclose([s for _, s in got], [s for _, s in want], rtol=1e-6)
+
+
+def test_threshold_applies_to_exact_scores():
+    matrix = embeddings()
+    hits = QuantizedIndex(matrix).search(matrix[:1], top_k=5, threshold=0.99)
+    assert [row for row, _ in hits[0]] == [0]
+
+
+def test_saved_codes_are_reused_only_for_matching_embeddings(tmp_path, capsys):
+    matrix = embeddings()
+    key = 'c' * 64
+    load_or_build_quantized(matrix, str(tmp_path), key, kind='int8')
+    loaded = load_or_build_quantized(matrix, str(tmp_path), key, kind='int8')
+    assert 'Loaded int8 embeddings' in capsys.readouterr().out
+    assert isinstance(loaded.codes, np.memmap)
+
+    prefix = quantized_prefix(str(tmp_path), key, 'int8')
+    assert QuantizedIndex.load(prefix, embeddings(n=10)) is None
+    assert QuantizedIndex.load(prefix, matrix, kind='float16') is None
@@ -0,0 +1,32 @@
+import numpy as np
+
+from edugate.retrieval import EmbeddingIndex, normalize_rows, top_k_rows
+
+
+def test_normalize_rows_leaves_zero_rows_alone():
+    matrix = normalize_rows([[3, 4], [0, 0]])
+    assert np.allclose(matrix, [[0.6, 0.8], [0, 0]])
+    assert matrix.dtype == np.float32
+
+
+def test_search_ranks_by_cosine_similarity():
+    index = EmbeddingIndex([[1, 0], [0, 1], [1, 1]])
+    [hits] = index.search([[2, 0.1]], top_k=2)
+    assert [row for row, _ in hits] == [0, 2]
+    assert hits[0][1] > hits[1][1]
+
+
+def test_search_batches_queries_and_applies_threshold():
+    index = EmbeddingIndex([[1, 0], [0, 1]])
+    results = index.search([[1, 0], [0, 1]], top_k=2, threshold=0.5)
+    assert results == [[(0, 1.0)], [(1, 1.0)]]
+
+
+def test_top_k_larger_than_rows_returns_every_row_in_order():
+    scores = np.array([[0.1, 0.9, 0.5]], dtype=np.float32)
+    assert [row for row, _ in top_k_rows(scores, 10)[0]] == [1, 2, 0]
+
+
+def test_empty_index_and_zero_k():
+    assert EmbeddingIndex(np.zeros((0, 4))).search([[1, 0, 0, 0]]) == [[]]
+    assert EmbeddingIndex([[1, 0]]).search([[1, 0]], top_k=0) == [[]]
@@ -0,0 +1,86 @@
+import pytest
+
+from edugate import sessions
+from edugate.sessions import MemorySessionStore, SQLiteSessionStore, valid_session_id
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sessions.time, 'monotonic', clock)
+    monkeypatch.setattr(sessions.time, 'time', clock)
+    if request.param == 'memory':
+        store = MemorySessionStore(ttl=60, max_history=4)
+    else:
+        store = SQLiteSessionStore(':memory:', ttl=60, max_history=4)
+    store.clock = clock
+    return store
+
+
+def turn(text):
+    return [{'sender': 'user', 'content': text}, {'sender': 'bot', 'content': f're: {text}'}]
+
+
+def test_session_ids_are_validated():
+    assert valid_session_id('abcdefgh-1234_XY')
+    assert not valid_session_id('short')
+    assert not valid_session_id('has spaces in it')
+    assert not valid_session_id(12345678)
+
+
+def test_update_merges_profile_and_appends_history(store):
+    store.update('session-1', {'educationLevel': 'FSc'}, turn('hi'))
+    session = store.update('session-1', {'budget': 'low'}, turn('fees?'))
+    assert session['profile'] == {'educationLevel': 'FSc', 'budget': 'low'}
+    assert [m['content'] for m in session['history']] == ['hi', 're: hi', 'fees?', 're: fees?']
+    assert store.get('session-1') == session
+
+
+def test_history_is_bounded_but_turns_keep_counting(store):
+    for text in ['a', 'b', 'c']:
+        session = store.update('session-1', None, turn(text))
+    assert [m['content'] for m in session['history']] == ['b', 're: b', 'c', 're: c']
+    assert session['turns'] == 6
+
+
+def test_sessions_expire_after_idle_ttl(store):
+    store.update('session-1', {'x': 1}, turn('hi'))
+    store.clock.now += 59
+    assert store.get('session-1') is not None
+    store.update('session-1', None, turn('again'))
+    store.clock.now += 59
+    assert store.get('session-1') is not None
+    store.clock.now += 2
+    assert store.get('session-1') is None
+    assert store.update('session-1', None, turn('new'))['turns'] == 2
+
+
+def test_delete_forgets_the_session(store):
+    store.update('session-1', None, turn('hi'))
+    store.delete('session-1')
+    assert store.get('session-1') is None
+    assert len(store) == 0
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_sessions=2)
+    store.update('session-a')
+    store.update('session-b')
+    store.get('session-a')
+    store.update('session-c')
+    assert store.get('session-b') is None
+    assert store.get('session-a') is not None and store.get('session-c') is not None
+
+
+def test_sqlite_sessions_are_shared_between_connections(tmp_path):
+    path = str(tmp_path / 'sessions.sqlite3')
+    SQLiteSessionStore(path).update('session-1', {'educationLevel': 'FSc'}, turn('hi'))
+    assert SQLiteSessionStore(path).get('session-1')['profile'] == {'educationLevel': 'FSc'}
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from edugate.singleflight import AsyncSingleFlight, SingleFlight, SingleFlightTimeout
+
+
+def run_together(n, target):
+    """Start n threads running target() and return their results in start order"""
+    results = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'answer'
+
+    assert run_together(5, lambda: flight.do('q', slow)) == ['answer'] * 5
+    assert calls == [1]
+    assert (flight.calls, flight.coalesced) == (1, 4)
+    assert len(flight) == 0
+
+
+def test_waiters_get_the_leaders_exception():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError('upstream down')
+
+    results = run_together(3, lambda: flight.do('q', failing))
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.calls == 1
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+    assert flight.do('a', lambda: 3) == 3
+    assert (flight.calls, flight.coalesced) == (3, 0)
+
+
+def test_waiter_gives_up_after_the_timeout():
+    flight = SingleFlight(timeout=0.1)
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do('q', release.wait))
+    leader.start()
+    time.sleep(0.02)
+    with pytest.raises(SingleFlightTimeout):
+        flight.do('q', lambda: 'never called')
+    # A call older than the timeout takes no new waiters
+    assert flight.do('q', lambda: 'fresh') == 'fresh'
+    release.set()
+    leader.join()
+
+
+def test_async_callers_share_one_task():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'answer'
+
+    async def main():
+        return await asyncio.gather(*[flight.do('q', slow) for _ in range(4)])
+
+    assert asyncio.run(main()) == ['answer'] * 4
+    assert calls == [1] and flight.coalesced == 3
+
+
+def test_cancelled_async_waiter_does_not_cancel_the_shared_call():
+    flight = AsyncSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return 'answer'
+
+    async def main():
+        first = asyncio.ensure_future(flight.do('q', slow))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do('q', slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 'answer'
+    assert flight.calls == 1
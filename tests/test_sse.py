@@ -0,0 +1,56 @@
+import json
+
+from flask import Flask
+
+from edugate.sse import sse_event, sse_response, stream_answer, wants_stream
+
+app = Flask(__name__)
+
+
+def parse(events):
+    """(event, payload) pairs from formatted Server-Sent Events"""
+    parsed = []
+    for raw in events:
+        event_line, data_line = raw.rstrip('\n').split('\n')
+        parsed.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    return parsed
+
+
+def test_sse_event_format():
+    assert sse_event('token', {'text': 'hi'}) == 'event: token\ndata: {"text": "hi"}\n\n'
+
+
+def test_stream_sends_context_then_tokens_then_done():
+    completed = []
+    events = parse(stream_answer({'lang': 'en'}, [{'index': 1}], iter(['Fee ', 'is ', 'low. ']),
+                                 'fallback', on_complete=completed.append))
+    assert events[0] == ('context', {'lang': 'en', 'context': [{'index': 1}]})
+    assert [payload['text'] for event, payload in events[1:-1]] == ['Fee ', 'is ', 'low. ']
+    assert events[-1] == ('done', {'lang': 'en', 'answer': 'Fee is low.'})
+    assert completed == ['Fee is low.']
+
+
+def test_failed_token_source_ends_with_the_fallback():
+    def tokens():
+        yield 'partial'
+        raise RuntimeError('upstream closed')
+
+    completed = []
+    events = parse(stream_answer({}, [], tokens(), 'Sorry, try again', on_complete=completed.append))
+    assert events[-1] == ('done', {'answer': 'Sorry, try again', 'error': 'upstream closed'})
+    assert completed == []
+
+
+def test_wants_stream_from_body_or_accept_header():
+    with app.test_request_context(headers={'Accept': 'application/json'}):
+        assert wants_stream({'stream': True})
+        assert not wants_stream({})
+    with app.test_request_context(headers={'Accept': 'text/event-stream'}):
+        assert wants_stream({})
+
+
+def test_sse_response_is_not_buffered():
+    with app.test_request_context():
+        response = sse_response(iter([sse_event('done', {})]))
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['X-Accel-Buffering'] == 'no'
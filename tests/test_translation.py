@@ -0,0 +1,76 @@
+import threading
+import time
+
+from edugate.translation import RomanUrduTranslator, TranslationCache, local_translate, vocabulary
+
+TERMS = vocabulary(['NUST fee structure', 'ECAT schedule'])
+
+
+def test_phrase_table_translates_known_questions():
+    assert local_translate('NUST ki fee kitni hai?', TERMS) == 'how much is nust fee'
+    assert local_translate('ecat kab hota hai', TERMS) == 'when is ecat'
+
+
+def test_unknown_words_need_the_remote_translator():
+    assert local_translate('xyzzy kya hai', TERMS) is None
+
+
+def test_text_without_urdu_phrases_is_not_translated():
+    assert local_translate('nust fee', TERMS) is None
+    assert local_translate('???', TERMS) is None
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'translations.sqlite3')
+    TranslationCache(path).put('fee kitni hai', 'how much is fee')
+    assert TranslationCache(path).get('fee kitni hai') == 'how much is fee'
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = TranslationCache(str(tmp_path / 't.sqlite3'), max_entries=2, memory_entries=0)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    cache.get('a')
+    cache.put('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A' and cache.get('c') == 'C'
+
+
+def test_translator_prefers_cache_then_phrase_table_then_remote():
+    calls = []
+
+    def remote(text):
+        calls.append(text)
+        return 'remote translation'
+
+    translator = RomanUrduTranslator(remote, TranslationCache(':memory:'), TERMS)
+    assert translator.translate('nust ki fee kitni hai') == 'how much is nust fee'
+    assert translator.translate('NUST ki fee kitni hai!') == 'how much is nust fee'
+    assert translator.translate('hostel milta hai?') == 'remote translation'
+    assert translator.translate('hostel milta hai') == 'remote translation'
+    assert calls == ['hostel milta hai?']
+    assert (translator.local_hits, translator.cache_hits, translator.remote_calls) == (1, 2, 1)
+
+
+def test_failed_remote_translations_are_not_cached():
+    translator = RomanUrduTranslator(lambda text: text, TranslationCache(':memory:'))
+    translator.translate('hostel milta hai')
+    translator.translate('hostel milta hai')
+    assert translator.remote_calls == 2
+
+
+def test_concurrent_misses_share_one_remote_call():
+    def remote(text):
+        time.sleep(0.1)
+        return 'is there a hostel'
+
+    translator = RomanUrduTranslator(remote)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(translator.translate('hostel milta hai')))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['is there a hostel'] * 4
+    assert translator.remote_calls == 1
@@ -0,0 +1,41 @@
+import csv
+import os
+
+import pytest
+
+from edugate.urdu_detect import is_roman_urdu, roman_urdu_score, token_probability
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks', 'data',
+                         'roman_urdu_labeled.tsv')
+
+
+def labelled():
+    with open(DATA_FILE, encoding='utf-8') as f:
+        return [(row['text'], row['label'] == 'urdu') for row in csv.DictReader(f, delimiter='\t')]
+
+
+@pytest.mark.parametrize('text, is_urdu', labelled())
+def test_labelled_questions(text, is_urdu):
+    assert is_roman_urdu(text) == is_urdu
+
+
+@pytest.mark.parametrize('text', ['bare minimum marks for nust', 'ho hum, another entry test',
+                                  'What do seniors say about FAST', 'Is a mere pass enough for NUST?'])
+def test_english_homographs_are_not_roman_urdu(text):
+    assert not is_roman_urdu(text)
+
+
+def test_homographs_still_count_towards_urdu_text():
+    assert is_roman_urdu('NET kab ho ga')
+    assert 0 < token_probability('ho') < token_probability('hai')
+
+
+def test_english_words_alone_never_trigger_translation():
+    score, function_words = roman_urdu_score('test fees xyzlumsqq')
+    assert function_words == 0
+    assert not is_roman_urdu('test fees xyzlumsqq')
+
+
+def test_empty_text_is_not_roman_urdu():
+    assert roman_urdu_score('') == (0.0, 0)
+    assert not is_roman_urdu('123 ?!')